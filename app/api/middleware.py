@@ -0,0 +1,176 @@
+import re
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+import logging
+
+from starlette.routing import Match
+
+from app.services.cache_service import ENTRIES, FEEDS, CachedResponse, ResponseCache, strong_etag
+from app.services.metrics_service import (
+    RequestSQL, current_request_sql, http_request_seconds, http_request_sql_seconds, http_request_sql_statements
+)
+
+logger = logging.getLogger(__name__)
+
+# Cacheable GET routes (relative to the API prefix) and the scopes they are rendered from
+CACHEABLE_ROUTES = [
+    (re.compile(r"^/feeds/$"), (FEEDS,)),
+    (re.compile(r"^/feeds/[^/]+$"), (FEEDS,)),
+    (re.compile(r"^/entries/$"), (ENTRIES,)),
+    (re.compile(r"^/entries/bookmarked$"), (ENTRIES,)),
+    (re.compile(r"^/feeds/[^/]+/entries$"), (ENTRIES,)),
+]
+
+# Replaced on every response served through the cache
+_OWN_HEADERS = {b"content-length", b"etag", b"cache-control"}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCacheMiddleware:
+    """
+    Serves cacheable list routes from a ResponseCache.
+
+    Every response carries a strong ETag; a request whose If-None-Match
+    matches the current representation gets a bodyless 304. Cache hits and
+    304s never reach the route, so they don't touch the database.
+    """
+
+    def __init__(self, app, cache: ResponseCache, prefix: str = ""):
+        self.app = app
+        self.cache = cache
+        self.prefix = prefix
+
+    def _scopes(self, path: str) -> Optional[Tuple[str, ...]]:
+        if not path.startswith(self.prefix):
+            return None
+        path = path[len(self.prefix):]
+        for pattern, scopes in CACHEABLE_ROUTES:
+            if pattern.match(path):
+                return scopes
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.cache.enabled or scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        scopes = self._scopes(scope["path"])
+        if scopes is None:
+            return await self.app(scope, receive, send)
+
+        query = urlencode(sorted(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)))
+        key = (scope["path"], query)
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+
+        cached = self.cache.get(key, scopes)
+        if cached is not None:
+            return await self._send(send, cached, if_none_match, b"HIT")
+
+        # Taken before the route reads anything, so a write that lands
+        # mid-render leaves this response stale instead of caching it
+        generation = self.cache.generation(scopes)
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        response = CachedResponse(
+            status=start["status"],
+            headers=[(name, value) for name, value in start.get("headers", []) if name.lower() not in _OWN_HEADERS],
+            body=body,
+            etag=strong_etag(body),
+            generation=generation,
+        )
+        if response.status == 200:
+            self.cache.put(key, response, scopes)
+            return await self._send(send, response, if_none_match, b"MISS")
+        return await self._send(send, response, None, None)
+
+    async def _send(self, send, response: CachedResponse, if_none_match: Optional[str], cache_status: Optional[bytes]):
+        headers = list(response.headers)
+        if cache_status is not None:
+            headers += [
+                (b"etag", response.etag.encode()),
+                (b"cache-control", b"no-cache"),
+                (b"x-cache", cache_status),
+            ]
+        if cache_status is not None and _etag_matches(if_none_match, response.etag):
+            headers = [(name, value) for name, value in headers if name.lower() != b"content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers.append((b"content-length", str(len(response.body)).encode()))
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+
+class MetricsMiddleware:
+    """
+    Records the latency of every HTTP request, and the SQL it ran, under the
+    route template as declared on its router. Added last so it also times
+    requests answered from the response cache, which never reach a route;
+    those are matched against `routes` (mounted at `prefix`) afterwards.
+    """
+
+    def __init__(self, app, routes, prefix: str = ""):
+        self.app = app
+        self.routes = routes
+        self.prefix = prefix
+        # Cache hits repeat the same few paths; matching them is a regex per route
+        self._match = lru_cache(maxsize=1024)(self._match_path)
+
+    def _match_path(self, method: str, path: str) -> str:
+        if path.startswith(self.prefix):
+            scope = {"type": "http", "method": method, "path": path[len(self.prefix):], "root_path": ""}
+            for route in self.routes:
+                if route.matches(scope)[0] == Match.FULL:
+                    return route.path
+        return "unmatched"
+
+    def _route(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return getattr(route, "path", None) or "unmatched"
+        return self._match(scope["method"], scope["path"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+        request_sql = RequestSQL()
+        token = current_request_sql.set(request_sql)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request_sql.reset(token)
+            route = self._route(scope)
+            http_request_seconds.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=status
+            )
+            http_request_sql_statements.observe(request_sql.statements, route=route)
+            http_request_sql_seconds.observe(request_sql.seconds, route=route)
@@ -1,35 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.base import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterator, List, Optional
+from datetime import datetime
+from app.db.base import SessionLocal, get_async_db, get_db
 from app.schemas.feed import FeedCreate, Feed, FeedUpdate
-from app.schemas.entry import Entry, PaginatedEntriesResponse, EntryStatus
-from app.services.health_service import HealthService
-from app.services.feed_service import FeedService
-from app.services.entry_service import EntryService
-from app.services.rss_service import RSSService
+from app.schemas.entry import (
+    BulkEntryStatusResult, BulkEntryStatusUpdate, Entry, EntryListItem, EntryStatus, PaginatedEntriesResponse,
+    SearchEntriesResponse
+)
+from app.services.health_service import health_prober
+from app.services.metrics_service import registry as metrics_registry
+from app.services.feed_service import AsyncFeedService, FeedService
+from app.services.entry_service import AsyncEntryService, EntryService
+from app.services.rss_service import RSSService, fetch_all_feeds_async, refresh_feed_async
+from app.services.retention_service import retention_job
+from app.services.stream_service import EVICTED, CLOSED, entry_hub, iter_messages, sse_events
+from app.config import get_settings
+from app.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 import logging
 
 logger = logging.getLogger('app.api.routes')
 
 router = APIRouter()
 
+# Mounted at the root rather than under the API prefix, where scrapers look by default
+metrics_router = APIRouter()
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Counters and histograms in the Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 @router.get("/health")
-def health_check(db: Session = Depends(get_db)):
-    """Check the health of all services"""
-    logger.info("Health check endpoint called")
-    try:
-        health_service = HealthService(db)
-        return health_service.check_all()
-    except HTTPException as e:
-        logger.error(f"Health check failed with HTTP error: {str(e)}")
-        raise e
-    except Exception as e:
-        logger.error(f"Health check failed with unexpected error: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Health check failed: {str(e)}"
-        )
+async def health_check():
+    """Readiness from the background prober's last results; never touches the database"""
+    ready, health = health_prober.readiness()
+    if not ready:
+        logger.error(f"Health check failed: {health['status']}")
+        raise HTTPException(status_code=503, detail=health)
+    return health
+
+@router.get("/health/deep")
+async def deep_health_check():
+    """Every cached probe result with its age, plus connection pool usage"""
+    return health_prober.report()
+
+@router.post("/maintenance/retention")
+def run_retention():
+    """Apply the entry retention policy now and report what was deleted"""
+    logger.info("Manual retention run requested")
+    return retention_job.run_once()
 
 # Feed routes
 @router.post("/feeds/", response_model=Feed)
@@ -72,7 +94,7 @@ def create_feed(
         # Schedule initial fetch
         logger.info(f"Scheduling initial fetch for feed ID: {db_feed.id}")
         try:
-            background_tasks.add_task(rss_service.fetch_and_parse_feed, db_feed.id)
+            background_tasks.add_task(refresh_feed_async, db_feed.id)
         except Exception as e:
             logger.error(f"Failed to schedule background task: {str(e)}")
             # Don't raise here as feed was created successfully
@@ -92,12 +114,12 @@ def create_feed(
         )
 
 @router.get("/feeds/", response_model=List[Feed])
-def get_feeds(db: Session = Depends(get_db)):
+async def get_feeds(db: AsyncSession = Depends(get_async_db)):
     """Get all feeds"""
     logger.info("Fetching all feeds")
     try:
-        feed_service = FeedService(db)
-        feeds = feed_service.get_feeds()
+        feed_service = AsyncFeedService(db)
+        feeds = await feed_service.get_feeds()
         if not feeds:
             logger.info("No feeds found in database")
             return []
@@ -112,10 +134,10 @@ def get_feeds(db: Session = Depends(get_db)):
         )
 
 @router.get("/feeds/{feed_id}", response_model=Feed)
-def get_feed(feed_id: str, db: Session = Depends(get_db)):
+async def get_feed(feed_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a specific feed"""
-    feed_service = FeedService(db)
-    return feed_service.get_feed(feed_id)
+    feed_service = AsyncFeedService(db)
+    return await feed_service.get_feed(feed_id)
 
 @router.put("/feeds/{feed_id}", response_model=Feed)
 def update_feed(
@@ -166,25 +188,32 @@ def delete_feed(feed_id: str, db: Session = Depends(get_db)):
         )
 
 # Entry routes
-@router.get("/entries/", response_model=PaginatedEntriesResponse)
-def get_entries(
+@router.get("/entries/", response_model=PaginatedEntriesResponse, response_model_exclude_unset=True)
+async def get_entries(
     limit: int = Query(10, description="Number of items to fetch"),
-    skip: int = Query(0, description="Number of items to skip"),
+    skip: int = Query(0, description="Number of items to skip (ignored when cursor is set)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     keywords: List[str] = Query(None, description="List of keywords to filter feeds"),
-    db: Session = Depends(get_db)
+    exact: bool = Query(False, description="Run an exact COUNT(*) instead of using the maintained counters"),
+    fields: List[str] = Query(None, description="Comma-separated entry fields to return; content only when listed"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all entries with optional keyword filtering"""
-    logger.info(f"Fetching entries with skip={skip}, limit={limit}, keywords={keywords}")
+    logger.info(f"Fetching entries with skip={skip}, cursor={cursor}, limit={limit}, keywords={keywords}")
     try:
-        entry_service = EntryService(db)
-        entries = entry_service.get_entries(skip=skip, limit=limit, keywords=keywords)
+        entry_service = AsyncEntryService(db)
+        entries = await entry_service.get_entries(
+            skip=skip, limit=limit, keywords=keywords, cursor=cursor, exact=exact, fields=fields
+        )
         logger.debug(f"Retrieved {len(entries)} entries")
         
         # Log first entry for debugging (if any exist)
         if entries and logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"Sample entry: {entries[0].__dict__}")
+            logger.debug(f"Sample entry: {entries['entries'][:1]}")
             
         return entries
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching entries: {str(e)}")
         raise HTTPException(
@@ -192,27 +221,187 @@ def get_entries(
             detail=f"Internal server error while fetching entries: {str(e)}"
         )
 
+@router.get("/entries/search", response_model=SearchEntriesResponse)
+async def search_entries(
+    q: str = Query(..., min_length=1, description="Search terms; a trailing * does a prefix match"),
+    limit: int = Query(10, description="Number of items to fetch"),
+    skip: int = Query(0, description="Number of items to skip"),
+    keywords: List[str] = Query(None, description="List of keywords to filter feeds"),
+    bookmarked: Optional[bool] = Query(None, description="Only bookmarked (true) or unbookmarked (false) entries"),
+    feed_id: Optional[str] = Query(None, description="Restrict the search to one feed"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over entry titles, content and publishers, best matches first"""
+    logger.info(f"Searching entries q={q!r}, skip={skip}, limit={limit}, bookmarked={bookmarked}")
+    try:
+        entry_service = AsyncEntryService(db)
+        return await entry_service.search_entries(
+            q, skip=skip, limit=limit, keywords=keywords, bookmarked=bookmarked, feed_id=feed_id
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Error searching entries: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error while searching entries: {str(e)}"
+        )
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _close_after(chunks: Iterator[str], db: Session) -> Iterator[str]:
+    try:
+        yield from chunks
+    finally:
+        db.close()
+
+@router.get("/entries/export")
+def export_entries(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    feed_id: Optional[str] = Query(None, description="Only entries from this feed"),
+    keywords: List[str] = Query(None, description="List of keywords to filter feeds"),
+    since: Optional[datetime] = Query(None, description="Published at or after this time"),
+    until: Optional[datetime] = Query(None, description="Published before this time"),
+    bookmarked: Optional[bool] = Query(None, description="Only bookmarked (true) or unbookmarked (false) entries"),
+    read: Optional[bool] = Query(None, description="Only read (true) or unread (false) entries"),
+):
+    """
+    Stream all matching entries, newest first, as NDJSON or CSV.
+    The response is written as rows are read, so exports of any size use
+    constant memory.
+    """
+    logger.info(
+        f"Exporting entries as {format}: feed_id={feed_id}, keywords={keywords}, "
+        f"since={since}, until={until}, bookmarked={bookmarked}, read={read}"
+    )
+    # The session has to outlive this function, so it is owned by the stream
+    db = SessionLocal()
+    try:
+        chunks = EntryService(db).export_entries(
+            format, feed_id=feed_id, keywords=keywords, since=since, until=until,
+            bookmarked=bookmarked, read=read
+        )
+    except Exception:
+        db.close()
+        raise
+    return StreamingResponse(
+        _close_after(chunks, db),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="entries.{format}"'}
+    )
+
+@router.get("/entries/stream")
+async def stream_entries(
+    request: Request,
+    feed_id: Optional[str] = Query(None, description="Only entries from this feed"),
+    keywords: List[str] = Query(None, description="Only entries from feeds matching these keywords"),
+):
+    """
+    Server-Sent Events stream of entries as they are ingested.
+    Each new entry is an `entry` event; the stream ends with an `evicted`
+    event if the client falls too far behind.
+    """
+    try:
+        subscription = entry_hub.subscribe(feed_id=feed_id, keywords=keywords)
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    logger.info(f"Opening entry stream feed_id={feed_id}, keywords={keywords}")
+    return StreamingResponse(
+        sse_events(subscription, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/entries/stream/ws")
+async def stream_entries_ws(
+    websocket: WebSocket,
+    feed_id: Optional[str] = Query(None),
+    keywords: List[str] = Query(None),
+):
+    """WebSocket variant of /entries/stream: one JSON entry per text message"""
+    try:
+        subscription = entry_hub.subscribe(feed_id=feed_id, keywords=keywords)
+    except OverflowError:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+    try:
+        async for message in iter_messages(subscription, get_settings().STREAM_HEARTBEAT_INTERVAL):
+            if message is None:
+                await websocket.send_text('{"event": "keep-alive"}')
+            elif message == EVICTED:
+                await websocket.close(code=1013, reason="evicted: client too slow")
+            elif message == CLOSED:
+                await websocket.close(code=1001)
+            else:
+                await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        entry_hub.unsubscribe(subscription)
+
 @router.put("/entries/{entry_id}/status", response_model=Entry)
-def update_entry_status(entry_id: str, status: EntryStatus, db: Session = Depends(get_db)):
+async def update_entry_status(entry_id: str, status: EntryStatus, db: AsyncSession = Depends(get_async_db)):
     """Update the status of an entry"""
-    entry_service = EntryService(db)
-    return entry_service.update_entry_status(entry_id, status)
+    entry_service = AsyncEntryService(db)
+    return await entry_service.update_entry_status(entry_id, status)
+
+@router.put("/entries/status", response_model=BulkEntryStatusResult)
+async def update_entries_status(changes: BulkEntryStatusUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update the status of many entries, selected by id and/or filters, in one transaction"""
+    selectors = (changes.entry_ids, changes.feed_id, changes.keywords, changes.published_before)
+    if all(selector is None for selector in selectors):
+        raise HTTPException(
+            status_code=400,
+            detail="Select entries with entry_ids, feed_id, keywords or published_before"
+        )
+    entry_service = AsyncEntryService(db)
+    return {"updated": await entry_service.update_entries_status(changes)}
 
-@router.get("/entries/bookmarked", response_model=PaginatedEntriesResponse)
-def get_bookmarked_entries(
+@router.post("/entries/mark-read", response_model=BulkEntryStatusResult)
+async def mark_entries_read(
+    feed_id: Optional[str] = Query(None, description="Only entries from this feed"),
+    keywords: List[str] = Query(None, description="Only entries from feeds matching these keywords"),
+    published_before: Optional[datetime] = Query(None, description="Only entries published before this time"),
+    all_entries: bool = Query(False, alias="all", description="Mark every entry read; required when no filter is set"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark every matching entry as read; all entries only with all=true"""
+    if feed_id is None and keywords is None and published_before is None and not all_entries:
+        raise HTTPException(
+            status_code=400,
+            detail="Select entries with feed_id, keywords or published_before, or pass all=true"
+        )
+    logger.info(f"Marking entries read: feed_id={feed_id}, keywords={keywords}, published_before={published_before}")
+    entry_service = AsyncEntryService(db)
+    changes = BulkEntryStatusUpdate(feed_id=feed_id, keywords=keywords, published_before=published_before, read=True)
+    return {"updated": await entry_service.update_entries_status(changes)}
+
+@router.get("/entries/bookmarked", response_model=PaginatedEntriesResponse, response_model_exclude_unset=True)
+async def get_bookmarked_entries(
     limit: int = Query(10, description="Number of items to fetch"),
-    skip: int = Query(0, description="Number of items to skip"),
+    skip: int = Query(0, description="Number of items to skip (ignored when cursor is set)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     keywords: List[str] = Query(None, description="List of keywords to filter feeds"),
-    db: Session = Depends(get_db)
+    exact: bool = Query(False, description="Run an exact COUNT(*) instead of using the maintained counters"),
+    fields: List[str] = Query(None, description="Comma-separated entry fields to return; content only when listed"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all bookmarked entries with optional keyword filtering"""
-    logger.info(f"Fetching bookmarked entries with skip={skip}, limit={limit}, keywords={keywords}")
+    logger.info(f"Fetching bookmarked entries with skip={skip}, cursor={cursor}, limit={limit}, keywords={keywords}")
     try:
-        entry_service = EntryService(db)
-        entries = entry_service.get_bookmarked_entries(skip=skip, limit=limit, keywords=keywords)
+        entry_service = AsyncEntryService(db)
+        entries = await entry_service.get_bookmarked_entries(
+            skip=skip, limit=limit, keywords=keywords, cursor=cursor, exact=exact, fields=fields
+        )
         logger.debug(f"Retrieved {len(entries)} entries")
 
         return entries
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching entries: {str(e)}")
         raise HTTPException(
@@ -220,35 +409,46 @@ def get_bookmarked_entries(
             detail=f"Internal server error while fetching entries: {str(e)}"
         )
 
-@router.get("/feeds/{feed_id}/entries", response_model=List[Entry])
-def get_feed_entries(
+@router.get("/feeds/{feed_id}/entries", response_model=List[EntryListItem], response_model_exclude_unset=True)
+async def get_feed_entries(
     feed_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    fields: List[str] = Query(None, description="Comma-separated entry fields to return; content only when listed"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get entries for a specific feed"""
-    entry_service = EntryService(db)
-    return entry_service.get_feed_entries(feed_id, skip, limit)
+    """
+    Get entries for a specific feed
+    The cursor for the next page is returned in the X-Next-Cursor header
+    """
+    entry_service = AsyncEntryService(db)
+    page = await entry_service.get_feed_entries(feed_id, skip, limit, cursor, fields)
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["entries"]
+
+@router.get("/entries/{entry_id}", response_model=Entry)
+async def get_entry(entry_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get a single entry, including its content"""
+    entry_service = AsyncEntryService(db)
+    return await entry_service.get_entry(entry_id)
 
 # RSS operations
 @router.post("/feeds/{feed_id}/refresh")
-def refresh_feed(
+async def refresh_feed(
     feed_id: str,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks
 ):
     """Manually trigger a feed refresh"""
-    rss_service = RSSService(db)
-    background_tasks.add_task(rss_service.fetch_and_parse_feed, feed_id)
+    background_tasks.add_task(refresh_feed_async, feed_id)
     return {"message": "Feed refresh scheduled"}
 
 @router.post("/feeds/refresh-all")
-def refresh_all_feeds(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+async def refresh_all_feeds(
+    background_tasks: BackgroundTasks
 ):
     """Refresh all feeds"""
-    rss_service = RSSService(db)
-    background_tasks.add_task(rss_service.fetch_all_feeds)
+    background_tasks.add_task(fetch_all_feeds_async)
     return {"message": "All feeds refresh scheduled"}
\ No newline at end of file
@@ -8,6 +8,19 @@ class Settings(BaseSettings):
     """
     # Database
     DATABASE_URL: str = "sqlite:///./google_alerts.db"  # SQLite database file in project root
+    DB_ECHO: bool = False  # Log every SQL statement; development only
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_MIGRATE_ON_STARTUP: bool = True  # Apply pending migrations in the app lifespan; off when deploys run them
+
+    # SQLite connection pragmas, applied on every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Readers don't block behind the ingest writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Durable at checkpoints, safe with WAL
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # Bytes of the DB file to memory-map
+    SQLITE_CACHE_SIZE: int = -64000  # Page cache; negative values are KiB
+    SQLITE_BUSY_TIMEOUT: int = 5000  # Milliseconds to wait on a locked database
+    SQLITE_AUTO_VACUUM: str = "INCREMENTAL"  # Takes effect on new databases or after a full VACUUM
     
     # API
     API_V1_STR: str = "/api/v1"
@@ -15,6 +28,49 @@ class Settings(BaseSettings):
     
     # RSS Feed
     RSS_FETCH_INTERVAL: int = 300  # 5 minutes in seconds
+    RSS_FETCH_CONCURRENCY: int = 32  # Max feeds fetched in parallel
+    RSS_FETCH_PER_HOST_CONCURRENCY: int = 8  # Max parallel fetches against a single host
+    RSS_FETCH_TIMEOUT: int = 30  # Per-request network timeout in seconds
+    RSS_INGEST_WORKERS: int = 4  # Threads that parse and store feeds for async refreshes
+    RSS_PARSE_WORKERS: int = 2  # Processes that run feedparser; 0 parses in-process
+
+    # Refresh scheduler
+    RSS_SCHEDULER_ENABLED: bool = True
+    RSS_MIN_FETCH_INTERVAL: int = 60  # Floor for feeds that update often
+    RSS_MAX_FETCH_INTERVAL: int = 3600  # Ceiling for quiet feeds
+    RSS_SCHEDULER_JITTER: float = 0.1  # +/- fraction applied to every interval
+
+    # Live entry stream
+    STREAM_QUEUE_SIZE: int = 1000  # Entries buffered per subscriber before it is evicted
+    STREAM_MAX_SUBSCRIBERS: int = 1000
+    STREAM_HEARTBEAT_INTERVAL: int = 15  # Seconds between keep-alives on an idle stream
+
+    # Response cache for feed and entry list routes
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Total size before LRU eviction
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024  # Larger responses are not cached
+    RESPONSE_CACHE_TTL: int = 10  # Seconds; bounds staleness from other workers' writes, 0 never expires
+
+    # Entry content storage
+    ENTRY_CONTENT_COMPRESSION: bool = False  # Store new content deflated against the trained dictionary
+    ENTRY_CONTENT_COMPRESSION_LEVEL: int = 6  # zlib level, 1 (fastest) to 9 (smallest)
+
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True  # Also times every request and SQL statement
+
+    # Health prober; /health serves its last results
+    HEALTH_PROBE_INTERVAL: int = 15  # Seconds between probe rounds
+    HEALTH_PROBE_TIMEOUT: int = 10  # Network timeout for the RSS probe
+    HEALTH_PROBE_RSS_URL: str = "https://news.google.com/rss"  # Empty disables the RSS probe
+
+    # Retention of unbookmarked entries; with both limits at 0 nothing is deleted
+    RETENTION_MAX_AGE_DAYS: int = 0  # Delete entries published longer ago than this
+    RETENTION_MAX_ENTRIES_PER_FEED: int = 0  # Keep only this many newest entries per feed
+    RETENTION_KEEP_UNREAD: bool = False  # Never delete entries that haven't been read
+    RETENTION_INTERVAL: int = 3600  # Seconds between background runs
+    RETENTION_BATCH_SIZE: int = 500  # Entries deleted per transaction
+    RETENTION_BATCH_PAUSE: float = 0.05  # Seconds between batches, so writers get the lock
+    RETENTION_VACUUM_PAGES: int = 0  # Pages released per run by incremental vacuum; 0 releases all
     
     class Config:
         env_file = ".env"
@@ -1,18 +1,123 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect as sa_inspect, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.config import get_settings
+from app.config import Settings, get_settings
 from app.db.base_class import Base  # Import the base class from the new module
+from app.utils.compression import content_codec
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=True
-)
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_memory_db(url: str) -> bool:
+    return is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def engine_options(settings: Settings) -> dict:
+    """create_engine keyword arguments for the configured engine profile"""
+    options = {"echo": settings.DB_ECHO}
+    if not is_memory_db(settings.DATABASE_URL):
+        # In-memory SQLite uses a per-thread singleton pool that can't be sized
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+        )
+    if is_sqlite(settings.DATABASE_URL):
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT / 1000,
+        }
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """Same database through an asyncio driver"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.get_driver_name() != "aiosqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+def apply_sqlite_pragmas(dbapi_connection, settings: Settings) -> None:
+    """Tune a fresh SQLite connection according to the engine profile"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT)}")
+        # Only takes effect before the first table exists, and setting it waits for the
+        # write lock, so leave existing databases alone (they switch with a full VACUUM)
+        cursor.execute("PRAGMA page_count")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"PRAGMA auto_vacuum = {settings.SQLITE_AUTO_VACUUM}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    finally:
+        cursor.close()
+
+
+def _read_content_dictionaries(cursor) -> dict:
+    """{id: data} of the content dictionaries, read through a DB-API cursor"""
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'content_dictionaries'")
+        if cursor.fetchone() is None:
+            return {}
+        cursor.execute("SELECT id, data FROM content_dictionaries")
+        return {dictionary_id: data for dictionary_id, data in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def register_sqlite_functions(dbapi_connection) -> None:
+    """
+    SQL functions the schema relies on; the search triggers and view call
+    entry_content_text. The dictionaries are loaded before it is registered.
+    One trained since by another process is read through the connection
+    running the statement, never a second connection from inside the callback.
+    Dictionaries are never changed once stored, so the function is
+    deterministic.
+    """
+    content_codec.load(lambda: _read_content_dictionaries(dbapi_connection.cursor()))
+    # Callbacks run on the driver's thread; under aiosqlite that is the
+    # worker thread that owns the plain sqlite3 connection
+    driver_connection = getattr(dbapi_connection, "driver_connection", dbapi_connection)
+    sqlite_connection = getattr(driver_connection, "_conn", driver_connection)
+
+    def load_dictionaries() -> dict:
+        return _read_content_dictionaries(sqlite_connection.cursor())
+
+    dbapi_connection.create_function(
+        "entry_content_text", 1, lambda value: content_codec.decompress(value, load_dictionaries), deterministic=True
+    )
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings))
+
+if is_sqlite(settings.DATABASE_URL):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, settings)
+        register_sqlite_functions(dbapi_connection)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), **engine_options(settings))
+
+if is_sqlite(settings.DATABASE_URL):
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_async_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, settings)
+        register_sqlite_functions(dbapi_connection)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -20,5 +125,24 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Import all models here
-from app.models.feed import Feed  # Import models after Base is defined
\ No newline at end of file
+from app.models.feed import Feed  # Import models after Base is defined
+from app.models.entry import Entry
+from app.models.feed_stats import FeedStats
+from app.models.content_dictionary import ContentDictionary
+from app.models.service_lease import ServiceLease
+from app.db import search_index  # Registers the entry FTS table with create_all
+
+
+def _load_content_dictionaries() -> dict:
+    with engine.connect() as connection:
+        if not sa_inspect(connection).has_table(ContentDictionary.__tablename__):
+            return {}
+        rows = connection.execute(select(ContentDictionary.id, ContentDictionary.data)).all()
+    return {dictionary_id: data for dictionary_id, data in rows}
+
+content_codec.loader = _load_content_dictionaries
@@ -0,0 +1,64 @@
+"""
+Schema upgrades at startup.
+
+Runs the Alembic migrations under migrations/ on the application engine,
+so the connect hooks (pragmas, entry_content_text) apply. Alembic is
+imported on first use, keeping it out of `import app.main`.
+"""
+import os
+from typing import Optional
+import logging
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "migrations")
+
+
+def _alembic_config(connection):
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["connection"] = connection
+    config.attributes["configure_logging"] = False
+    return config
+
+
+def _head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    config = _alembic_config(None)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def _current_revision(connection) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def upgrade_to_head(engine: Engine) -> Optional[str]:
+    """
+    Apply pending migrations. Returns the revision the database was
+    upgraded from ("base" for a new one), or None when it was current.
+    """
+    head = _head_revision()
+    with engine.connect() as connection:
+        if _current_revision(connection) == head:
+            return None
+
+    from alembic import command
+
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            # Take the write lock before reading the version, so workers
+            # starting together run the migrations once, one after another
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        current = _current_revision(connection)
+        if current == head:
+            return None
+        logger.info(f"Upgrading database schema from {current or 'base'} to {head}")
+        command.upgrade(_alembic_config(connection), "head")
+    return current or "base"
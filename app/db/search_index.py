@@ -0,0 +1,99 @@
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+import logging
+
+from app.models.entry import Entry
+
+logger = logging.getLogger(__name__)
+
+ENTRY_FTS_TABLE = "entries_fts"
+ENTRY_FTS_SOURCE = "entries_fts_source"
+
+# FTS5 index over entry text, keyed by entries.rowid and kept in sync by
+# triggers so every write path (ingest, updates, cascades, deletes) is covered.
+# The index is external-content: it stores only the inverted index, and
+# reads column text (for highlight and snippet) back from a view over
+# entries, so compressed content isn't kept a second time uncompressed.
+# Content goes through entry_content_text so compressed rows index as text,
+# and re-storing the same text in another form leaves the index alone.
+# Removing a row from an external-content index takes the exact values it
+# was indexed with, hence the 'delete' inserts with the old row.
+ENTRY_FTS_DDL = [
+    f"""
+    CREATE VIEW IF NOT EXISTS {ENTRY_FTS_SOURCE} AS
+    SELECT rowid AS entry_rowid, title, entry_content_text(content) AS content, publisher FROM entries
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {ENTRY_FTS_TABLE} USING fts5(
+        title, content, publisher,
+        content = '{ENTRY_FTS_SOURCE}', content_rowid = 'entry_rowid',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS entries_fts_ai AFTER INSERT ON entries BEGIN
+        INSERT INTO {ENTRY_FTS_TABLE}(rowid, title, content, publisher)
+        VALUES (new.rowid, new.title, entry_content_text(new.content), new.publisher);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS entries_fts_ad AFTER DELETE ON entries BEGIN
+        INSERT INTO {ENTRY_FTS_TABLE}({ENTRY_FTS_TABLE}, rowid, title, content, publisher)
+        VALUES ('delete', old.rowid, old.title, entry_content_text(old.content), old.publisher);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS entries_fts_au AFTER UPDATE OF title, content, publisher ON entries
+    WHEN old.title IS NOT new.title OR old.publisher IS NOT new.publisher
+        OR entry_content_text(old.content) IS NOT entry_content_text(new.content)
+    BEGIN
+        INSERT INTO {ENTRY_FTS_TABLE}({ENTRY_FTS_TABLE}, rowid, title, content, publisher)
+        VALUES ('delete', old.rowid, old.title, entry_content_text(old.content), old.publisher);
+        INSERT INTO {ENTRY_FTS_TABLE}(rowid, title, content, publisher)
+        VALUES (new.rowid, new.title, entry_content_text(new.content), new.publisher);
+    END
+    """,
+]
+
+
+def rebuild_entry_search_index(connection: Connection) -> None:
+    """
+    Repopulate the index from entries.
+    Needed after a full VACUUM, which may renumber the rowids of entries.
+    """
+    connection.execute(text(f"INSERT INTO {ENTRY_FTS_TABLE}({ENTRY_FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def ensure_entry_search_index(connection: Connection) -> None:
+    """Create the FTS table and triggers if missing, backfilling existing entries"""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": ENTRY_FTS_TABLE}
+    ).first()
+    for ddl in ENTRY_FTS_DDL:
+        connection.execute(text(ddl))
+    if not exists:
+        logger.info("Building entry full-text search index")
+        rebuild_entry_search_index(connection)
+
+
+@event.listens_for(Entry.__table__, "after_create")
+def _create_entry_search_index(target, connection, **kw):
+    ensure_entry_search_index(connection)
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression: every term is quoted
+    (so FTS syntax characters are literal) and terms are ANDed. A trailing
+    '*' on a term is kept as a prefix search.
+    """
+    terms = []
+    for token in query.split():
+        prefix = token.endswith("*")
+        token = token.rstrip("*")
+        if not token:
+            continue
+        quoted = '"' + token.replace('"', '""') + '"'
+        terms.append(quoted + ("*" if prefix else ""))
+    return " ".join(terms)
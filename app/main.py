@@ -1,51 +1,103 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.config import get_settings
-from app.db.base import Base, engine
-from app.api.routes import router
+from app.db.base import async_engine, engine, SessionLocal
+from app.db.migrate import upgrade_to_head
+from app.api.routes import metrics_router, router
+from app.services.scheduler_service import feed_scheduler
+from app.services.entry_service import EntryService
+from app.services.stream_service import entry_hub
+from app.services.rss_service import parse_pool
+from app.services.retention_service import retention_job
+from app.services.health_service import health_prober
 import logging
 from logging.handlers import RotatingFileHandler
 import os
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.middleware import MetricsMiddleware, ResponseCacheMiddleware
+from app.services.cache_service import response_cache
+from app.services.metrics_service import instrument_engine
+from app.utils.compression import content_codec
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+def configure_logging():
+    # Create logs directory if it doesn't exist
+    os.makedirs('logs', exist_ok=True)
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            RotatingFileHandler(
+                'logs/app.log',
+                maxBytes=1024 * 1024,
+                backupCount=5
+            )
+        ]
+    )
+
+    # Set specific log levels for different loggers
+    logging.getLogger('sqlalchemy.engine').setLevel(
+        logging.INFO if get_settings().DB_ECHO else logging.WARNING
+    )  # SQL statement logging only when DB_ECHO is enabled
+    logging.getLogger('app').setLevel(logging.INFO)  # Ensure app logs are captured
+    logging.getLogger('uvicorn').setLevel(logging.INFO)  # For uvicorn logs
+    logging.getLogger('fastapi').setLevel(logging.INFO)  # For FastAPI logs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work lives here rather than at import time, so importing the
+    # app (workers, tests, scripts) stays cheap and touches no files
+    configure_logging()
+    if get_settings().DB_MIGRATE_ON_STARTUP:
+        upgrade_to_head(engine)
+    db = SessionLocal()
+    try:
+        EntryService(db).ensure_feed_stats()
+    finally:
+        db.close()
+    content_codec.load()
+    health_prober.start()
+    if get_settings().RSS_SCHEDULER_ENABLED:
+        feed_scheduler.start()
+    if retention_job.enabled:
+        retention_job.start()
+    yield
+    entry_hub.close()
+    feed_scheduler.stop()
+    retention_job.stop()
+    health_prober.stop()
+    parse_pool.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
     title=get_settings().PROJECT_NAME,
-    openapi_url=f"{get_settings().API_V1_STR}/openapi.json"
+    openapi_url=f"{get_settings().API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
+# Added before CORS so it sits inside it and never caches per-origin headers
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache, prefix=get_settings().API_V1_STR)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Cache"],
 )
 
+if get_settings().METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    # Outermost, so cache hits and CORS preflights are timed too
+    app.add_middleware(MetricsMiddleware, routes=router.routes, prefix=get_settings().API_V1_STR)
+
 # Include routers
 app.include_router(router, prefix=get_settings().API_V1_STR)
-
-# Create logs directory if it doesn't exist
-os.makedirs('logs', exist_ok=True)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        RotatingFileHandler(
-            'logs/app.log',
-            maxBytes=1024 * 1024,
-            backupCount=5
-        )
-    ]
-)
-
-# Set specific log levels for different loggers
-logging.getLogger('sqlalchemy.engine').setLevel(logging.DEBUG)  # Reduce SQLAlchemy logging
-logging.getLogger('app').setLevel(logging.INFO)  # Ensure app logs are captured
-logging.getLogger('uvicorn').setLevel(logging.INFO)  # For uvicorn logs
-logging.getLogger('fastapi').setLevel(logging.INFO)  # For FastAPI logs
\ No newline at end of file
+if get_settings().METRICS_ENABLED:
+    app.include_router(metrics_router)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, LargeBinary, DateTime
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class ContentDictionary(Base):
+    """
+    Preset dictionaries for compressed entry content. Compressed values
+    refer to one by id, so rows are only ever added
+    """
+    __tablename__ = "content_dictionaries"
+
+    id = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    samples = Column(Integer, nullable=False, default=0)  # entries it was trained on
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ContentDictionary {self.id}: {len(self.data)} bytes>"
@@ -1,21 +1,29 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 from app.db.base_class import Base
+from app.models.feed import CompressedText
 
 class Entry(Base):
     __tablename__ = "entries"
+    __table_args__ = (
+        # List queries filter on one of these and page by (published_at, id)
+        Index("ix_entries_published_at_id", "published_at", "id"),
+        Index("ix_entries_feed_id_published_at", "feed_id", "published_at", "id"),
+        Index("ix_entries_is_bookmarked_published_at", "is_bookmarked", "published_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, nullable=False)
-    content = Column(Text, nullable=True)
-    link = Column(String, nullable=False)
-    published_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    content = Column(CompressedText, nullable=True)
+    link = Column(String, nullable=False, unique=True, index=True)  # canonical link
+    published_at = Column(DateTime(timezone=True), nullable=False)
     updated_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     feed_id = Column(String(36), ForeignKey("feeds.id"), nullable=False)
     publisher = Column(String, nullable=True)
+    content_hash = Column(String(32), nullable=True)  # entry_content_hash of title, content, updated_at
     is_read = Column(Boolean, default=False)
     is_bookmarked = Column(Boolean, default=False)
 
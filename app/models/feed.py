@@ -1,9 +1,10 @@
-from sqlalchemy import Column, String, DateTime, TypeDecorator
+from sqlalchemy import Column, String, DateTime, Text, TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 from app.db.base_class import Base
 from pydantic import HttpUrl, ValidationError
+from app.utils.compression import content_codec
 
 class URLType(TypeDecorator):
     """Custom SQLAlchemy type for URLs with validation"""
@@ -22,6 +23,23 @@ class URLType(TypeDecorator):
         """Keep as string when reading from DB"""
         return value
 
+class CompressedText(TypeDecorator):
+    """
+    Text stored compressed by content_codec when ENTRY_CONTENT_COMPRESSION
+    is on. Reads accept both compressed blobs and plain text, so rows
+    convert one at a time (see scripts/compress_content.py)
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        """Compress before storing in DB"""
+        return content_codec.compress(value)
+
+    def process_result_value(self, value, dialect):
+        """Always hand back text"""
+        return content_codec.decompress(value)
+
 class Feed(Base):
     __tablename__ = "feeds"
 
@@ -30,10 +48,16 @@ class Feed(Base):
     keyword = Column(String(100), nullable=False, index=True)
     name = Column(String(100), nullable=True)
     last_fetched = Column(DateTime(timezone=True), nullable=True)
+    # HTTP validators from the last successful fetch, sent back on the next one
+    etag = Column(String, nullable=True)
+    modified = Column(String, nullable=True)
+    # Digest of the last fetched body, used when the server sends no validators
+    content_hash = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationship with entries
     entries = relationship("Entry", back_populates="feed", cascade="all, delete-orphan")
+    stats = relationship("FeedStats", back_populates="feed", uselist=False, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Feed {self.keyword}>"
\ No newline at end of file
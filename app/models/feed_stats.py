@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+
+class FeedStats(Base):
+    """
+    Entry counters per feed, maintained incrementally on ingest and status
+    updates so list endpoints don't need COUNT(*) over entries
+    """
+    __tablename__ = "feed_stats"
+
+    feed_id = Column(String(36), ForeignKey("feeds.id", ondelete="CASCADE"), primary_key=True)
+    total_entries = Column(Integer, nullable=False, default=0)
+    unread_entries = Column(Integer, nullable=False, default=0)
+    bookmarked_entries = Column(Integer, nullable=False, default=0)
+
+    feed = relationship("Feed", back_populates="stats")
+
+    def __repr__(self):
+        return f"<FeedStats {self.feed_id}: {self.total_entries}>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, String
+from app.db.base_class import Base
+
+class ServiceLease(Base):
+    """
+    A named lease on a background job. Every worker process starts the job;
+    only the one holding an unexpired lease runs it, renewing as it goes
+    """
+    __tablename__ = "service_leases"
+
+    name = Column(String(64), primary_key=True)
+    owner = Column(String(64), nullable=False)
+    expires_at = Column(Float, nullable=False)  # Unix time
+
+    def __repr__(self):
+        return f"<ServiceLease {self.name}: {self.owner}>"
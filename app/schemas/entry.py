@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
 
@@ -16,6 +16,22 @@ class EntryStatus(BaseModel):
     read: bool = False
     bookmarked: bool = False
 
+class BulkEntryStatusUpdate(BaseModel):
+    """
+    Set read and/or bookmarked on many entries at once.
+    Entries are selected by entry_ids, by the filters, or both (ANDed);
+    fields left unset are not changed.
+    """
+    entry_ids: Optional[List[str]] = Field(None, max_length=5000)
+    feed_id: Optional[str] = None
+    keywords: Optional[List[str]] = None
+    published_before: Optional[datetime] = None
+    read: Optional[bool] = None
+    bookmarked: Optional[bool] = None
+
+class BulkEntryStatusResult(BaseModel):
+    updated: int
+
 class EntryCreate(EntryBase):
     feed_id: str
 
@@ -27,10 +43,35 @@ class Entry(EntryBase):
     class Config:
         from_attributes = True
 
+# Fields list endpoints can return; content only when asked for with fields=
+ENTRY_LIST_FIELDS = tuple(Entry.model_fields)
+DEFAULT_ENTRY_LIST_FIELDS = tuple(field for field in ENTRY_LIST_FIELDS if field != "content")
+
+class EntryListItem(BaseModel):
+    """An entry in a list response; fields that weren't selected are left out"""
+    id: Optional[str] = None
+    feed_id: Optional[str] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    link: Optional[str] = None
+    publisher: Optional[str] = None
+    published_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    is_read: Optional[bool] = None
+    is_bookmarked: Optional[bool] = None
+
 class PaginatedEntriesResponse(BaseModel):
-    entries: List[Entry]
+    entries: List[EntryListItem]
     total_count: int
+    next_cursor: Optional[str] = None
 
-    class Config:
-        from_attributes = True
 
+class EntrySearchResult(Entry):
+    rank: float
+    title_highlight: Optional[str] = None
+    snippet: Optional[str] = None
+
+class SearchEntriesResponse(BaseModel):
+    entries: List[EntrySearchResult]
+    total_count: int
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from app.config import get_settings
+from app.services.metrics_service import response_cache_evictions, response_cache_lookups
+
+logger = logging.getLogger(__name__)
+
+# Generation scopes: "feeds" covers feed rows, "entries" covers entry rows,
+# their status and the per-feed counters. Fetch bookkeeping (last_fetched)
+# doesn't bump "feeds"; it shows up once cached responses expire.
+FEEDS = "feeds"
+ENTRIES = "entries"
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+    generation: Tuple[int, ...]
+    expires_at: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered GET responses, bounded by total bytes.
+
+    Every entry records the generation of the scopes it was rendered from;
+    writers bump a scope's generation after they commit, which makes every
+    response depending on it stale without having to find those entries.
+    Generations are per process, so entries also expire after `ttl`
+    seconds: the bound on serving another worker's writes late.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.RESPONSE_CACHE_ENABLED
+        self.max_bytes = settings.RESPONSE_CACHE_MAX_BYTES
+        self.max_entry_bytes = settings.RESPONSE_CACHE_MAX_ENTRY_BYTES
+        self.ttl = settings.RESPONSE_CACHE_TTL
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {FEEDS: 0, ENTRIES: 0}
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+
+    def bump(self, *scopes: str) -> None:
+        """Mark everything rendered from these scopes as stale"""
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def generation(self, scopes: Tuple[str, ...]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(scope, 0) for scope in scopes)
+
+    def get(self, key: tuple, scopes: Tuple[str, ...]) -> Optional[CachedResponse]:
+        with self._lock:
+            cached = self._entries.get(key)
+            current = tuple(self._generations.get(scope, 0) for scope in scopes)
+            if cached is None or cached.generation != current or (self.ttl and time.monotonic() > cached.expires_at):
+                if cached is not None:
+                    self._remove(key)
+                response_cache_lookups.inc(result="miss")
+                return None
+            self._entries.move_to_end(key)
+        response_cache_lookups.inc(result="hit")
+        return cached
+
+    def put(self, key: tuple, response: CachedResponse, scopes: Tuple[str, ...]) -> bool:
+        """Store a response unless it is too large or its scopes changed while it was rendered"""
+        size = response.size
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            current = tuple(self._generations.get(scope, 0) for scope in scopes)
+            if response.generation != current:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            response.expires_at = time.monotonic() + self.ttl
+            self._entries[key] = response
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                response_cache_evictions.inc()
+        return True
+
+    def _remove(self, key: tuple) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+response_cache = ResponseCache()
@@ -1,13 +1,336 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, Integer, String, and_, case, desc, func, literal_column, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models.entry import Entry
-from app.schemas.entry import EntryCreate, EntryStatus
+from app.schemas.entry import (
+    DEFAULT_ENTRY_LIST_FIELDS, ENTRY_LIST_FIELDS, BulkEntryStatusUpdate, EntryCreate, EntryStatus
+)
 from fastapi import HTTPException
-from typing import List, Optional
-from datetime import datetime
-from app.models.feed import Feed
+from typing import Iterator, List, Optional, Union
+from datetime import datetime, timezone
+from app.models.feed_stats import FeedStats
+from app.services.feed_service import keyword_index
+from app.services.stream_service import entry_hub
+from app.services.cache_service import ENTRIES, response_cache
+from app.services.metrics_service import ingest_batches, ingest_entries
+from app.db.search_index import ENTRY_FTS_TABLE, build_match_query
 from sqlalchemy import or_
+from app.utils.helpers import canonical_link, chunked, decode_cursor, encode_cursor, entry_content_hash
+from collections import defaultdict
+import csv
+import io
+import json
 import logging
+import uuid
+
+# Max links per IN (...) lookup, well below SQLite's bound parameter limit
+LINK_LOOKUP_CHUNK_SIZE = 500
+
+# Rows fetched per round trip (and emitted per response chunk) by exports
+EXPORT_BATCH_SIZE = 2000
+EXPORT_FORMATS = ("ndjson", "csv")
+
+def _iso_text(column):
+    """
+    A SQLite DateTime column as the ISO 8601 text it is stored as, which
+    skips parsing every value into a datetime just to format it again
+    """
+    return func.replace(column, " ", "T").label(column.key)
+
+
+EXPORT_COLUMNS = (
+    Entry.id, Entry.feed_id, Entry.title, Entry.content, Entry.link, Entry.publisher,
+    _iso_text(Entry.published_at), _iso_text(Entry.updated_at), _iso_text(Entry.created_at),
+    Entry.is_read, Entry.is_bookmarked,
+)
+_json_line = json.JSONEncoder(ensure_ascii=False, check_circular=False).encode
+
+class EntryRecord:
+    """
+    Lightweight, unvalidated entry row for trusted bulk ingest.
+    create_entries_batch accepts these as well as EntryCreate; they skip
+    pydantic validation and dumping, which dominates at feed sizes.
+    Dates may be None when the feed gave none.
+    """
+    __slots__ = (
+        "title", "content", "link", "publisher", "published_at", "updated_at",
+        "feed_id", "is_read", "is_bookmarked",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        content: str,
+        link: str,
+        publisher: Optional[str],
+        published_at: Optional[datetime],
+        updated_at: Optional[datetime],
+        feed_id: str,
+        is_read: bool = False,
+        is_bookmarked: bool = False
+    ):
+        self.title = title
+        self.content = content
+        self.link = link
+        self.publisher = publisher
+        self.published_at = published_at
+        self.updated_at = updated_at
+        self.feed_id = feed_id
+        self.is_read = is_read
+        self.is_bookmarked = is_bookmarked
+
+    def to_row(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# Statement builders shared by EntryService and AsyncEntryService
+
+def _list_filters(
+    feed_ids: Optional[List[str]] = None,
+    bookmarked: Optional[bool] = None,
+    feed_id: Optional[str] = None,
+    read: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> list:
+    filters = []
+    if feed_ids is not None:
+        filters.append(Entry.feed_id.in_(feed_ids))
+    if feed_id:
+        filters.append(Entry.feed_id == feed_id)
+    if bookmarked is not None:
+        filters.append(Entry.is_bookmarked == bookmarked)
+    if read is not None:
+        filters.append(Entry.is_read == read)
+    if since is not None:
+        filters.append(Entry.published_at >= _as_utc(since))
+    if until is not None:
+        filters.append(Entry.published_at < _as_utc(until))
+    return filters
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value
+
+
+def _count_stmt(filters: list):
+    return select(func.count()).select_from(Entry).where(*filters)
+
+
+def _counted_total_stmt(feed_ids: Optional[List[str]] = None, bookmarked: bool = False):
+    """Total matching entries served from the maintained feed counters"""
+    column = FeedStats.bookmarked_entries if bookmarked else FeedStats.total_entries
+    stmt = select(func.coalesce(func.sum(column), 0))
+    if feed_ids is not None:
+        stmt = stmt.where(FeedStats.feed_id.in_(feed_ids))
+    return stmt
+
+
+def _entry_fields(fields: Optional[List[str]]) -> tuple:
+    """
+    Validated list fields from a fields= parameter (repeated and/or
+    comma-separated); without one, every field but content
+    """
+    if not fields:
+        return DEFAULT_ENTRY_LIST_FIELDS
+    names = [name.strip() for value in fields for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ENTRY_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown entry fields: {', '.join(unknown)}. Choose from {', '.join(ENTRY_LIST_FIELDS)}"
+        )
+    return tuple(dict.fromkeys(names)) or DEFAULT_ENTRY_LIST_FIELDS
+
+
+def _page_stmt(filters: list, skip: int, limit: int, cursor: Optional[str] = None, fields: Optional[tuple] = None):
+    """
+    Newest-first page of entries.
+    With a cursor the page starts right after the (published_at, id) it
+    encodes, so its cost doesn't depend on depth; otherwise skip is used.
+    One extra row is fetched to tell whether there is a next page.
+    With fields only those columns (plus the cursor's) are loaded.
+    """
+    stmt = select(Entry).where(*filters).order_by(desc(Entry.published_at), desc(Entry.id))
+    if fields is not None:
+        columns = {Entry.id, Entry.published_at} | {getattr(Entry, field) for field in fields}
+        stmt = stmt.options(load_only(*columns))
+
+    if cursor:
+        try:
+            published_at, entry_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # The leading bound is redundant but lets SQLite seek the
+        # (published_at, id) index instead of filtering it from the top
+        stmt = stmt.where(Entry.published_at <= published_at, or_(
+            Entry.published_at < published_at,
+            and_(Entry.published_at == published_at, Entry.id < entry_id)
+        ))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    return stmt.limit(limit + 1)
+
+
+def _split_page(rows: List[Entry], limit: int, fields: Optional[tuple] = None):
+    """
+    Returns (entries, next_cursor) from a _page_stmt result; with fields
+    the entries are dicts of just those fields
+    """
+    entries = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and entries:
+        next_cursor = encode_cursor(entries[-1].published_at, entries[-1].id)
+    if fields is not None:
+        # Never touches an unloaded attribute, which would lazy-load it
+        entries = [{field: getattr(entry, field) for field in fields} for entry in entries]
+    return entries, next_cursor
+
+
+def _stats_delta_stmt(feed_id: str, total: int = 0, unread: int = 0, bookmarked: int = 0):
+    stmt = sqlite_insert(FeedStats).values(
+        feed_id=feed_id,
+        total_entries=total,
+        unread_entries=unread,
+        bookmarked_entries=bookmarked
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[FeedStats.feed_id],
+        set_={
+            "total_entries": FeedStats.total_entries + stmt.excluded.total_entries,
+            "unread_entries": FeedStats.unread_entries + stmt.excluded.unread_entries,
+            "bookmarked_entries": FeedStats.bookmarked_entries + stmt.excluded.bookmarked_entries,
+        }
+    )
+
+
+def _begin_write(db: Session) -> None:
+    """
+    Take SQLite's write lock before reading the rows a counter delta is
+    derived from. pysqlite only sends BEGIN with the first INSERT, UPDATE or
+    DELETE, so a read before that could be stale by the time it's applied.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("BEGIN IMMEDIATE"))
+
+
+async def _begin_write_async(db: AsyncSession) -> None:
+    """_begin_write for an AsyncSession"""
+    if db.get_bind().dialect.name == "sqlite":
+        await db.execute(text("BEGIN IMMEDIATE"))
+
+
+def _status_deltas(entry: Entry, status: EntryStatus) -> dict:
+    return {
+        "unread": int(bool(entry.is_read)) - int(status.read),
+        "bookmarked": int(status.bookmarked) - int(bool(entry.is_bookmarked)),
+    }
+
+
+def _bulk_status_stmts(filters: list, changes: BulkEntryStatusUpdate):
+    """
+    (deltas, update) statements for a bulk status change.
+    Only rows whose flags actually change are touched; deltas counts them
+    per feed so the feed counters can be adjusted in the same transaction;
+    run them after _begin_write so no other writer gets in between.
+    """
+    values = {}
+    changed = []
+    delta_columns = []
+    for name, column in (("read", Entry.is_read), ("bookmarked", Entry.is_bookmarked)):
+        value = getattr(changes, name)
+        if value is None:
+            delta_columns.append(literal_column("0"))
+            continue
+        differs = func.coalesce(column, False) != value
+        values[column.key] = value
+        changed.append(differs)
+        delta_columns.append(func.sum(case((differs, 1), else_=0)))
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update: set read and/or bookmarked")
+
+    filters = filters + [or_(*changed)]
+    deltas_stmt = select(Entry.feed_id, *delta_columns).where(*filters).group_by(Entry.feed_id)
+    update_stmt = update(Entry).where(*filters).values(**values)\
+        .execution_options(synchronize_session=False)
+    return deltas_stmt, update_stmt
+
+
+def _bulk_stats_deltas(changes: BulkEntryStatusUpdate, read_changed: int, bookmarked_changed: int) -> dict:
+    return {
+        "unread": -read_changed if changes.read else read_changed,
+        "bookmarked": bookmarked_changed if changes.bookmarked else -bookmarked_changed,
+    }
+
+
+def _bulk_filters(changes: BulkEntryStatusUpdate, feed_ids: Optional[List[str]]) -> list:
+    filters = _list_filters(feed_ids, feed_id=changes.feed_id, until=changes.published_before)
+    if changes.entry_ids is not None:
+        filters.append(Entry.id.in_(changes.entry_ids))
+    return filters
+
+
+def _ndjson_chunk(names: List[str], rows) -> str:
+    return "".join([_json_line(dict(zip(names, row))) + "\n" for row in rows])
+
+
+def _csv_chunk(rows, header: Optional[List[str]] = None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _search_stmts(q: str, filters: list, skip: int, limit: int):
+    """
+    (count, page) statements for a full-text search.
+    Best bm25 matches first (title weighted highest), with highlighted
+    title and content snippet
+    """
+    match_query = build_match_query(q)
+    if not match_query:
+        raise HTTPException(status_code=400, detail="Search query is empty")
+
+    matches = text(
+        f"SELECT rowid AS entry_rowid, "
+        f"bm25({ENTRY_FTS_TABLE}, 10.0, 1.0, 2.0) AS rank, "
+        f"highlight({ENTRY_FTS_TABLE}, 0, '<mark>', '</mark>') AS title_highlight, "
+        f"snippet({ENTRY_FTS_TABLE}, 1, '<mark>', '</mark>', '…', 24) AS snippet "
+        f"FROM {ENTRY_FTS_TABLE} WHERE {ENTRY_FTS_TABLE} MATCH :match_query"
+    ).bindparams(match_query=match_query).columns(
+        entry_rowid=Integer,
+        rank=Float,
+        title_highlight=String,
+        snippet=String
+    ).subquery("matches")
+
+    joined = matches.join(
+        Entry.__table__,
+        literal_column(f"{Entry.__tablename__}.rowid") == matches.c.entry_rowid
+    )
+    count_stmt = select(func.count()).select_from(joined).where(*filters)
+    page_stmt = select(Entry, matches.c.rank, matches.c.title_highlight, matches.c.snippet)\
+        .select_from(joined)\
+        .where(*filters)\
+        .order_by(matches.c.rank)\
+        .offset(skip)\
+        .limit(limit)
+    return count_stmt, page_stmt
+
+
+def _search_results(rows) -> List[Entry]:
+    entries = []
+    for entry, rank, title_highlight, snippet in rows:
+        entry.rank = rank
+        entry.title_highlight = title_highlight
+        entry.snippet = snippet
+        entries.append(entry)
+    return entries
+
 
 class EntryService:
     def __init__(self, db: Session):
@@ -16,13 +339,22 @@ class EntryService:
     def create_entry(self, entry: EntryCreate) -> Entry:
         """Create a new entry if it doesn't exist"""
         try:
+            entry_data = entry.model_dump()
+            entry_data["link"] = canonical_link(entry_data["link"])
+
             # Check if entry with same link already exists
-            existing_entry = self.db.query(Entry).filter(Entry.link == entry.link).first()
+            existing_entry = self.db.query(Entry).filter(Entry.link == entry_data["link"]).first()
             if existing_entry:
                 return existing_entry
 
-            db_entry = Entry(**entry.model_dump())
+            db_entry = Entry(**entry_data)
             self.db.add(db_entry)
+            self._bump_stats(
+                db_entry.feed_id,
+                total=1,
+                unread=0 if db_entry.is_read else 1,
+                bookmarked=1 if db_entry.is_bookmarked else 0
+            )
             self.db.commit()
             self.db.refresh(db_entry)
             return db_entry
@@ -30,35 +362,87 @@ class EntryService:
             self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
+    def _bump_stats(self, feed_id: str, total: int = 0, unread: int = 0, bookmarked: int = 0) -> None:
+        """Apply counter deltas for a feed inside the caller's transaction"""
+        if not (total or unread or bookmarked):
+            return
+        self.db.execute(_stats_delta_stmt(feed_id, total=total, unread=unread, bookmarked=bookmarked))
+
+    def rebuild_feed_stats(self) -> int:
+        """Recompute all feed counters from the entries table. Returns feeds counted"""
+        try:
+            rows = self.db.execute(
+                select(
+                    Entry.feed_id,
+                    func.count(),
+                    func.sum(case((Entry.is_read == False, 1), else_=0)),
+                    func.sum(case((Entry.is_bookmarked == True, 1), else_=0))
+                ).group_by(Entry.feed_id)
+            ).all()
+            self.db.query(FeedStats).delete()
+            self.db.add_all([
+                FeedStats(
+                    feed_id=feed_id,
+                    total_entries=total,
+                    unread_entries=unread or 0,
+                    bookmarked_entries=bookmarked or 0
+                )
+                for feed_id, total, unread, bookmarked in rows
+            ])
+            self.db.commit()
+            response_cache.bump(ENTRIES)
+            return len(rows)
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def ensure_feed_stats(self) -> None:
+        """Build the counters once for databases that predate them"""
+        has_stats = self.db.query(FeedStats.feed_id).first() is not None
+        has_entries = self.db.query(Entry.id).first() is not None
+        if has_entries and not has_stats:
+            logging.info("Feed counters missing, rebuilding from entries")
+            self.rebuild_feed_stats()
+
+    def _keyword_feed_ids(self, keywords: Optional[List[str]]) -> Optional[List[str]]:
+        """Resolve a keyword filter to feed ids, None when there is no filter"""
+        if not keywords:
+            return None
+        return keyword_index.resolve(self.db, keywords)
+
     def get_entries(
         self,
         skip: int = 0,
         limit: int = 10,
-        keywords: Optional[List[str]] = None
-    ) -> List[Entry]:
+        keywords: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        exact: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> dict:
         """
         Get entries with optional keyword filtering
         Returns newest entries first
+        total_count comes from the feed counters unless exact is set
+        Entries carry the requested fields; content only when asked for
         """
-        query = self.db.query(Entry)
-
-        if keywords:
-            query = query.join(Feed)
-            keyword_filters = [Feed.keyword.ilike(f"%{keyword}%") for keyword in keywords]
-            query = query.filter(or_(*keyword_filters))
+        fields = _entry_fields(fields)
+        feed_ids = self._keyword_feed_ids(keywords)
+        filters = _list_filters(feed_ids)
 
-        total_count = query.count()
-        query = query.order_by(desc(Entry.published_at))
-        entries = query.offset(skip).limit(limit).all()
+        count_stmt = _count_stmt(filters) if exact else _counted_total_stmt(feed_ids)
+        total_count = self.db.scalar(count_stmt)
+        rows = self.db.scalars(_page_stmt(filters, skip, limit, cursor, fields)).all()
+        entries, next_cursor = _split_page(rows, limit, fields)
 
         return {
             "entries": entries,
-            "total_count": total_count
+            "total_count": total_count,
+            "next_cursor": next_cursor
         }
 
     def get_entry(self, entry_id: str) -> Entry:
         """Get a specific entry by ID"""
-        entry = self.db.query(Entry).filter(Entry.id == entry_id).first()
+        entry = self.db.get(Entry, entry_id)
         if not entry:
             raise HTTPException(status_code=404, detail="Entry not found")
         return entry
@@ -67,54 +451,159 @@ class EntryService:
         self,
         skip: int = 0,
         limit: int = 10,
-        keywords: Optional[List[str]] = None
-    ) -> List[Entry]:
+        keywords: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        exact: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> dict:
         """
         Get bookmarked entries with optional keyword filtering
         Returns newest entries first
+        total_count comes from the feed counters unless exact is set
+        Entries carry the requested fields; content only when asked for
         """
-        query = self.db.query(Entry)
+        fields = _entry_fields(fields)
+        feed_ids = self._keyword_feed_ids(keywords)
+        filters = _list_filters(feed_ids, bookmarked=True)
+
+        count_stmt = _count_stmt(filters) if exact else _counted_total_stmt(feed_ids, bookmarked=True)
+        total_count = self.db.scalar(count_stmt)
+        rows = self.db.scalars(_page_stmt(filters, skip, limit, cursor, fields)).all()
+        entries, next_cursor = _split_page(rows, limit, fields)
 
-        # Filter for bookmarked entries
-        query = query.filter(Entry.is_bookmarked == True)
+        logging.debug(f"bookmarked entries: {len(entries)}")
 
-        if keywords:
-            query = query.join(Feed)
-            keyword_filters = [Feed.keyword.ilike(f"%{keyword}%") for keyword in keywords]
-            query = query.filter(or_(*keyword_filters))
+        return {
+            "entries": entries,
+            "total_count": total_count,
+            "next_cursor": next_cursor
+        }
 
-        total_count = query.count()
-        query = query.order_by(desc(Entry.published_at))
-        entries = query.offset(skip).limit(limit).all()
 
-        logging.info(f"bookmarked entries: {entries}")
+    def search_entries(
+        self,
+        q: str,
+        skip: int = 0,
+        limit: int = 10,
+        keywords: Optional[List[str]] = None,
+        bookmarked: Optional[bool] = None,
+        feed_id: Optional[str] = None
+    ) -> dict:
+        """Full-text search over entry title, content and publisher"""
+        filters = _list_filters(self._keyword_feed_ids(keywords), bookmarked=bookmarked, feed_id=feed_id)
+        count_stmt, page_stmt = _search_stmts(q, filters, skip, limit)
+        try:
+            total_count = self.db.scalar(count_stmt)
+            rows = self.db.execute(page_stmt).all()
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid search query: {str(e)}")
 
         return {
-            "entries": entries,
+            "entries": _search_results(rows),
             "total_count": total_count
         }
 
-
-    def create_entries_batch(self, entries: List[EntryCreate]) -> List[Entry]:
-        """Create multiple entries at once, skipping existing ones"""
+    def create_entries_batch(self, entries: List[Union[EntryCreate, EntryRecord]]) -> dict:
+        """
+        Create multiple entries at once, refreshing changed ones.
+        Links are canonicalized and checked against the table with one IN (...)
+        lookup per chunk. Known links whose content hash is unchanged are
+        skipped without a write; changed ones get their title, content and
+        updated_at rewritten. New links are written with INSERT ... ON
+        CONFLICT DO NOTHING so a concurrent writer can't make the batch fail.
+        Returns {"inserted": [row dicts], "updated": [links], "skipped": [links]}
+        """
         try:
-            created_entries = []
+            rows = {}
+            skipped = []
+            now = datetime.now(timezone.utc)
             for entry_data in entries:
-                # Check if entry already exists
-                existing_entry = self.db.query(Entry).filter(
-                    Entry.link == entry_data.link
-                ).first()
-                
-                if existing_entry:
-                    created_entries.append(existing_entry)
+                row = entry_data.to_row() if isinstance(entry_data, EntryRecord) else entry_data.model_dump()
+                row["link"] = canonical_link(row["link"])
+                if row["link"] in rows:
+                    skipped.append(row["link"])
                     continue
+                # Hash only the dates the feed supplied, so an undated item
+                # doesn't look changed on every fetch
+                row["content_hash"] = entry_content_hash(row["title"], row["content"], row["updated_at"])
+                if row["published_at"] is None:
+                    row["published_at"] = now
+                if row["updated_at"] is None:
+                    row["updated_at"] = row["published_at"]
+                rows[row["link"]] = row
 
-                db_entry = Entry(**entry_data.model_dump())
-                self.db.add(db_entry)
-                created_entries.append(db_entry)
+            existing = {}
+            for links in chunked(rows.keys(), LINK_LOOKUP_CHUNK_SIZE):
+                existing.update(
+                    (link, (entry_id, content_hash))
+                    for link, entry_id, content_hash in self.db.execute(
+                        select(Entry.link, Entry.id, Entry.content_hash).where(Entry.link.in_(links))
+                    )
+                )
+
+            to_insert = []
+            to_update = []
+            updated = []
+            for link, row in rows.items():
+                if link in existing:
+                    entry_id, content_hash = existing[link]
+                    if content_hash == row["content_hash"]:
+                        skipped.append(link)
+                    else:
+                        to_update.append({
+                            "id": entry_id,
+                            "title": row["title"],
+                            "content": row["content"],
+                            "updated_at": row["updated_at"],
+                            "content_hash": row["content_hash"],
+                        })
+                        updated.append(link)
+                    continue
+                row["id"] = str(uuid.uuid4())
+                to_insert.append(row)
+
+            if to_update:
+                # Bulk UPDATE by primary key, one executemany
+                self.db.execute(update(Entry), to_update)
+
+            inserted = []
+            if to_insert:
+                stmt = sqlite_insert(Entry)\
+                    .on_conflict_do_nothing(index_elements=[Entry.link])\
+                    .returning(Entry.id, Entry.created_at)
+                created = dict(self.db.execute(stmt, to_insert).all())
+                for row in to_insert:
+                    if row["id"] in created:
+                        row["created_at"] = created[row["id"]]
+                        inserted.append(row)
+                    else:
+                        # Lost a race with another writer for the same link
+                        skipped.append(row["link"])
+
+            deltas = defaultdict(lambda: [0, 0, 0])
+            for row in inserted:
+                delta = deltas[row["feed_id"]]
+                delta[0] += 1
+                delta[1] += 0 if row["is_read"] else 1
+                delta[2] += 1 if row["is_bookmarked"] else 0
+            for feed_id, (total, unread, bookmarked) in deltas.items():
+                self._bump_stats(feed_id, total=total, unread=unread, bookmarked=bookmarked)
 
             self.db.commit()
-            return created_entries
+            ingest_batches.inc()
+            ingest_entries.inc(len(entries), outcome="seen")
+            ingest_entries.inc(len(inserted), outcome="inserted")
+            ingest_entries.inc(len(updated), outcome="updated")
+            ingest_entries.inc(len(skipped), outcome="skipped")
+            if inserted or to_update:
+                response_cache.bump(ENTRIES)
+            if inserted:
+                entry_hub.publish(inserted, self.db)
+            return {
+                "inserted": inserted,
+                "updated": updated,
+                "skipped": skipped
+            }
         except Exception as e:
             self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
@@ -123,15 +612,18 @@ class EntryService:
         self,
         feed_id: str,
         skip: int = 0,
-        limit: int = 10
-    ) -> List[Entry]:
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> dict:
         """Get entries for a specific feed"""
-        return self.db.query(Entry)\
-            .filter(Entry.feed_id == feed_id)\
-            .order_by(desc(Entry.published_at))\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        fields = _entry_fields(fields)
+        rows = self.db.scalars(_page_stmt(_list_filters(feed_id=feed_id), skip, limit, cursor, fields)).all()
+        entries, next_cursor = _split_page(rows, limit, fields)
+        return {
+            "entries": entries,
+            "next_cursor": next_cursor
+        }
 
     def count_entries(self, feed_id: Optional[str] = None) -> int:
         """Count total entries, optionally for a specific feed"""
@@ -140,11 +632,225 @@ class EntryService:
             query = query.filter(Entry.feed_id == feed_id)
         return query.count()
     
+    def export_entries(
+        self,
+        fmt: str = "ndjson",
+        feed_id: Optional[str] = None,
+        keywords: Optional[List[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        bookmarked: Optional[bool] = None,
+        read: Optional[bool] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[str]:
+        """
+        Stream every matching entry, newest first, as NDJSON lines or CSV.
+        Rows are read as plain tuples through a server-side cursor
+        (yield_per) in batch_size partitions, so memory use doesn't grow
+        with the export.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported export format: {fmt}")
+        filters = _list_filters(
+            self._keyword_feed_ids(keywords), bookmarked, feed_id, read=read, since=since, until=until
+        )
+        stmt = select(*EXPORT_COLUMNS).where(*filters)\
+            .order_by(desc(Entry.published_at), desc(Entry.id))
+        return self._stream_export(stmt, fmt, batch_size)
+
+    def _stream_export(self, stmt, fmt: str, batch_size: int) -> Iterator[str]:
+        names = [column.key for column in EXPORT_COLUMNS]
+        # Executed on the Core connection: plain column rows don't need the ORM loading layer
+        result = self.db.connection().execution_options(yield_per=batch_size).execute(stmt)
+        try:
+            if fmt == "csv":
+                yield _csv_chunk([], header=names)
+            for rows in result.partitions():
+                yield _ndjson_chunk(names, rows) if fmt == "ndjson" else _csv_chunk(rows)
+        finally:
+            result.close()
+
     def update_entry_status(self, entry_id: str, status: EntryStatus) -> Entry:
         """Update the status of an entry"""
-        entry = self.get_entry(entry_id)
+        _begin_write(self.db)
+        try:
+            entry = self.get_entry(entry_id)
+        except HTTPException:
+            self.db.rollback()
+            raise
         logging.info(f"Updating entry status: {entry_id} - {status}")
+        self._bump_stats(entry.feed_id, **_status_deltas(entry, status))
         entry.is_read = status.read
         entry.is_bookmarked = status.bookmarked
         self.db.commit()
-        return entry
\ No newline at end of file
+        response_cache.bump(ENTRIES)
+        return entry
+
+    def update_entries_status(self, changes: BulkEntryStatusUpdate) -> int:
+        """
+        Apply one read/bookmark change to every selected entry with a single
+        UPDATE and commit. Returns the number of entries changed.
+        """
+        feed_ids = self._keyword_feed_ids(changes.keywords)
+        deltas_stmt, update_stmt = _bulk_status_stmts(_bulk_filters(changes, feed_ids), changes)
+        try:
+            _begin_write(self.db)
+            for feed_id, read_changed, bookmarked_changed in self.db.execute(deltas_stmt).all():
+                self._bump_stats(feed_id, **_bulk_stats_deltas(changes, read_changed, bookmarked_changed))
+            updated = self.db.execute(update_stmt).rowcount
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+        if updated:
+            response_cache.bump(ENTRIES)
+        logging.info(f"Bulk status update changed {updated} entries")
+        return updated
+
+
+class AsyncEntryService:
+    """Read-path and status counterpart of EntryService for AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _keyword_feed_ids(self, keywords: Optional[List[str]]) -> Optional[List[str]]:
+        if not keywords:
+            return None
+        return await keyword_index.resolve_async(self.db, keywords)
+
+    async def get_entries(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        keywords: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        exact: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> dict:
+        """Async EntryService.get_entries"""
+        fields = _entry_fields(fields)
+        feed_ids = await self._keyword_feed_ids(keywords)
+        filters = _list_filters(feed_ids)
+
+        count_stmt = _count_stmt(filters) if exact else _counted_total_stmt(feed_ids)
+        total_count = await self.db.scalar(count_stmt)
+        rows = (await self.db.scalars(_page_stmt(filters, skip, limit, cursor, fields))).all()
+        entries, next_cursor = _split_page(rows, limit, fields)
+
+        return {
+            "entries": entries,
+            "total_count": total_count,
+            "next_cursor": next_cursor
+        }
+
+    async def get_entry(self, entry_id: str) -> Entry:
+        """Async EntryService.get_entry"""
+        entry = await self.db.get(Entry, entry_id)
+        if not entry:
+            raise HTTPException(status_code=404, detail="Entry not found")
+        return entry
+
+    async def get_bookmarked_entries(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        keywords: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        exact: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> dict:
+        """Async EntryService.get_bookmarked_entries"""
+        fields = _entry_fields(fields)
+        feed_ids = await self._keyword_feed_ids(keywords)
+        filters = _list_filters(feed_ids, bookmarked=True)
+
+        count_stmt = _count_stmt(filters) if exact else _counted_total_stmt(feed_ids, bookmarked=True)
+        total_count = await self.db.scalar(count_stmt)
+        rows = (await self.db.scalars(_page_stmt(filters, skip, limit, cursor, fields))).all()
+        entries, next_cursor = _split_page(rows, limit, fields)
+
+        return {
+            "entries": entries,
+            "total_count": total_count,
+            "next_cursor": next_cursor
+        }
+
+    async def search_entries(
+        self,
+        q: str,
+        skip: int = 0,
+        limit: int = 10,
+        keywords: Optional[List[str]] = None,
+        bookmarked: Optional[bool] = None,
+        feed_id: Optional[str] = None
+    ) -> dict:
+        """Async EntryService.search_entries"""
+        filters = _list_filters(await self._keyword_feed_ids(keywords), bookmarked=bookmarked, feed_id=feed_id)
+        count_stmt, page_stmt = _search_stmts(q, filters, skip, limit)
+        try:
+            total_count = await self.db.scalar(count_stmt)
+            rows = (await self.db.execute(page_stmt)).all()
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid search query: {str(e)}")
+
+        return {
+            "entries": _search_results(rows),
+            "total_count": total_count
+        }
+
+    async def get_feed_entries(
+        self,
+        feed_id: str,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> dict:
+        """Async EntryService.get_feed_entries"""
+        fields = _entry_fields(fields)
+        rows = (await self.db.scalars(
+            _page_stmt(_list_filters(feed_id=feed_id), skip, limit, cursor, fields)
+        )).all()
+        entries, next_cursor = _split_page(rows, limit, fields)
+        return {
+            "entries": entries,
+            "next_cursor": next_cursor
+        }
+
+    async def update_entry_status(self, entry_id: str, status: EntryStatus) -> Entry:
+        """Async EntryService.update_entry_status"""
+        await _begin_write_async(self.db)
+        try:
+            entry = await self.get_entry(entry_id)
+        except HTTPException:
+            await self.db.rollback()
+            raise
+        logging.info(f"Updating entry status: {entry_id} - {status}")
+        deltas = _status_deltas(entry, status)
+        if any(deltas.values()):
+            await self.db.execute(_stats_delta_stmt(entry.feed_id, **deltas))
+        entry.is_read = status.read
+        entry.is_bookmarked = status.bookmarked
+        await self.db.commit()
+        response_cache.bump(ENTRIES)
+        return entry
+
+    async def update_entries_status(self, changes: BulkEntryStatusUpdate) -> int:
+        """Async EntryService.update_entries_status"""
+        feed_ids = await self._keyword_feed_ids(changes.keywords)
+        deltas_stmt, update_stmt = _bulk_status_stmts(_bulk_filters(changes, feed_ids), changes)
+        try:
+            await _begin_write_async(self.db)
+            for feed_id, read_changed, bookmarked_changed in (await self.db.execute(deltas_stmt)).all():
+                deltas = _bulk_stats_deltas(changes, read_changed, bookmarked_changed)
+                await self.db.execute(_stats_delta_stmt(feed_id, **deltas))
+            updated = (await self.db.execute(update_stmt)).rowcount
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+        if updated:
+            response_cache.bump(ENTRIES)
+        logging.info(f"Bulk status update changed {updated} entries")
+        return updated
@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import logging
+
+if TYPE_CHECKING:
+    import httpx  # only fetch_feed_async's callers need it, and they import it themselves
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "google-alerts-stream-service/1.0 (+feedparser)"
+ACCEPT_HEADER = "application/atom+xml,application/rss+xml,application/xml;q=0.9,text/xml;q=0.8,*/*;q=0.1"
+
+
+@dataclass
+class FetchResult:
+    """Raw outcome of a (conditional) feed download"""
+    url: str
+    status: int
+    body: Optional[bytes] = None
+    etag: Optional[str] = None
+    modified: Optional[str] = None
+    content_type: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def digest(self) -> Optional[str]:
+        """Fallback validator used when the server sends no ETag/Last-Modified"""
+        if self.body is None:
+            return None
+        return body_digest(self.body)
+
+
+def body_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def build_request_headers(etag: Optional[str] = None, modified: Optional[str] = None) -> dict:
+    headers = {
+        "User-Agent": USER_AGENT,
+        "Accept": ACCEPT_HEADER,
+        "Accept-Encoding": "gzip, deflate",
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    return headers
+
+
+def decode_body(body: bytes, content_encoding: Optional[str]) -> bytes:
+    encoding = (content_encoding or "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate streams without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def fetch_feed(
+    url: str,
+    etag: Optional[str] = None,
+    modified: Optional[str] = None,
+    timeout: float = 30
+) -> FetchResult:
+    """
+    Download a feed, sending the stored validators so an unchanged
+    feed comes back as a bodyless 304
+    """
+    request = Request(url, headers=build_request_headers(etag, modified))
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            body = decode_body(response.read(), response.headers.get("Content-Encoding"))
+            return FetchResult(
+                url=url,
+                status=response.status,
+                body=body,
+                etag=response.headers.get("ETag"),
+                modified=response.headers.get("Last-Modified"),
+                content_type=response.headers.get("Content-Type"),
+            )
+    except HTTPError as e:
+        if e.code == 304:
+            logger.debug(f"Feed not modified: {url}")
+            return FetchResult(
+                url=url,
+                status=304,
+                etag=e.headers.get("ETag") or etag,
+                modified=e.headers.get("Last-Modified") or modified,
+            )
+        raise
+
+
+async def fetch_feed_async(
+    client: "httpx.AsyncClient",
+    url: str,
+    etag: Optional[str] = None,
+    modified: Optional[str] = None,
+    timeout: float = 30
+) -> FetchResult:
+    """fetch_feed on a shared httpx.AsyncClient, without blocking the event loop"""
+    response = await client.get(
+        url,
+        headers=build_request_headers(etag, modified),
+        timeout=timeout,
+        follow_redirects=True
+    )
+    if response.status_code == 304:
+        logger.debug(f"Feed not modified: {url}")
+        return FetchResult(
+            url=url,
+            status=304,
+            etag=response.headers.get("ETag") or etag,
+            modified=response.headers.get("Last-Modified") or modified,
+        )
+    response.raise_for_status()
+    return FetchResult(
+        url=url,
+        status=response.status_code,
+        body=response.content,
+        etag=response.headers.get("ETag"),
+        modified=response.headers.get("Last-Modified"),
+        content_type=response.headers.get("Content-Type"),
+    )
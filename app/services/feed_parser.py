@@ -0,0 +1,183 @@
+"""
+Feed parsing, kept free of app/DB imports so it can run in worker processes.
+
+parse_feed_body turns downloaded bytes into compact ParsedEntry tuples;
+only those (not feedparser's FeedParserDict trees) cross the process
+boundary back to the writer. feedparser and dateutil are imported on first
+use, so importing this module (and the API with it) doesn't pay for them.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlsplit
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ParsedEntry(NamedTuple):
+    title: str
+    content: str
+    link: str
+    publisher: Optional[str]
+    published_at: Optional[datetime]  # None when the feed gave no date
+    updated_at: Optional[datetime]
+
+
+class ParsedFeed(NamedTuple):
+    entries: List[ParsedEntry]
+    errors: int  # items that could not be normalized and were skipped
+    title: Optional[str]
+    version: Optional[str]
+
+
+class FeedParseError(Exception):
+    """The feed body is not a well-formed feed"""
+
+
+@lru_cache(maxsize=4096)
+def _base_domain(netloc: str) -> Optional[str]:
+    """'www.example.co' -> 'example.co'; memoized since alerts repeat publishers"""
+    # Remove subdomains like 'www' and return the base domain
+    parts = netloc.split('.')
+    if len(parts) >= 2:
+        return ".".join(parts[-2:])
+    return None
+
+
+def extract_publisher(url: str) -> Optional[str]:
+    """Base domain of the article a Google Alerts redirect link points to"""
+    try:
+        query = urlsplit(url).query
+        if 'url=' not in query:
+            return None
+        # Get the target URL from the 'url' parameter
+        for name, value in parse_qsl(query):
+            if name == 'url':
+                return _base_domain(urlsplit(value).netloc)
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to extract publisher from URL {url}: {str(e)}")
+        return None
+
+
+def _parse_raw_date(date_str: str) -> Optional[datetime]:
+    """A date string as a UTC datetime, or None if it can't be parsed"""
+    from dateutil import parser
+
+    try:
+        dt = parser.parse(date_str)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+    except Exception as e:
+        logger.warning(f"Failed to parse date '{date_str}': {str(e)}")
+        return None
+
+
+def parse_date(date_str: str) -> datetime:
+    """Convert various date formats to UTC datetime, the current time if unparseable"""
+    return _parse_raw_date(date_str) or datetime.now(timezone.utc)
+
+
+def _item_datetime(item, parsed_key: str, raw_key: str) -> Optional[datetime]:
+    """
+    An item date from the UTC struct_time feedparser already produced,
+    falling back to parsing the raw string only when feedparser couldn't.
+    None when the item has no usable date.
+    """
+    parsed = item.get(parsed_key)
+    if parsed:
+        try:
+            return datetime(*parsed[:6], tzinfo=timezone.utc)
+        except (TypeError, ValueError):
+            pass
+    raw = item.get(raw_key)
+    return _parse_raw_date(raw) if raw else None
+
+
+def normalize_entry(item) -> ParsedEntry:
+    """One feedparser item as a ParsedEntry"""
+    title = item.get('title', 'No title').replace('\n', '')
+    link = item.get('link', '')
+    content = item.get('content')
+    content = content[0].get('value', '') if content else ''
+
+    # Left None when the feed gives no date; create_entries_batch stamps
+    # new rows with the ingest time but keeps it out of the content hash
+    published_at = _item_datetime(item, 'published_parsed', 'published')
+    updated_at = _item_datetime(item, 'updated_parsed', 'updated') or published_at
+
+    return ParsedEntry(title, content, link, extract_publisher(link), published_at, updated_at)
+
+
+def parse_feed_body(body: bytes, content_type: Optional[str] = None, url: Optional[str] = None) -> ParsedFeed:
+    """Parse a downloaded feed and normalize its items. Raises FeedParseError"""
+    import feedparser
+
+    parsed_feed = feedparser.parse(
+        body,
+        response_headers={
+            "content-type": content_type or "application/xml",
+            "content-location": url or "",
+        }
+    )
+    if parsed_feed.bozo and parsed_feed.bozo_exception:
+        raise FeedParseError(f"Feed parsing error for {url}: {str(parsed_feed.bozo_exception)}")
+
+    entries = []
+    errors = 0
+    for item in parsed_feed.entries:
+        try:
+            entries.append(normalize_entry(item))
+        except Exception as e:
+            logger.error(f"Error processing entry {item.get('link', '')}: {str(e)}")
+            errors += 1
+    return ParsedFeed(entries, errors, parsed_feed.feed.get('title'), parsed_feed.version)
+
+
+class ParsePool:
+    """
+    Lazily started process pool for parse_feed_body.
+    With workers=0 feeds are parsed inline in the calling thread.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(0, workers)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs threads and holds DB connections is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def parse(self, body: bytes, content_type: Optional[str] = None, url: Optional[str] = None) -> ParsedFeed:
+        """Blocks the calling thread (not the GIL) until a worker has parsed the feed"""
+        if not self.workers:
+            return parse_feed_body(body, content_type, url)
+        executor = self._get_executor()
+        try:
+            return executor.submit(parse_feed_body, body, content_type, url).result()
+        except BrokenProcessPool:
+            logger.error("Parse worker pool broke, restarting it and parsing inline")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            return parse_feed_body(body, content_type, url)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,11 +1,103 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from app.models.feed import Feed
 from app.schemas.feed import FeedCreate, FeedUpdate
+from app.services.cache_service import ENTRIES, FEEDS, response_cache
 from fastapi import HTTPException
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 import logging
+import threading
+import time
 from sqlalchemy.sql import or_
 
+# Upper bound on staleness when another process changes the feeds table
+KEYWORD_INDEX_TTL = 60
+
+
+class KeywordIndex:
+    """
+    In-memory keyword -> feed_id index.
+    Resolves the substring keyword filter once per keyword instead of
+    joining feeds with leading-wildcard ILIKEs on every entries query.
+    Invalidated by FeedService on every feed change.
+    """
+
+    def __init__(self, ttl: float = KEYWORD_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._loaded_at = 0.0
+        self._feeds: Optional[List[Tuple[str, str]]] = None  # (lowercased keyword, feed_id)
+        self._matches: Dict[str, Tuple[str, ...]] = {}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._feeds = None
+            self._matches = {}
+
+    def _needs_load(self) -> bool:
+        return self._feeds is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _store(self, version: int, rows) -> List[Tuple[str, str]]:
+        """Keep freshly read rows unless a feed changed meanwhile; returns them either way"""
+        feeds = [((keyword or "").lower(), feed_id) for keyword, feed_id in rows]
+        with self._lock:
+            # Drop the result if a feed changed while we were reading
+            if version == self._version:
+                self._feeds = feeds
+                self._matches = {}
+                self._loaded_at = time.monotonic()
+        return feeds
+
+    def _match(self, keywords: List[str], loaded: Optional[List[Tuple[str, str]]] = None) -> Optional[List[str]]:
+        """
+        Match against `loaded` (rows this call just read) or the stored rows.
+        None if there are neither: the index was invalidated since the load check.
+        """
+        with self._lock:
+            feeds = loaded if loaded is not None else self._feeds
+            if feeds is None:
+                return None
+            # Only memoize matches computed from the stored rows
+            memoize = feeds is self._feeds
+            feed_ids = set()
+            for keyword in keywords:
+                needle = keyword.lower()
+                matches = self._matches.get(needle) if memoize else None
+                if matches is None:
+                    matches = tuple(feed_id for feed_keyword, feed_id in feeds if needle in feed_keyword)
+                    if memoize:
+                        self._matches[needle] = matches
+                feed_ids.update(matches)
+        return sorted(feed_ids)
+
+    def resolve(self, db: Session, keywords: List[str]) -> List[str]:
+        """Ids of feeds whose keyword contains any of the given keywords (case-insensitive)"""
+        while True:
+            loaded = None
+            if self._needs_load():
+                loaded = self._store(self._version, db.execute(select(Feed.keyword, Feed.id)).all())
+            feed_ids = self._match(keywords, loaded)
+            if feed_ids is not None:
+                return feed_ids
+
+    async def resolve_async(self, db: AsyncSession, keywords: List[str]) -> List[str]:
+        """resolve() for an AsyncSession"""
+        while True:
+            loaded = None
+            if self._needs_load():
+                loaded = self._store(self._version, (await db.execute(select(Feed.keyword, Feed.id))).all())
+            feed_ids = self._match(keywords, loaded)
+            if feed_ids is not None:
+                return feed_ids
+
+
+keyword_index = KeywordIndex()
+
+
 class FeedService:
     def __init__(self, db: Session):
         self.db = db
@@ -25,6 +117,8 @@ class FeedService:
             db_feed = Feed(**feed_data)
             self.db.add(db_feed)
             self.db.commit()
+            keyword_index.invalidate()
+            response_cache.bump(FEEDS)
             self.db.refresh(db_feed)
             return db_feed
         except Exception as e:
@@ -55,13 +149,37 @@ class FeedService:
         for field, value in feed_update.model_dump(exclude_unset=True).items():
             setattr(feed, field, value)
         self.db.commit()
+        keyword_index.invalidate()
+        # A keyword change moves the feed in and out of keyword-filtered entry lists
+        response_cache.bump(FEEDS, ENTRIES)
         self.db.refresh(feed)
         return feed
 
+    def record_fetch(
+        self,
+        feed: Feed,
+        fetched_at: datetime,
+        etag: Optional[str] = None,
+        modified: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> Feed:
+        """Store the fetch timestamp and the validators for the next conditional GET"""
+        feed.last_fetched = fetched_at
+        feed.etag = etag
+        feed.modified = modified
+        if content_hash is not None:
+            feed.content_hash = content_hash
+        # No cache bump: with the scheduler running it would empty the /feeds/
+        # cache every few seconds; last_fetched catches up within the TTL
+        self.db.commit()
+        return feed
+
     def delete_feed(self, feed_id: str) -> bool:
         feed = self.get_feed(feed_id)
         self.db.delete(feed)
         self.db.commit()
+        keyword_index.invalidate()
+        response_cache.bump(FEEDS, ENTRIES)
         return True
 
     # def get_feed_stats(self, feed_id: str) -> FeedStats:
@@ -70,4 +188,30 @@ class FeedService:
     #     return FeedStats(
     #         total_entries=total_entries,
     #         last_fetched=feed.last_fetched
-    #     )
\ No newline at end of file
+    #     )
+
+
+class AsyncFeedService:
+    """Read-path counterpart of FeedService for AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_feeds(self) -> List[Feed]:
+        try:
+            result = await self.db.scalars(select(Feed).order_by(Feed.created_at.desc()))
+            feeds = result.all()
+            logging.debug(f"Retrieved {len(feeds)} feeds from database")
+            return feeds
+        except Exception as e:
+            logging.exception(f"Database error in get_feeds: {type(e).__name__}, Message: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Database error: {str(e)}"
+            )
+
+    async def get_feed(self, feed_id: str) -> Feed:
+        feed = await self.db.get(Feed, feed_id)
+        if not feed:
+            raise HTTPException(status_code=404, detail="Feed not found")
+        return feed
@@ -1,36 +1,167 @@
-from sqlalchemy.orm import Session
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+import logging
+
 from sqlalchemy import text
-from app.services.rss_service import RSSService
-from fastapi import HTTPException
 
-class HealthService:
-    def __init__(self, db: Session):
-        self.db = db
-        self.rss_service = RSSService(db)
+from app.config import get_settings
+from app.db.base import SessionLocal, async_engine, engine
+from app.services.feed_fetcher import fetch_feed
+from app.services.feed_parser import parse_feed_body
+
+logger = logging.getLogger(__name__)
+
+VERSION = "1.0.0"
+
+DATABASE = "database"
+RSS_SERVICE = "rss_service"
+
+
+def pool_stats(pool) -> dict:
+    """Connection counts of a SQLAlchemy pool; pools that aren't sized report what they can"""
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+class HealthProber:
+    """
+    Runs the health checks on a background thread and keeps the latest
+    outcome of each in memory, so /health never waits on the database or
+    the network itself.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.interval = float(max(1, settings.HEALTH_PROBE_INTERVAL))
+        self.timeout = float(settings.HEALTH_PROBE_TIMEOUT)
+        self.rss_url = settings.HEALTH_PROBE_RSS_URL
+        # A result older than this means the prober itself is stuck
+        self.stale_after = 3 * self.interval + self.timeout
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._results: Dict[str, dict] = {}
+        # Validators from the last RSS probe; unchanged feeds then cost a 304
+        self._rss_validators: Tuple[Optional[str], Optional[str]] = (None, None)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        logger.info(f"Starting health prober (every {self.interval:.0f}s)")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="health-prober", daemon=True)
+        self._thread.start()
 
-    def check_database(self) -> bool:
-        """Check if database is accessible"""
+    def stop(self, timeout: float = 10) -> None:
+        if not self.running:
+            return
+        logger.info("Stopping health prober")
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self.run_once()
+            if self._stopping.wait(self.interval):
+                return
+
+    def run_once(self) -> None:
+        self._probe(DATABASE, self.probe_database)
+        if self.rss_url:
+            self._probe(RSS_SERVICE, self.probe_rss_service)
+
+    def _probe(self, name: str, check) -> None:
+        started = time.perf_counter()
+        error = None
         try:
-            # Try to execute a simple query
-            self.db.execute(text('SELECT 1'))
-            return True
+            check()
         except Exception as e:
-            raise HTTPException(status_code=503, detail=f"Database health check failed: {str(e)}")
+            error = str(e) or type(e).__name__
+            logger.warning(f"Health probe {name} failed: {error}")
+        result = {
+            "ok": error is None,
+            "error": error,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": datetime.now(timezone.utc),
+            "monotonic": time.monotonic(),
+        }
+        with self._lock:
+            self._results[name] = result
 
-    def check_rss_service(self) -> bool:
-        """Check if RSS service is working"""
+    def probe_database(self) -> None:
+        db = SessionLocal()
         try:
-            # Try to validate a known good RSS URL
-            test_url = "https://news.google.com/rss"
-            return self.rss_service.validate_feed_url(test_url)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail=f"RSS service health check failed: {str(e)}")
-
-    def check_all(self) -> dict:
-        """Run all health checks"""
-        return {
-            "status": "healthy",
-            "database": self.check_database(),
-            "rss_service": self.check_rss_service(),
-            "version": "1.0.0"
-        }
\ No newline at end of file
+            db.execute(text("SELECT 1"))
+        finally:
+            db.close()
+
+    def probe_rss_service(self) -> None:
+        """Fetch and parse a known good feed, conditionally after the first time"""
+        etag, modified = self._rss_validators
+        fetched = fetch_feed(self.rss_url, etag=etag, modified=modified, timeout=self.timeout)
+        if not fetched.not_modified:
+            parsed = parse_feed_body(fetched.body, fetched.content_type, fetched.url)
+            if not parsed.entries:
+                raise ValueError(f"{self.rss_url} returned a feed without entries")
+        self._rss_validators = (fetched.etag or etag, fetched.modified or modified)
+
+    def _snapshot(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        with self._lock:
+            results = {name: dict(result) for name, result in self._results.items()}
+        for result in results.values():
+            age = now - result.pop("monotonic")
+            result["age_seconds"] = round(age, 1)
+            result["stale"] = age > self.stale_after
+            result["checked_at"] = result["checked_at"].isoformat()
+        return results
+
+    def readiness(self) -> Tuple[bool, dict]:
+        """
+        Whether this instance can serve traffic, from the last probes only.
+        Ready while the database probe is fresh and passing; a failing RSS
+        upstream is reported but doesn't take the instance out of rotation.
+        """
+        results = self._snapshot()
+        database = results.get(DATABASE)
+        rss = results.get(RSS_SERVICE)
+        ready = database is not None and database["ok"] and not database["stale"]
+        if database is None:
+            status = "starting"
+        elif not ready:
+            status = "unhealthy"
+        elif rss is not None and not rss["ok"]:
+            status = "degraded"
+        else:
+            status = "healthy"
+        return ready, {
+            "status": status,
+            # None until the first probe of that kind has finished
+            "database": database["ok"] if database else None,
+            "rss_service": rss["ok"] if rss else None,
+            "version": VERSION,
+        }
+
+    def report(self) -> dict:
+        """Readiness plus every probe result with its age, and connection pool usage"""
+        _, summary = self.readiness()
+        summary.update(
+            prober={"running": self.running, "interval_seconds": self.interval},
+            checks=self._snapshot(),
+            pools={"sync": pool_stats(engine.pool), "async": pool_stats(async_engine.pool)},
+        )
+        return summary
+
+
+health_prober = HealthProber()
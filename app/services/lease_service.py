@@ -0,0 +1,70 @@
+"""
+Named leases in the service_leases table, for background jobs that every
+worker process starts but only one should run at a time.
+"""
+import os
+import time
+import uuid
+from typing import Optional
+import logging
+
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.base import SessionLocal
+from app.models.service_lease import ServiceLease
+
+logger = logging.getLogger(__name__)
+
+
+class Lease:
+    """
+    One process's claim on a named lease. hold() takes it when it is free
+    or expired and renews it when already ours, in one conditional upsert;
+    the holder must call it again within ttl seconds to keep it.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self.held: Optional[bool] = None  # unknown until the first claim
+
+    def hold(self) -> bool:
+        """Take or renew the lease. Returns whether this process holds it"""
+        now = time.time()
+        stmt = sqlite_insert(ServiceLease).values(name=self.name, owner=self.owner, expires_at=now + self.ttl)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ServiceLease.name],
+            set_={"owner": stmt.excluded.owner, "expires_at": stmt.excluded.expires_at},
+            where=or_(ServiceLease.owner == self.owner, ServiceLease.expires_at < now)
+        ).returning(ServiceLease.owner)
+        db = SessionLocal()
+        try:
+            held = db.execute(stmt).first() is not None
+            db.commit()
+        finally:
+            db.close()
+        if held != self.held:
+            logger.info(f"Lease {self.name} acquired" if held
+                        else f"Lease {self.name} is held by another worker; standing by")
+        self.held = held
+        return held
+
+    def release(self) -> None:
+        """Let another worker take over without waiting for the lease to expire"""
+        if not self.held:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(ServiceLease)
+                .where(ServiceLease.name == self.name, ServiceLease.owner == self.owner)
+                .values(expires_at=0)
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Could not release lease {self.name}: {str(e)}")
+        finally:
+            db.close()
+        self.held = False
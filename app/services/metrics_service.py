@@ -0,0 +1,124 @@
+"""
+The service's metrics and the hooks that feed the ones not recorded inline.
+
+Fetch, parse, ingest and retention metrics are recorded where the work
+happens (rss_service, entry_service, retention_service). Request latency comes from MetricsMiddleware,
+and SQL statements from engine events installed by instrument_engine. The
+SQL counts are also attributed to the HTTP request that ran them through
+a context variable, which follows requests into the threadpool.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import Registry
+
+registry = Registry()
+
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+RETENTION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+feed_fetch_seconds = registry.histogram(
+    "feed_fetch_duration_seconds", "Feed download time, including 304 responses", ("feed_id",), FETCH_BUCKETS
+)
+feed_fetch_errors = registry.counter(
+    "feed_fetch_errors_total", "Feed downloads that failed", ("feed_id",)
+)
+feed_parse_seconds = registry.histogram(
+    "feed_parse_duration_seconds", "Time to parse and normalize a changed feed body", ("feed_id",), PARSE_BUCKETS
+)
+
+ingest_batches = registry.counter(
+    "ingest_batches_total", "create_entries_batch calls that committed"
+)
+ingest_entries = registry.counter(
+    "ingest_entries_total",
+    "Entries passed to create_entries_batch by outcome: seen, inserted, updated or skipped",
+    ("outcome",)
+)
+
+response_cache_lookups = registry.counter(
+    "response_cache_lookups_total", "Response cache lookups by result: hit or miss", ("result",)
+)
+response_cache_evictions = registry.counter(
+    "response_cache_evictions_total", "Cached responses evicted to stay under RESPONSE_CACHE_MAX_BYTES"
+)
+
+retention_runs = registry.counter(
+    "retention_runs_total", "Retention policy runs that completed"
+)
+retention_deleted_entries = registry.counter(
+    "retention_deleted_entries_total", "Entries deleted by retention, by reason: age or feed_limit", ("reason",)
+)
+retention_run_seconds = registry.histogram(
+    "retention_run_duration_seconds", "Time a retention run took, including the incremental vacuum", (), RETENTION_BUCKETS
+)
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+)
+http_request_sql_statements = registry.histogram(
+    "http_request_sql_statements", "SQL statements run per HTTP request", ("route",), STATEMENT_COUNT_BUCKETS
+)
+http_request_sql_seconds = registry.histogram(
+    "http_request_sql_duration_seconds", "Time spent in SQL per HTTP request", ("route",), SQL_BUCKETS
+)
+
+sql_statement_seconds = registry.histogram(
+    "sql_statement_duration_seconds", "SQL statement execution time by leading keyword", ("statement",), SQL_BUCKETS
+)
+
+
+class RequestSQL:
+    """Statements and seconds of SQL run on behalf of one HTTP request"""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set by MetricsMiddleware; the object is shared, so threads the request's
+# context was copied into add to the same totals
+current_request_sql: ContextVar[Optional[RequestSQL]] = ContextVar("current_request_sql", default=None)
+
+_STARTED = "metrics_statement_started"
+
+# Leading keywords reported as their own label; everything else is "other"
+_STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK"}
+
+
+def _statement_kind(statement: str) -> str:
+    keyword = statement.lstrip()[:8].split(None, 1)
+    kind = keyword[0].upper() if keyword else ""
+    return kind if kind in _STATEMENT_KINDS else "other"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info[_STARTED] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop(_STARTED, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    sql_statement_seconds.observe(elapsed, statement=_statement_kind(statement))
+    request = current_request_sql.get()
+    if request is not None:
+        request.statements += 1
+        request.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement run on engine (for an AsyncEngine, pass its sync_engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import logging
+
+from sqlalchemy import and_, delete, desc, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db.base import SessionLocal, is_sqlite
+from app.models.entry import Entry
+from app.models.feed_stats import FeedStats
+from app.services.cache_service import ENTRIES, response_cache
+from app.services.entry_service import _begin_write, _stats_delta_stmt
+from app.services.lease_service import Lease
+from app.services.metrics_service import retention_deleted_entries, retention_run_seconds, retention_runs
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+LEASE_NAME = "retention"
+# The lease outlives this many missed runs before another worker takes over
+LEASE_RENEWALS = 3
+
+
+class RetentionService:
+    """
+    Deletes unbookmarked entries that fall outside the retention policy.
+
+    Victims are removed in small batches, each in its own short transaction
+    that also adjusts the feed counters, so the ingest writer never waits
+    long for the database lock. Freed pages are then returned to the OS
+    with an incremental vacuum.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        settings = get_settings()
+        self.max_age_days = settings.RETENTION_MAX_AGE_DAYS
+        self.max_entries_per_feed = settings.RETENTION_MAX_ENTRIES_PER_FEED
+        self.keep_unread = settings.RETENTION_KEEP_UNREAD
+        self.batch_size = max(1, settings.RETENTION_BATCH_SIZE)
+        self.batch_pause = settings.RETENTION_BATCH_PAUSE
+        self.vacuum_pages = settings.RETENTION_VACUUM_PAGES
+
+    def _deletable(self) -> list:
+        filters = [Entry.is_bookmarked == False]
+        if self.keep_unread:
+            filters.append(Entry.is_read == True)
+        return filters
+
+    def _delete_batch(self, filters: list) -> int:
+        """Delete up to batch_size matching entries in one transaction. Returns rows deleted"""
+        try:
+            # The counter deltas come from these rows, so read them under the write lock
+            _begin_write(self.db)
+            rows = self.db.execute(
+                select(Entry.id, Entry.feed_id, Entry.is_read).where(*filters).limit(self.batch_size)
+            ).all()
+            if not rows:
+                self.db.rollback()
+                return 0
+
+            deltas = defaultdict(lambda: [0, 0])
+            for _, feed_id, is_read in rows:
+                deltas[feed_id][0] -= 1
+                deltas[feed_id][1] -= 0 if is_read else 1
+            self.db.execute(delete(Entry).where(Entry.id.in_([row[0] for row in rows])))
+            for feed_id, (total, unread) in deltas.items():
+                self.db.execute(_stats_delta_stmt(feed_id, total=total, unread=unread))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Retention batch failed: {str(e)}")
+            raise
+        response_cache.bump(ENTRIES)
+        return len(rows)
+
+    def _delete_all(self, filters: list) -> tuple:
+        """Drain every matching entry batch by batch. Returns (deleted, batches)"""
+        deleted = batches = 0
+        while True:
+            count = self._delete_batch(filters)
+            if not count:
+                return deleted, batches
+            deleted += count
+            batches += 1
+            if count < self.batch_size:
+                return deleted, batches
+            # Let writers queued behind this batch take the lock
+            time.sleep(self.batch_pause)
+
+    def purge_expired(self, now: Optional[datetime] = None) -> tuple:
+        """Delete entries published more than max_age_days ago. Returns (deleted, batches)"""
+        if self.max_age_days <= 0:
+            return 0, 0
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=self.max_age_days)
+        return self._delete_all(self._deletable() + [Entry.published_at < cutoff])
+
+    def _feeds_over_limit(self) -> List[str]:
+        """Feeds whose unbookmarked entries exceed the limit, from the maintained counters"""
+        return list(self.db.execute(
+            select(FeedStats.feed_id).where(
+                FeedStats.total_entries - FeedStats.bookmarked_entries > self.max_entries_per_feed
+            )
+        ).scalars())
+
+    def trim_feeds(self) -> tuple:
+        """Keep only the newest max_entries_per_feed unbookmarked entries of each feed"""
+        if self.max_entries_per_feed <= 0:
+            return 0, 0
+        deleted = batches = 0
+        for feed_id in self._feeds_over_limit():
+            # Oldest entry that still fits; everything behind it goes
+            boundary = self.db.execute(
+                select(Entry.published_at, Entry.id)
+                .where(Entry.feed_id == feed_id, Entry.is_bookmarked == False)
+                .order_by(desc(Entry.published_at), desc(Entry.id))
+                .offset(self.max_entries_per_feed)
+                .limit(1)
+            ).first()
+            if boundary is None:
+                continue
+            published_at, entry_id = boundary
+            feed_deleted, feed_batches = self._delete_all(self._deletable() + [
+                Entry.feed_id == feed_id,
+                or_(
+                    Entry.published_at < published_at,
+                    and_(Entry.published_at == published_at, Entry.id <= entry_id)
+                )
+            ])
+            deleted += feed_deleted
+            batches += feed_batches
+        return deleted, batches
+
+    def incremental_vacuum(self) -> dict:
+        """Release free pages to the OS. Only effective with auto_vacuum=INCREMENTAL"""
+        bind = self.db.get_bind()
+        if not is_sqlite(str(bind.url)):
+            return {"supported": False}
+        raw = bind.raw_connection()
+        try:
+            mode = raw.execute("PRAGMA auto_vacuum").fetchone()[0]
+            free_before = raw.execute("PRAGMA freelist_count").fetchone()[0]
+            if mode != AUTO_VACUUM_INCREMENTAL:
+                return {"supported": False, "free_pages": free_before}
+            pages = f"({int(self.vacuum_pages)})" if self.vacuum_pages > 0 else ""
+            # execute() would step the pragma once and free a single page; a script runs it to completion
+            raw.driver_connection.executescript(f"PRAGMA incremental_vacuum{pages};")
+            free_after = raw.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            raw.close()
+        return {"supported": True, "pages_freed": free_before - free_after, "free_pages": free_after}
+
+    def run(self) -> dict:
+        """Apply the whole retention policy once and report what it did"""
+        started = time.perf_counter()
+        by_age, age_batches = self.purge_expired()
+        age_seconds = time.perf_counter() - started
+
+        by_limit, limit_batches = self.trim_feeds()
+        delete_seconds = time.perf_counter() - started
+
+        vacuum = self.incremental_vacuum() if by_age or by_limit else {"skipped": True}
+        vacuum["seconds"] = round(time.perf_counter() - started - delete_seconds, 3)
+
+        report = {
+            "deleted": by_age + by_limit,
+            "deleted_by_age": by_age,
+            "deleted_by_feed_limit": by_limit,
+            "batches": age_batches + limit_batches,
+            "age_seconds": round(age_seconds, 3),
+            "delete_seconds": round(delete_seconds, 3),
+            "vacuum": vacuum,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        retention_runs.inc()
+        retention_deleted_entries.inc(by_age, reason="age")
+        retention_deleted_entries.inc(by_limit, reason="feed_limit")
+        retention_run_seconds.observe(report["seconds"])
+        logger.info(
+            f"Retention removed {report['deleted']} entries ({by_age} by age, {by_limit} by feed limit) "
+            f"in {report['batches']} batches, {report['seconds']:.2f}s"
+        )
+        return report
+
+
+class RetentionJob:
+    """
+    Runs RetentionService periodically on a background thread. Every worker
+    process starts one; only the holder of the retention lease runs the
+    scheduled passes. Manual runs go ahead regardless
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.RETENTION_MAX_AGE_DAYS > 0 or settings.RETENTION_MAX_ENTRIES_PER_FEED > 0
+        self.interval = float(max(1, settings.RETENTION_INTERVAL))
+        self._lock = threading.Lock()  # one run at a time, scheduled or manual
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lease = Lease(LEASE_NAME, self.interval * LEASE_RENEWALS)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        logger.info(f"Starting retention job (every {self.interval:.0f}s)")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        if not self.running:
+            return
+        logger.info("Stopping retention job")
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._lease.release()
+
+    def run_once(self) -> dict:
+        with self._lock:
+            db = SessionLocal()
+            try:
+                report = RetentionService(db).run()
+            finally:
+                db.close()
+            return report
+
+    def _run(self) -> None:
+        # First pass after one interval, so startup isn't competing with it
+        while not self._stopping.wait(self.interval):
+            try:
+                if self._lease.hold():
+                    self.run_once()
+                    # Renew past the run itself, however long it took
+                    self._lease.hold()
+            except Exception as e:
+                logger.exception(f"Retention run failed: {str(e)}")
+
+
+retention_job = RetentionJob()
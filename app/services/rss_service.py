@@ -1,18 +1,194 @@
-import feedparser
-from datetime import datetime
-from typing import Optional
-from app.schemas.entry import EntryCreate
-from app.schemas.feed import FeedUpdate
-from app.services.entry_service import EntryService
-from app.services.feed_service import FeedService
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from app.services.entry_service import EntryRecord, EntryService
+from app.services.feed_service import AsyncFeedService, FeedService
+from app.services.feed_fetcher import FetchResult, fetch_feed, fetch_feed_async
+from app.services.feed_parser import FeedParseError, ParsePool, extract_publisher, parse_date
+from app.services.metrics_service import feed_fetch_errors, feed_fetch_seconds, feed_parse_seconds
+from app.models.feed import Feed
+from app.db.base import AsyncSessionLocal, SessionLocal
+from app.config import get_settings
 from fastapi import HTTPException
-import pytz
-from dateutil import parser
 import logging
-from urllib.parse import urlparse, parse_qsl
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
+class HostLimiter:
+    """Caps the number of concurrent fetches against a single host"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limit)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def slot(self, url: str):
+        semaphore = self._semaphore(urlparse(url).netloc.lower())
+        with semaphore:
+            yield
+
+
+def fetch_feed_in_own_session(feed_id: str, host_limiter: HostLimiter) -> dict:
+    """
+    Fetch and parse a single feed using a dedicated DB session.
+    Safe to run from a worker thread.
+    """
+    db = SessionLocal()
+    try:
+        return RSSService(db).fetch_and_parse_feed(feed_id, host_limiter)
+    finally:
+        db.close()
+
+
+class AsyncHostLimiter:
+    """HostLimiter for coroutines"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.limit))
+        async with semaphore:
+            yield
+
+
+# feedparser runs here so it doesn't hold the API process's GIL
+parse_pool = ParsePool(get_settings().RSS_PARSE_WORKERS)
+
+# Ingest (parse dispatch and DB writes) for async refreshes runs here, off
+# the event loop and outside the threadpool that serves sync routes
+_ingest_executor = ThreadPoolExecutor(
+    max_workers=max(1, get_settings().RSS_INGEST_WORKERS),
+    thread_name_prefix="feed-ingest"
+)
+
+
+def ingest_in_own_session(feed_id: str, fetched: FetchResult) -> dict:
+    """Parse and store an already-downloaded feed using a dedicated DB session"""
+    db = SessionLocal()
+    try:
+        service = RSSService(db)
+        return service.ingest_fetched(service.feed_service.get_feed(feed_id), fetched)
+    finally:
+        db.close()
+
+
+async def refresh_feed_async(
+    feed_id: str,
+    client: Optional["httpx.AsyncClient"] = None,
+    host_limiter: Optional[AsyncHostLimiter] = None
+) -> dict:
+    """
+    Non-blocking counterpart of RSSService.fetch_and_parse_feed.
+    The download is awaited on the event loop; the DB write is handed to
+    the ingest executor, which in turn hands the CPU-bound parse to the
+    parse pool.
+    """
+    import httpx
+
+    logger.info(f"Starting async refresh for feed ID: {feed_id}")
+    async with AsyncSessionLocal() as db:
+        feed = await AsyncFeedService(db).get_feed(feed_id)
+        url, etag, modified = str(feed.url), feed.etag, feed.modified
+
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient()
+    try:
+        async with (host_limiter or AsyncHostLimiter(1)).slot(url):
+            with feed_fetch_seconds.time(feed_id=feed_id), feed_fetch_errors.count_exceptions(feed_id=feed_id):
+                fetched = await fetch_feed_async(
+                    client,
+                    url,
+                    etag=etag,
+                    modified=modified,
+                    timeout=get_settings().RSS_FETCH_TIMEOUT
+                )
+    except httpx.HTTPError as e:
+        error_msg = f"Error processing feed {feed_id}: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+    finally:
+        if owns_client:
+            await client.aclose()
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_ingest_executor, ingest_in_own_session, feed_id, fetched)
+
+
+async def fetch_all_feeds_async(on_result: Optional[Callable[[str, dict], None]] = None) -> dict:
+    """
+    Non-blocking counterpart of RSSService.fetch_all_feeds, with the same
+    global and per-host concurrency caps
+    """
+    import httpx
+
+    settings = get_settings()
+    logger.info("Starting fetch_all_feeds_async operation")
+    async with AsyncSessionLocal() as db:
+        feed_ids = [feed.id for feed in await AsyncFeedService(db).get_feeds()]
+    logger.info(f"Processing {len(feed_ids)} feeds")
+
+    results = {}
+    concurrency = asyncio.Semaphore(max(1, settings.RSS_FETCH_CONCURRENCY))
+    host_limiter = AsyncHostLimiter(settings.RSS_FETCH_PER_HOST_CONCURRENCY)
+    limits = httpx.Limits(max_connections=max(1, settings.RSS_FETCH_CONCURRENCY))
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def refresh(feed_id: str):
+            async with concurrency:
+                try:
+                    return feed_id, await refresh_feed_async(feed_id, client, host_limiter)
+                except Exception as e:
+                    return feed_id, {"status": "error", "error": str(e)}
+
+        for finished in asyncio.as_completed([refresh(feed_id) for feed_id in feed_ids]):
+            feed_id, result = await finished
+            _report_feed_result(results, feed_id, result, on_result)
+
+    logger.info("Completed fetch_all_feeds_async operation")
+    return results
+
+
+def _report_feed_result(
+    results: dict,
+    feed_id: str,
+    result: dict,
+    on_result: Optional[Callable[[str, dict], None]] = None
+) -> None:
+    results[feed_id] = result
+    if result["status"] == "error":
+        logger.error(f"Error processing feed {feed_id}: {result['error']}")
+    elif result["status"] == "not_modified":
+        logger.info(f"Feed {feed_id} not modified")
+    else:
+        logger.info(f"Successfully processed feed {feed_id}: {result['new_entries']} new entries")
+    if on_result:
+        try:
+            on_result(feed_id, result)
+        except Exception as e:
+            logger.warning(f"Result callback failed for feed {feed_id}: {str(e)}")
+
+
 class RSSService:
     def __init__(self, db_session):
         self.entry_service = EntryService(db_session)
@@ -20,139 +196,129 @@ class RSSService:
         self.db = db_session
 
     def extract_publisher(self, url: str) -> Optional[str]:
-        try:
-            # Parse the main URL and extract the query parameter 'url'
-            parsed_url = urlparse(url)
-            query_dict = dict(parse_qsl(parsed_url.query))
-            
-            # Get the target URL from the 'url' parameter
-            if 'url' in query_dict:
-                nested_url = query_dict['url']
-                nested_parsed = urlparse(nested_url)
-                # Extract the domain (netloc)
-                domain = nested_parsed.netloc
-                # Remove subdomains like 'www' and return the base domain
-                parts = domain.split('.')
-                if len(parts) >= 2:
-                    return ".".join(parts[-2:])
-            return None
-        except Exception as e:
-            logger.warning(f"Failed to extract publisher from URL {url}: {str(e)}")
-            return None
+        return extract_publisher(url)
 
     def parse_date(self, date_str: str) -> datetime:
         """Convert various date formats to UTC datetime"""
-        try:
-            dt = parser.parse(date_str)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=pytz.UTC)
-            return dt
-        except Exception as e:
-            logger.warning(f"Failed to parse date '{date_str}', using current time. Error: {str(e)}")
-            return datetime.now(pytz.UTC)
+        return parse_date(date_str)
 
-    def fetch_and_parse_feed(self, feed_id: str) -> int:
+    def fetch_and_parse_feed(self, feed_id: str, host_limiter: Optional[HostLimiter] = None) -> dict:
         """
         Fetch and parse a specific feed
-        Returns number of new entries created
+        Returns a result dict with the status ("success" or "not_modified"),
+        the number of new entries created and the bytes downloaded
+
+        host_limiter, when given, is held for the download only, not for
+        parsing and storing it
         """
         logger.info(f"Starting fetch and parse for feed ID: {feed_id}")
         try:
             # Get feed from database
             feed = self.feed_service.get_feed(feed_id)
             logger.info(f"Processing feed: {feed.name or feed.url}")
-            
-            # Parse RSS feed
-            logger.debug(f"Fetching RSS feed from URL: {feed.url}")
-            parsed_feed = feedparser.parse(str(feed.url))
-            
-            if parsed_feed.bozo and parsed_feed.bozo_exception:
-                error_msg = f"Feed parsing error for {feed.url}: {str(parsed_feed.bozo_exception)}"
-                logger.error(error_msg)
-                raise HTTPException(status_code=400, detail=error_msg)
+            url, etag, modified = str(feed.url), feed.etag, feed.modified
+            # End the read so the pooled connection goes back while we wait on
+            # the host slot and the download; ingest checks one out again
+            self.db.commit()
+
+            # Conditional GET using the validators stored on the last fetch
+            logger.debug(f"Fetching RSS feed from URL: {url}")
+            with (host_limiter or HostLimiter(1)).slot(url):
+                with feed_fetch_seconds.time(feed_id=feed_id), feed_fetch_errors.count_exceptions(feed_id=feed_id):
+                    fetched = fetch_feed(
+                        url,
+                        etag=etag,
+                        modified=modified,
+                        timeout=get_settings().RSS_FETCH_TIMEOUT
+                    )
+            return self.ingest_fetched(feed, fetched)
+
+        except HTTPException:
+            raise  # Re-raise HTTP exceptions as they're already properly formatted
+        except Exception as e:
+            error_msg = f"Error processing feed {feed_id}: {str(e)}"
+            logger.exception(error_msg)  # This logs the full stack trace
+            raise HTTPException(status_code=500, detail=error_msg)
+
+    def ingest_fetched(self, feed: Feed, fetched: FetchResult) -> dict:
+        """
+        Parse a downloaded feed body and store its new entries.
+        Skips parsing and writing entirely when the feed is unchanged.
+        Returns the per-feed result dict of fetch_and_parse_feed
+        """
+        feed_id = feed.id
+        try:
+            digest = fetched.digest
+
+            if fetched.not_modified or (digest is not None and digest == feed.content_hash):
+                logger.info(f"Feed {feed_id} not modified since last fetch, skipping parse")
+                self.feed_service.record_fetch(
+                    feed,
+                    datetime.now(timezone.utc),
+                    etag=fetched.etag,
+                    modified=fetched.modified
+                )
+                return {
+                    "status": "not_modified",
+                    "new_entries": 0,
+                    "updated_entries": 0,
+                    "skipped_entries": 0,
+                    "bytes": len(fetched.body or b"")
+                }
+
+            # Parse RSS feed in a worker process; only normalized tuples come back
+            try:
+                with feed_parse_seconds.time(feed_id=feed_id):
+                    parsed_feed = parse_pool.parse(fetched.body, fetched.content_type, fetched.url)
+            except FeedParseError as e:
+                logger.error(str(e))
+                raise HTTPException(status_code=400, detail=str(e))
 
             # Log feed metadata
-            logger.debug(f"Feed metadata: {parsed_feed.feed.get('title', 'No title')} - "
+            logger.debug(f"Feed metadata: {parsed_feed.title or 'No title'} - "
                         f"Version: {parsed_feed.version}")
+            logger.info(f"Found {len(parsed_feed.entries) + parsed_feed.errors} entries in feed")
+            if parsed_feed.errors:
+                logger.error(f"Skipped {parsed_feed.errors} entries of feed {feed_id} that could not be parsed")
 
             # Prepare entries
-            new_entries = []
-            logger.info(f"Found {len(parsed_feed.entries)} entries in feed")
-            
-            for index, item in enumerate(parsed_feed.entries):
-                try:
-                    # Log raw entry data for debugging
-                    logger.debug(f"Raw entry data: {item}")
-                    
-                    # Extract all available attributes
-                    entry_id = item.get('id', '')
-                    title = item.get('title', 'No title'). replace('\n', '')
-                    link = item.get('link', '')
-                    published = item.get('published')
-                    updated = item.get('updated')
-                    content = item.get('content', [{'value': ''}])[0].get('value') if item.get('content') else ''
-
-                    # Parse dates
-                    published_at = self.parse_date(published) if published else datetime.now(pytz.UTC)
-                    updated_at = self.parse_date(updated) if updated else published_at
-                    
-                    # Parse publisher
-                    publisher = self.extract_publisher(link)
-                    
-                    # Create entry object
-                    entry = EntryCreate(
-                        title=title,
-                        content=content,
-                        link=link,
-                        published_at=published_at,
-                        updated_at=updated_at,
-                        feed_id=feed.id,
-                        entry_id=entry_id,
-                        publisher=publisher,
-                        is_read=False,
-                        is_bookmarked=False
-                    )
-                    
-                    # Log successful entry creation
-                    logger.info(f"Successfully created entry: {entry.title[:50]}... at {entry.published_at}")
-                    new_entries.append(entry)
-                    
-                    # Log detailed entry info at debug level
-                    logger.debug(f"""Processed entry {index + 1}:
-                        Title: {entry.title}
-                        Link: {entry.link}
-                        Published: {entry.published_at}
-                        Content length: {len(entry.content)} chars
-                    """)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing entry {index + 1}: {str(e)}")
-                    logger.exception("Full error details:")  # This logs the full stack trace
-                    continue  # Skip this entry but continue processing others
+            # ParsedEntry fields line up with EntryRecord's leading arguments
+            new_entries = [EntryRecord(*item, feed_id=feed_id) for item in parsed_feed.entries]
 
             # Batch create entries
             logger.info(f"Attempting to save {len(new_entries)} new entries")
-            created_entries = self.entry_service.create_entries_batch(new_entries)
+            batch = self.entry_service.create_entries_batch(new_entries)
+            created_entries = batch["inserted"]
 
-            # Update feed's last_fetched timestamp
-            self.feed_service.update_feed(
-                feed_id,
-                FeedUpdate(
-                    last_fetched=datetime.now(pytz.UTC)
-                )
+            # Update feed's last_fetched timestamp and validators
+            self.feed_service.record_fetch(
+                feed,
+                datetime.now(timezone.utc),
+                etag=fetched.etag,
+                modified=fetched.modified,
+                content_hash=digest
             )
 
-            logger.info(f"Successfully processed feed {feed_id}: {len(created_entries)} new entries created")
+            logger.info(f"Successfully processed feed {feed_id}: {len(created_entries)} new entries created, "
+                        f"{len(batch['updated'])} changed, {len(batch['skipped'])} unchanged")
             
             # Log detailed results
             logger.debug("Parse results: " + 
                 f"\nFeed: {feed.name or feed.url}" +
-                f"\nTotal entries found: {len(parsed_feed.entries)}" +
+                f"\nTotal entries found: {len(parsed_feed.entries) + parsed_feed.errors}" +
                 f"\nNew entries created: {len(created_entries)}" +
+                f"\nExisting entries updated: {len(batch['updated'])}" +
+                f"\nExisting entries skipped: {len(batch['skipped'])}" +
                 f"\nLast entry title: {new_entries[-1].title if new_entries else 'None'}"
             )
             
-            return len(created_entries)
+            return {
+                "status": "success",
+                "new_entries": len(created_entries),
+                "updated_entries": len(batch["updated"]),
+                "skipped_entries": len(batch["skipped"]),
+                "bytes": len(fetched.body)
+            }
 
         except HTTPException:
             raise  # Re-raise HTTP exceptions as they're already properly formatted
@@ -161,36 +327,79 @@ class RSSService:
             logger.exception(error_msg)  # This logs the full stack trace
             raise HTTPException(status_code=500, detail=error_msg)
 
-    def fetch_all_feeds(self) -> dict:
+    def fetch_all_feeds(
+        self,
+        concurrent: bool = True,
+        on_result: Optional[Callable[[str, dict], None]] = None
+    ) -> dict:
         """
         Fetch and parse all feeds
         Returns dictionary with results for each feed
+
+        In concurrent mode feeds are fetched by a bounded thread pool, each
+        worker using its own DB session. on_result is called for every feed
+        as soon as it finishes.
         """
         logger.info("Starting fetch_all_feeds operation")
-        results = {}
         feeds = self.feed_service.get_feeds()
         
-        logger.info(f"Processing {len(feeds)} feeds")
-        
+        logger.info(f"Processing {len(feeds)} feeds (concurrent={concurrent})")
+
+        if concurrent:
+            results = self._fetch_feeds_concurrently(feeds, on_result)
+        else:
+            results = self._fetch_feeds_serially(feeds, on_result)
+
+        logger.info("Completed fetch_all_feeds operation")
+        logger.debug(f"Final results: {results}")
+        return results
+
+    def _fetch_feeds_serially(
+        self,
+        feeds: List[Feed],
+        on_result: Optional[Callable[[str, dict], None]] = None
+    ) -> dict:
+        results = {}
         for feed in feeds:
             try:
                 logger.info(f"Processing feed: {feed.name or feed.url}")
-                new_entries = self.fetch_and_parse_feed(feed.id)
-                results[feed.id] = {
-                    "status": "success",
-                    "new_entries": new_entries
-                }
-                logger.info(f"Successfully processed feed {feed.id}: {new_entries} new entries")
+                result = self.fetch_and_parse_feed(feed.id)
             except Exception as e:
-                error_msg = f"Error processing feed {feed.id}: {str(e)}"
-                logger.error(error_msg)
-                results[feed.id] = {
+                result = {
                     "status": "error",
                     "error": str(e)
                 }
+            _report_feed_result(results, feed.id, result, on_result)
+        return results
 
-        logger.info("Completed fetch_all_feeds operation")
-        logger.debug(f"Final results: {results}")
+    def _fetch_feeds_concurrently(
+        self,
+        feeds: List[Feed],
+        on_result: Optional[Callable[[str, dict], None]] = None
+    ) -> dict:
+        settings = get_settings()
+        results = {}
+        if not feeds:
+            return results
+
+        host_limiter = HostLimiter(settings.RSS_FETCH_PER_HOST_CONCURRENCY)
+        max_workers = max(1, min(settings.RSS_FETCH_CONCURRENCY, len(feeds)))
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed-fetch") as executor:
+            futures = {
+                executor.submit(fetch_feed_in_own_session, feed.id, host_limiter): feed.id
+                for feed in feeds
+            }
+            for future in as_completed(futures):
+                feed_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {
+                        "status": "error",
+                        "error": str(e)
+                    }
+                _report_feed_result(results, feed_id, result, on_result)
         return results
 
     def validate_feed_url(self, url: str) -> bool:
@@ -198,6 +407,8 @@ class RSSService:
         Validate if URL is a valid RSS feed
         Returns True if valid, False otherwise
         """
+        import feedparser
+
         logger.debug(f"Validating RSS feed URL: {url}")
         try:
             parsed = feedparser.parse(url)
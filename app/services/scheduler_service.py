@@ -0,0 +1,183 @@
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+from app.config import get_settings
+from app.db.base import SessionLocal
+from app.models.feed import Feed
+from app.services.lease_service import Lease
+from app.services.rss_service import HostLimiter, fetch_feed_in_own_session
+
+logger = logging.getLogger(__name__)
+
+# Interval multipliers applied after each fetch
+SPEEDUP_FACTOR = 0.75    # feed produced new or changed entries
+SLOWDOWN_FACTOR = 1.5    # feed was unchanged or produced nothing new
+ERROR_BACKOFF_FACTOR = 2.0
+
+LEASE_NAME = "feed_scheduler"
+# The lease outlives this many missed renewals before another worker takes over
+LEASE_RENEWALS = 3
+
+
+class FeedScheduler:
+    """
+    In-process refresh scheduler.
+
+    Keeps every feed's next-due time in a min-heap and refreshes feeds as
+    they come due on a bounded worker pool. Feeds start spread across the
+    base interval, and each feed's interval adapts to how often it actually
+    produces new entries. Every worker process runs one, but only the
+    holder of the feed_scheduler lease fetches; the rest stand by.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.base_interval = float(settings.RSS_FETCH_INTERVAL)
+        self.min_interval = float(min(settings.RSS_MIN_FETCH_INTERVAL, settings.RSS_FETCH_INTERVAL))
+        self.max_interval = float(max(settings.RSS_MAX_FETCH_INTERVAL, settings.RSS_FETCH_INTERVAL))
+        self.jitter = settings.RSS_SCHEDULER_JITTER
+        self.sync_interval = float(min(settings.RSS_FETCH_INTERVAL, 60))
+        self.max_workers = max(1, settings.RSS_FETCH_CONCURRENCY)
+        self.per_host_limit = settings.RSS_FETCH_PER_HOST_CONCURRENCY
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._heap: List[Tuple[float, str]] = []
+        self._intervals: Dict[str, float] = {}
+        self._in_flight: Set[str] = set()
+        self._last_sync = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._host_limiter: Optional[HostLimiter] = None
+        self._lease = Lease(LEASE_NAME, self.sync_interval * LEASE_RENEWALS)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        logger.info(f"Starting feed scheduler (base interval {self.base_interval:.0f}s)")
+        self._stopping.clear()
+        self._host_limiter = HostLimiter(self.per_host_limit)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="feed-scheduler")
+        self._thread = threading.Thread(target=self._run, name="feed-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        if not self.running:
+            return
+        logger.info("Stopping feed scheduler")
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._thread = None
+        self._executor = None
+        self._lease.release()
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _sync_feeds(self) -> None:
+        """Pick up new feeds and forget deleted ones"""
+        db = SessionLocal()
+        try:
+            current = {feed_id for feed_id, in db.query(Feed.id).all()}
+        finally:
+            db.close()
+
+        now = time.monotonic()
+        with self._lock:
+            for feed_id in set(self._intervals) - set(current):
+                # Stale heap items are dropped when they are popped
+                del self._intervals[feed_id]
+            for feed_id in current:
+                if feed_id not in self._intervals:
+                    self._intervals[feed_id] = self.base_interval
+                    # Spread new feeds uniformly across one interval
+                    heapq.heappush(self._heap, (now + random.uniform(0, self.base_interval), feed_id))
+        logger.debug(f"Scheduler synced {len(current)} feeds")
+
+    def _forget_feeds(self) -> None:
+        """Drop the schedule while another worker holds the lease; in-flight fetches still finish"""
+        with self._lock:
+            self._heap = []
+            self._intervals = {}
+
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, feed_id = heapq.heappop(self._heap)
+                if feed_id in self._intervals and feed_id not in self._in_flight:
+                    self._in_flight.add(feed_id)
+                    due.append(feed_id)
+        return due
+
+    def _next_wait(self, now: float) -> float:
+        wait = self._last_sync + self.sync_interval - now
+        with self._lock:
+            if self._heap:
+                wait = min(wait, self._heap[0][0] - now)
+        return max(0.0, wait)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                now = time.monotonic()
+                if now - self._last_sync >= self.sync_interval:
+                    self._last_sync = now
+                    if self._lease.hold():
+                        self._sync_feeds()
+                    else:
+                        self._forget_feeds()
+                for feed_id in self._pop_due(time.monotonic()):
+                    self._submit(feed_id)
+            except Exception as e:
+                logger.exception(f"Feed scheduler iteration failed: {str(e)}")
+                self._stopping.wait(self.sync_interval)
+            self._wakeup.wait(self._next_wait(time.monotonic()))
+            self._wakeup.clear()
+
+    def _submit(self, feed_id: str) -> None:
+        future = self._executor.submit(fetch_feed_in_own_session, feed_id, self._host_limiter)
+        future.add_done_callback(lambda f: self._on_done(feed_id, f))
+
+    def _on_done(self, feed_id: str, future) -> None:
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+        self.reschedule(feed_id, result)
+        self._wakeup.set()
+
+    def reschedule(self, feed_id: str, result: dict) -> None:
+        """Adapt a feed's interval to the outcome of its last fetch and queue it again"""
+        with self._lock:
+            self._in_flight.discard(feed_id)
+            interval = self._intervals.get(feed_id)
+            if interval is None:
+                return  # feed was deleted while in flight
+
+            if result.get("status") == "error":
+                interval *= ERROR_BACKOFF_FACTOR
+            elif result.get("new_entries", 0) + result.get("updated_entries", 0) > 0:
+                interval *= SPEEDUP_FACTOR
+            else:
+                interval *= SLOWDOWN_FACTOR
+            interval = min(self.max_interval, max(self.min_interval, interval))
+
+            self._intervals[feed_id] = interval
+            heapq.heappush(self._heap, (time.monotonic() + self._jittered(interval), feed_id))
+        logger.debug(f"Feed {feed_id} rescheduled in ~{interval:.0f}s after {result.get('status')}")
+
+
+feed_scheduler = FeedScheduler()
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Set
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.schemas.entry import Entry
+from app.services.feed_service import keyword_index
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of an entry to tell a subscriber its stream is over
+EVICTED = "evicted"
+CLOSED = "closed"
+
+
+class Subscription:
+    """One live stream: its filters and a bounded queue of serialized entries"""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue_size: int,
+        feed_id: Optional[str] = None,
+        keywords: Optional[List[str]] = None
+    ):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.feed_id = feed_id
+        self.keywords = keywords
+        self.dropped = False
+
+    def wants(self, feed_id: str, keyword_feed_ids: Optional[Set[str]]) -> bool:
+        if self.feed_id and feed_id != self.feed_id:
+            return False
+        if keyword_feed_ids is not None and feed_id not in keyword_feed_ids:
+            return False
+        return True
+
+
+class EntryHub:
+    """
+    In-process fan-out of newly inserted entries to live stream subscribers.
+
+    Publishing happens on whichever thread committed the entries; each
+    subscriber's queue is only touched from its own event loop. A subscriber
+    whose queue fills up is evicted rather than allowed to hold back the
+    writer or grow without bound.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.queue_size = max(1, settings.STREAM_QUEUE_SIZE)
+        self.max_subscribers = settings.STREAM_MAX_SUBSCRIBERS
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, feed_id: Optional[str] = None, keywords: Optional[List[str]] = None) -> Subscription:
+        """Register a subscriber on the running event loop"""
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size, feed_id, keywords)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise OverflowError("Too many live stream subscribers")
+            self._subscribers.add(subscription)
+        logger.info(f"Stream subscriber added ({len(self._subscribers)} active)")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, rows: List[dict], db: Session) -> None:
+        """
+        Push freshly committed entry rows to every matching subscriber.
+        db is only used to resolve keyword filters through the keyword index.
+        Never raises: the entries are already committed.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers or not rows:
+            return
+        try:
+            self._fan_out(subscribers, rows, db)
+        except Exception as e:
+            logger.exception(f"Failed to publish entries to live streams: {str(e)}")
+
+    def _fan_out(self, subscribers: List[Subscription], rows: List[dict], db: Session) -> None:
+        # Serialize once per entry, not once per subscriber
+        messages = [(row["feed_id"], Entry.model_validate(row).model_dump_json()) for row in rows]
+        resolved = {}
+        for subscription in subscribers:
+            keyword_feed_ids = None
+            if subscription.keywords:
+                key = tuple(subscription.keywords)
+                if key not in resolved:
+                    resolved[key] = set(keyword_index.resolve(db, subscription.keywords))
+                keyword_feed_ids = resolved[key]
+
+            matched = [message for feed_id, message in messages if subscription.wants(feed_id, keyword_feed_ids)]
+            if matched:
+                try:
+                    subscription.loop.call_soon_threadsafe(self._deliver, subscription, matched)
+                except RuntimeError:
+                    # The subscriber's loop is gone
+                    self.unsubscribe(subscription)
+
+    def _deliver(self, subscription: Subscription, messages: List[str]) -> None:
+        """Runs on the subscriber's loop"""
+        if subscription.dropped:
+            return
+        for message in messages:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning("Evicting slow stream subscriber")
+                self._drop(subscription, EVICTED)
+                return
+
+    def _drop(self, subscription: Subscription, reason: str) -> None:
+        """Discard a subscriber's backlog and queue the reason its stream ends"""
+        if subscription.dropped:
+            return
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(reason)
+
+    def close(self) -> None:
+        """End every open stream, e.g. on shutdown"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._drop, subscription, CLOSED)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+entry_hub = EntryHub()
+
+
+async def iter_messages(subscription: Subscription, heartbeat: float) -> AsyncIterator[Optional[str]]:
+    """
+    Yield a subscriber's entries as they arrive, None after every idle
+    heartbeat interval, and finally EVICTED or CLOSED if the hub ends it
+    """
+    while True:
+        try:
+            message = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+        except asyncio.TimeoutError:
+            yield None
+            continue
+        yield message
+        if message in (EVICTED, CLOSED):
+            return
+
+
+async def sse_events(
+    subscription: Subscription,
+    is_disconnected: Callable[[], Awaitable[bool]]
+) -> AsyncIterator[str]:
+    """Server-Sent Events framing of a subscription; unsubscribes when done"""
+    try:
+        yield "retry: 5000\n\n"
+        async for message in iter_messages(subscription, get_settings().STREAM_HEARTBEAT_INTERVAL):
+            if message is None:
+                if await is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+            elif message in (EVICTED, CLOSED):
+                yield f"event: {message}\ndata: {{}}\n\n"
+            else:
+                yield f"event: entry\ndata: {message}\n\n"
+    finally:
+        entry_hub.unsubscribe(subscription)
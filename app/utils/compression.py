@@ -0,0 +1,174 @@
+"""
+Compressed storage for entry content.
+
+A stored value is either plain text (written with compression off, or
+before it existed) or a blob: one format byte, for DICTIONARY a big-endian
+uint16 dictionary id, then raw deflate data. Alert snippets are a few
+hundred bytes of very similar HTML, too short for deflate to find much to
+reference on its own; a preset dictionary trained on existing content
+gives it that history up front.
+"""
+import re
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Union
+import logging
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RAW = 1         # b"\x01" + raw deflate
+DICTIONARY = 2  # b"\x02" + uint16 dictionary id + raw deflate against that dictionary
+
+# Deflate can only reference the last 32 KiB of history, so a larger dictionary is dead weight
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+_DICTIONARY_ID = struct.Struct(">H")
+
+# Tags, entities and words with their trailing separator: the pieces snippets are built from
+_PIECE = re.compile(r"<[^<>]{0,64}>|&#?\w{1,8};|[^\s<&]+\s*|\s+|[<&]")
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_SIZE, max_ngram: int = 4) -> bytes:
+    """
+    Build a preset dictionary from sample content.
+
+    Runs of up to max_ngram pieces are scored by how many samples contain
+    them times their length, i.e. roughly the bytes they would save. The
+    best are packed into the dictionary with the most valuable last, where
+    deflate reaches them with the shortest distances.
+    """
+    document_frequency = Counter()
+    for sample in samples:
+        pieces = _PIECE.findall(sample)
+        seen = set()
+        for n in range(1, max_ngram + 1):
+            for i in range(len(pieces) - n + 1):
+                seen.add("".join(pieces[i:i + n]))
+        document_frequency.update(seen)
+
+    scored = sorted(
+        ((count - 1) * len(text.encode()), text)
+        for text, count in document_frequency.items()
+        if count > 1 and len(text) > 2
+    )
+    chosen = []
+    chosen_text = ""
+    used = 0
+    for score, text in reversed(scored):
+        encoded = text.encode()
+        if used + len(encoded) > size:
+            continue
+        # Longer runs are usually picked first; their parts add nothing
+        if text in chosen_text:
+            continue
+        chosen.append(encoded)
+        chosen_text += text
+        used += len(encoded)
+        if size - used < 3:
+            break
+    return b"".join(reversed(chosen))
+
+
+class ContentCodec:
+    """
+    Compresses entry content on write (when enabled) and decompresses any
+    stored value on read. Dictionaries are loaded by id through `loader`,
+    which the database layer installs; the newest one is used for writes.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.ENTRY_CONTENT_COMPRESSION
+        self.level = settings.ENTRY_CONTENT_COMPRESSION_LEVEL
+        self.loader: Optional[Callable[[], Dict[int, bytes]]] = None
+        self._lock = threading.Lock()
+        self._dictionaries: Dict[int, bytes] = {}
+        self._compressors: Dict[int, object] = {}
+        self._loaded = False
+
+    def load(self, loader: Optional[Callable[[], Dict[int, bytes]]] = None) -> None:
+        """(Re)read the dictionaries from the database, through `loader` or the installed one"""
+        loader = loader or self.loader
+        if loader is None:
+            return
+        dictionaries = loader()
+        with self._lock:
+            self._dictionaries.update(dictionaries)
+            self._loaded = True
+        logger.debug(f"Loaded {len(dictionaries)} content dictionaries")
+
+    def register(self, dictionary_id: int, data: bytes) -> None:
+        with self._lock:
+            self._dictionaries[dictionary_id] = data
+
+    @property
+    def active_dictionary(self) -> Optional[int]:
+        if not self._loaded:
+            self.load()
+        return max(self._dictionaries) if self._dictionaries else None
+
+    def _dictionary(self, dictionary_id: int, loader: Optional[Callable[[], Dict[int, bytes]]] = None) -> bytes:
+        data = self._dictionaries.get(dictionary_id)
+        if data is None:
+            # Trained by another process since we last looked
+            self.load(loader)
+            data = self._dictionaries.get(dictionary_id)
+        if data is None:
+            raise LookupError(f"Content dictionary {dictionary_id} not found")
+        return data
+
+    def _primed_compressor(self, dictionary_id: int):
+        """A compressor that has already loaded the dictionary; copying it skips re-hashing 32 KiB per value"""
+        compressor = self._compressors.get(dictionary_id)
+        if compressor is None:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self._dictionary(dictionary_id))
+            self._compressors[dictionary_id] = compressor
+        return compressor
+
+    def compress(self, value: Optional[str], dictionary_id: Optional[int] = None) -> Union[str, bytes, None]:
+        """
+        Stored form of value: a compressed blob, or value itself when
+        compression is off or wouldn't make it smaller
+        """
+        if value is None or not self.enabled:
+            return value
+        return self.pack(value, dictionary_id if dictionary_id is not None else self.active_dictionary)
+
+    def pack(self, value: str, dictionary_id: Optional[int] = None) -> Union[str, bytes]:
+        """Compress regardless of `enabled`, against the given dictionary if any"""
+        raw = value.encode()
+        if dictionary_id is None:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+            header = bytes((RAW,))
+        else:
+            compressor = self._primed_compressor(dictionary_id).copy()
+            header = bytes((DICTIONARY,)) + _DICTIONARY_ID.pack(dictionary_id)
+        packed = header + compressor.compress(raw) + compressor.flush()
+        return packed if len(packed) < len(raw) else value
+
+    def decompress(
+        self,
+        value: Union[str, bytes, None],
+        loader: Optional[Callable[[], Dict[int, bytes]]] = None
+    ) -> Optional[str]:
+        """
+        Text of a stored value, whichever form it was stored in.
+        An unknown dictionary is read through `loader` if given
+        """
+        if value is None or isinstance(value, str):
+            return value
+        fmt = value[0]
+        if fmt == RAW:
+            return zlib.decompress(value[1:], -15).decode()
+        if fmt == DICTIONARY:
+            (dictionary_id,) = _DICTIONARY_ID.unpack_from(value, 1)
+            decompressor = zlib.decompressobj(-15, zdict=self._dictionary(dictionary_id, loader))
+            return (decompressor.decompress(value[3:]) + decompressor.flush()).decode()
+        raise ValueError(f"Unknown content storage format {fmt}")
+
+
+content_codec = ContentCodec()
@@ -0,0 +1,61 @@
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit, urlunsplit
+
+T = TypeVar("T")
+
+
+def canonical_link(link: str) -> str:
+    """
+    Normalize an entry link so the same article always maps to the same key.
+    Scheme and host are case-insensitive and fragments never reach the server;
+    the query string is kept as-is since Google redirect links depend on it.
+    """
+    link = (link or "").strip()
+    try:
+        parts = urlsplit(link)
+    except ValueError:
+        return link
+    if not parts.scheme or not parts.netloc:
+        return link
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield successive lists of at most `size` items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def encode_cursor(published_at: datetime, entry_id: str) -> str:
+    """Opaque keyset pagination token for the (published_at, id) sort key"""
+    payload = json.dumps([published_at.isoformat(), entry_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor, raises ValueError on a malformed token"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published_at, entry_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(published_at), str(entry_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def entry_content_hash(title: Optional[str], content: Optional[str], updated_at: Optional[datetime]) -> str:
+    """Fingerprint of the entry fields a feed may change after first publishing it"""
+    if updated_at is not None and updated_at.tzinfo is not None:
+        updated_at = updated_at.astimezone(timezone.utc)
+    stamp = updated_at.isoformat() if updated_at is not None else ""
+    payload = "\x1f".join((title or "", content or "", stamp))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
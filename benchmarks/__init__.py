@@ -0,0 +1,16 @@
+"""
+Reproducible benchmarks against a local fake Google Alerts server.
+
+    python -m benchmarks seed bench.db --entries 1000000 --feeds 500
+    python -m benchmarks run bench.db
+    python -m benchmarks compare bench-results/old.json bench-results/new.json
+    python -m benchmarks serve --feeds 10
+
+Nothing here talks to the network beyond 127.0.0.1: seeded feeds are
+repointed at the fake server before anything is fetched.
+"""
+
+
+def metadata_path(database: str) -> str:
+    """How a database was seeded, saved next to it"""
+    return database + ".json"
@@ -0,0 +1,211 @@
+"""
+Command line for the benchmark suite; see benchmarks/__init__.py.
+
+`run` works on a copy of the seeded database (unless --in-place), so every
+run starts from the same rows, and writes its results to
+bench-results/<timestamp>-<commit>.json.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import metadata_path  # noqa: E402
+from benchmarks.server import NO_VALIDATORS, VALIDATORS, FakeAlertsServer  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "bench-results")
+
+
+def _int_list(value: str):
+    return [int(part) for part in value.split(",") if part]
+
+
+def _use_database(path: str) -> None:
+    # The app's engine is built from DATABASE_URL when app modules are first imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(path)}"
+
+
+def _quiet(verbose: bool) -> None:
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING, format="%(message)s")
+    if not verbose:
+        # Injected fetch errors would otherwise log a traceback per feed
+        logging.getLogger("app").setLevel(logging.CRITICAL)
+
+
+def cmd_seed(args) -> None:
+    if os.path.exists(args.database):
+        raise SystemExit(f"{args.database} exists; seed a new file")
+    _use_database(args.database)
+    _quiet(args.verbose)
+    from benchmarks.seed import seed_database
+
+    summary = seed_database(args.database, args.entries, args.feeds, args.seed, args.chunk, args.workers)
+    print(json.dumps(summary, indent=2))
+
+
+def cmd_run(args) -> None:
+    with open(metadata_path(args.database)) as f:
+        database = json.load(f)
+
+    workdir = None
+    path = args.database
+    if not args.in_place:
+        workdir = tempfile.mkdtemp(prefix="bench-")
+        path = os.path.join(workdir, os.path.basename(args.database))
+        print(f"Copying {args.database} to {path}")
+        shutil.copyfile(args.database, path)
+    _use_database(path)
+    _quiet(args.verbose)
+    from benchmarks import suite
+
+    sections = args.only.split(",") if args.only else ["entries", "batches", "fetch"]
+    options = {key: value for key, value in vars(args).items() if key != "func"}
+    report = {"meta": suite.run_metadata(database, options), "results": {}}
+    try:
+        if "entries" in sections:
+            print("/entries/ latency")
+            report["results"]["entries"] = suite.bench_entries(args.depths, args.limit, args.requests)
+            for result in report["results"]["entries"]:
+                print(f"  {result['name']:<16} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms")
+
+        if "batches" in sections:
+            print("create_entries_batch")
+            report["results"]["batches"] = suite.bench_batches(database["seed"], args.batch_sizes, args.batches)
+            for result in report["results"]["batches"]:
+                print(f"  {result['name']:<16} {result['rows_per_s']:>10,.0f} rows/s  p50 {result['p50_ms']:>8.2f} ms")
+
+        if "fetch" in sections:
+            print(f"fetch_all_feeds over {database['feeds']} feeds")
+            server = FakeAlertsServer(
+                seed=database["seed"],
+                feed_size=args.feed_size,
+                new_per_tick=args.new_per_tick,
+                latency=args.latency,
+                jitter=args.jitter,
+                error_rate=args.error_rate,
+                mode=args.server_mode,
+            )
+            with server:
+                report["results"]["fetch"] = suite.bench_fetch(
+                    database, args.fetch_modes.split(","), server,
+                    on_cycle=lambda result: print(
+                        f"  {result['name']:<16} {result['seconds']:>7.2f} s  {result['feeds_per_s']:>8,.1f} feeds/s"
+                        f"  {result['new_entries']:>7,} new  {result['statuses']}"
+                    )
+                )
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    output = os.path.join(args.output, f"{stamp}-{report['meta']['commit'] or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Results written to {output}")
+
+
+def cmd_compare(args) -> None:
+    from benchmarks.suite import flatten
+
+    reports = []
+    for path in (args.old, args.new):
+        with open(path) as f:
+            reports.append(json.load(f))
+    old, new = (flatten(report) for report in reports)
+    for report, path in zip(reports, (args.old, args.new)):
+        meta = report["meta"]
+        print(f"{path}: {meta['commit']}{' (dirty)' if meta['dirty'] else ''}, {meta['started_at']}, "
+              f"{meta['database']['entries']:,} entries")
+    for key in [key for key in old if key in new]:
+        if args.metric and not any(key.endswith(f"/ {metric}") for metric in args.metric.split(",")):
+            continue
+        change = f"{(new[key] - old[key]) / old[key] * 100:+.1f}%" if old[key] else "n/a"
+        print(f"  {key:<56} {old[key]:>12,.2f} {new[key]:>12,.2f} {change:>8}")
+
+
+def cmd_serve(args) -> None:
+    server = FakeAlertsServer(
+        seed=args.seed, feed_size=args.feed_size, new_per_tick=args.new_per_tick, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, mode=args.server_mode, port=args.port,
+    )
+    with server:
+        for feed in range(args.feeds):
+            print(server.feed_url(feed))
+        print(f"Advancing every {args.tick_every}s; Ctrl-C to stop" if args.tick_every else "Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(args.tick_every or 3600)
+                if args.tick_every:
+                    server.advance()
+        except KeyboardInterrupt:
+            pass
+
+
+def _server_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--feed-size", type=int, default=20, help="Items listed per feed")
+    parser.add_argument("--new-per-tick", type=int, default=5, help="Items each feed gains per advance")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 503")
+    parser.add_argument("--server-mode", choices=(VALIDATORS, NO_VALIDATORS), default=VALIDATORS,
+                        help="Send ETags and answer 304, or always a full 200")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Create and fill a benchmark database")
+    seed.add_argument("database")
+    seed.add_argument("--entries", type=int, default=100000)
+    seed.add_argument("--feeds", type=int, default=200)
+    seed.add_argument("--seed", type=int, default=1)
+    seed.add_argument("--chunk", type=int, default=20000, help="Rows per insert transaction")
+    seed.add_argument("--workers", type=int, default=0, help="Row generating processes; 0 for one per CPU")
+    seed.add_argument("--verbose", action="store_true")
+    seed.set_defaults(func=cmd_seed)
+
+    run = commands.add_parser("run", help="Benchmark a seeded database")
+    run.add_argument("database")
+    run.add_argument("--only", help="Comma-separated sections: entries,batches,fetch")
+    run.add_argument("--in-place", action="store_true", help="Work on the database itself, not a copy")
+    run.add_argument("--output", default=RESULTS_DIR)
+    run.add_argument("--depths", type=_int_list, default=[1000, 10000, 100000, 1000000],
+                     help="Page depths for /entries/; ones past the last entry are skipped")
+    run.add_argument("--limit", type=int, default=50)
+    run.add_argument("--requests", type=int, default=50, help="Timed requests per /entries/ case")
+    run.add_argument("--batch-sizes", type=_int_list, default=[100, 1000])
+    run.add_argument("--batches", type=int, default=10)
+    run.add_argument("--fetch-modes", default="sync,async", help="sync, async or both")
+    _server_options(run)
+    run.add_argument("--verbose", action="store_true")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="Line up two result files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("--metric", help="Only these measurements, e.g. p50_ms,rows_per_s")
+    compare.set_defaults(func=cmd_compare)
+
+    serve = commands.add_parser("serve", help="Run the fake Google Alerts server in the foreground")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--feeds", type=int, default=5, help="Feed URLs to print")
+    serve.add_argument("--seed", type=int, default=1)
+    serve.add_argument("--tick-every", type=float, default=0, help="Seconds between advances; 0 never")
+    _server_options(serve)
+    serve.set_defaults(func=cmd_serve)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
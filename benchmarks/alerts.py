@@ -0,0 +1,116 @@
+"""
+Synthetic Google Alerts feeds.
+
+Every item is a pure function of (seed, feed, n): the same item renders
+identically in every feed version and in seeded rows, so re-fetching an
+unchanged feed exercises the same skip paths as production. Item n of a
+feed is published about ITEM_INTERVAL after item n - 1; a feed at tick t
+lists the `size` newest items ending at item t * new_per_tick + size - 1.
+"""
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple
+from xml.sax.saxutils import escape, quoteattr
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ITEM_INTERVAL = timedelta(minutes=30)
+
+_WORDS = (
+    "city council budget vote housing market rates inflation election campaign school district "
+    "storm warning flood wildfire research study university hospital patients vaccine company "
+    "earnings quarter revenue shares investors startup funding acquisition merger lawsuit court "
+    "ruling judge police investigation community residents project construction bridge highway "
+    "energy solar wind power grid climate policy senate bill governor mayor report data survey "
+    "players season coach championship league fans stadium festival music film series launch"
+).split()
+_SECTIONS = ("news", "local", "business", "politics", "sports", "tech", "world", "opinion", "health")
+_TLDS = ("com", "com", "com", "org", "net", "co.uk", "com.au", "ca", "io")
+
+
+def _publishers(count: int = 400) -> List[str]:
+    rng = random.Random(0)
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(_WORDS)}{rng.choice(_WORDS)}{rng.choice(('news', 'times', 'post', 'daily', ''))}"
+                  f".{rng.choice(_TLDS)}")
+    return sorted(names)
+
+
+PUBLISHERS = _publishers()
+
+
+class AlertItem(NamedTuple):
+    entry_id: str
+    title: str
+    content: str  # snippet HTML, as feedparser hands it over
+    link: str  # Google redirect link to the article
+    published_at: datetime
+    updated_at: datetime
+
+
+def keyword(feed: int) -> str:
+    return f"{_WORDS[feed % len(_WORDS)]} {_WORDS[(feed * 7 + 3) % len(_WORDS)]}"
+
+
+def alert_item(seed: int, feed: int, n: int) -> AlertItem:
+    rng = random.Random((seed * 1_000_003 + feed) * 10_000_019 + n)
+    term = keyword(feed)
+    bold = f"<b>{term}</b>"
+
+    headline = rng.choices(_WORDS, k=rng.randint(5, 10))
+    headline.insert(rng.randint(0, len(headline)), bold)
+    title = " ".join(headline).capitalize()
+
+    sentences = []
+    for _ in range(rng.randint(2, 3)):
+        words = rng.choices(_WORDS, k=rng.randint(10, 20))
+        if rng.random() < 0.7:
+            words.insert(rng.randint(0, len(words)), bold)
+        sentences.append(" ".join(words).capitalize() + ".")
+    content = "&nbsp;".join(sentences) + " <b>...</b>"
+
+    publisher = rng.choice(PUBLISHERS)
+    published_at = EPOCH + ITEM_INTERVAL * n + timedelta(seconds=rng.randint(0, 59))
+    slug = "-".join(rng.choices(_WORDS, k=rng.randint(3, 6)))
+    article = f"https://www.{publisher}/{rng.choice(_SECTIONS)}/{published_at:%Y/%m/%d}/{slug}-{rng.getrandbits(24)}"
+    link = (f"https://www.google.com/url?rct=j&sa=t&url={article}&ct=ga"
+            f"&cd=CAIyG{rng.getrandbits(64):016x}&usg=AOvVaw{rng.getrandbits(64):016x}")
+    updated_at = published_at if rng.random() < 0.9 else published_at + timedelta(minutes=rng.randint(1, 90))
+    return AlertItem(f"{feed}:{n}", title, content, link, published_at, updated_at)
+
+
+def feed_items(seed: int, feed: int, tick: int, size: int, new_per_tick: int) -> List[AlertItem]:
+    """The items a feed lists at tick, newest first"""
+    newest = tick * new_per_tick + size - 1
+    return [alert_item(seed, feed, n) for n in range(newest, max(-1, newest - size), -1)]
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def render_feed(feed: int, items: List[AlertItem]) -> bytes:
+    """Atom document laid out like a Google Alerts feed"""
+    updated = items[0].updated_at if items else EPOCH
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:idx="urn:atom-extension:indexing">'
+        f"<id>tag:google.com,2005:reader/user/00000000000000000000/state/com.google/alert/{feed}</id>"
+        f"<title>Google Alert - {escape(keyword(feed))}</title>"
+        f'<link href="https://www.google.com/alerts/feeds/00000000000000000000/{feed}" rel="self"></link>'
+        f"<updated>{_timestamp(updated)}</updated>"
+    ]
+    for item in items:
+        parts.append(
+            f"<entry><id>tag:google.com,2013:googlealerts/feed:{zlib.crc32(item.entry_id.encode())}</id>"
+            f'<title type="html">{escape(item.title)}</title>'
+            f"<link href={quoteattr(item.link)}></link>"
+            f"<published>{_timestamp(item.published_at)}</published>"
+            f"<updated>{_timestamp(item.updated_at)}</updated>"
+            f'<content type="html">{escape(item.content)}</content>'
+            "<author><name></name></author></entry>"
+        )
+    parts.append("</feed>")
+    return "".join(parts).encode()
+
@@ -0,0 +1,131 @@
+"""
+Fill a new database with synthetic alert entries, fast.
+
+Rows are generated from alerts.py in worker processes and written with one
+executemany INSERT per transaction of `chunk` rows. The search index insert
+trigger is dropped for the load and the index rebuilt in one pass
+afterwards; feed counters are rebuilt the same way. Alongside the database a small JSON file
+records how it was seeded, which the benchmarks need to serve matching
+feeds.
+"""
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from typing import Callable, List
+
+from sqlalchemy import insert, text
+
+from app.db.base import SessionLocal, engine
+from app.db.migrate import upgrade_to_head
+from app.db.search_index import ENTRY_FTS_DDL, rebuild_entry_search_index
+from app.models.entry import Entry
+from app.models.feed import Feed
+from app.services.entry_service import EntryService
+from app.services.feed_parser import extract_publisher
+from app.utils.helpers import canonical_link, entry_content_hash
+from benchmarks import metadata_path
+from benchmarks.alerts import alert_item, keyword
+
+FEED_URL = "https://www.google.com/alerts/feeds/00000000000000000000/{feed}"
+
+# Share of each feed's newest entries left unread; older ones are read
+UNREAD_SHARE = 0.1
+BOOKMARK_EVERY = 50
+
+
+def feed_id(seed: int, feed: int) -> str:
+    return str(uuid.UUID(int=(seed << 64) | feed, version=4))
+
+
+def _rows(job) -> List[dict]:
+    """Entry rows for items [start, stop) of every feed, oldest first"""
+    seed, feeds, per_feed, start, stop = job
+    rows = []
+    for n in range(start, stop):
+        is_read = n < per_feed * (1 - UNREAD_SHARE)
+        for feed in range(feeds):
+            item = alert_item(seed, feed, n)
+            link = canonical_link(item.link)
+            rows.append({
+                "id": str(uuid.UUID(int=(seed << 96) | (feed << 40) | n, version=4)),
+                "title": item.title,
+                "content": item.content,
+                "link": link,
+                "publisher": extract_publisher(link),
+                "published_at": item.published_at,
+                "updated_at": item.updated_at,
+                "feed_id": feed_id(seed, feed),
+                "content_hash": entry_content_hash(item.title, item.content, item.updated_at),
+                "is_read": is_read,
+                "is_bookmarked": (n * feeds + feed) % BOOKMARK_EVERY == 0,
+            })
+    return rows
+
+
+def seed_database(
+    database: str,
+    entries: int,
+    feeds: int,
+    seed: int = 1,
+    chunk: int = 20000,
+    workers: int = 0,
+    progress: Callable[[str], None] = print
+) -> dict:
+    """Seed `entries` entries spread evenly over `feeds` feeds into an empty database"""
+    started = time.perf_counter()
+    upgrade_to_head(engine)
+    with engine.connect() as connection:
+        if connection.execute(text("SELECT 1 FROM entries LIMIT 1")).first():
+            raise SystemExit(f"{database} already has entries; seed a new file")
+
+    per_feed = max(1, entries // feeds)
+    with engine.begin() as connection:
+        connection.execute(insert(Feed.__table__), [
+            {"id": feed_id(seed, feed), "url": FEED_URL.format(feed=feed), "keyword": keyword(feed),
+             "name": f"Benchmark feed {feed}"}
+            for feed in range(feeds)
+        ])
+        connection.execute(text("DROP TRIGGER IF EXISTS entries_fts_ai"))
+
+    # Jobs are ranges of item numbers, so rows arrive roughly in publishing order
+    step = max(1, chunk // feeds)
+    jobs = [(seed, feeds, per_feed, start, min(per_feed, start + step)) for start in range(0, per_feed, step)]
+    written = 0
+    pool = multiprocessing.get_context("spawn").Pool(workers or os.cpu_count())
+    try:
+        for rows in pool.imap(_rows, jobs):
+            with engine.begin() as connection:
+                connection.execute(insert(Entry.__table__), rows)
+            written += len(rows)
+            elapsed = time.perf_counter() - started
+            progress(f"  {written:,} / {per_feed * feeds:,} entries ({written / elapsed:,.0f}/s)")
+    finally:
+        pool.terminate()
+    load_seconds = time.perf_counter() - started
+
+    with engine.begin() as connection:
+        rebuild_entry_search_index(connection)
+        for ddl in ENTRY_FTS_DDL:
+            connection.execute(text(ddl))
+    db = SessionLocal()
+    try:
+        EntryService(db).rebuild_feed_stats()
+    finally:
+        db.close()
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+    summary = {
+        "seed": seed,
+        "feeds": feeds,
+        "entries_per_feed": per_feed,
+        "entries": written,
+        "load_seconds": round(load_seconds, 1),
+        "total_seconds": round(time.perf_counter() - started, 1),
+        "bytes": os.path.getsize(database),
+    }
+    with open(metadata_path(database), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
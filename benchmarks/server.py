@@ -0,0 +1,160 @@
+"""
+Local stand-in for the Google Alerts feed endpoint.
+
+Serves /alerts/feeds/<user>/<feed> with the synthetic feeds from alerts.py.
+Latency, error rate and conditional GET behaviour are adjustable while it
+runs, and `advance` publishes new items to every feed at once. Bodies are
+rendered once per feed version so the server doesn't become the
+bottleneck of what it benchmarks.
+"""
+import gzip
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from benchmarks.alerts import feed_items, render_feed
+
+# What a conditional GET gets back
+VALIDATORS = "validators"  # ETag/Last-Modified honoured, 304 when unchanged
+NO_VALIDATORS = "none"  # never sends validators, always a full 200
+
+
+class FakeAlertsServer:
+    def __init__(
+        self,
+        seed: int = 1,
+        feed_size: int = 20,
+        new_per_tick: int = 5,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        mode: str = VALIDATORS,
+        gzip_bodies: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.seed = seed
+        self.feed_size = feed_size
+        self.new_per_tick = new_per_tick
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.mode = mode
+        self.gzip_bodies = gzip_bodies
+        self.tick = 0
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._bodies: Dict[Tuple[int, int], Tuple[bytes, bytes]] = {}
+        self._httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_url(self, feed: int) -> str:
+        return f"{self.base_url}/alerts/feeds/00000000000000000000/{feed}"
+
+    def start(self) -> "FakeAlertsServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-alerts", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def advance(self, ticks: int = 1) -> None:
+        """Publish new_per_tick new items on every feed"""
+        with self._lock:
+            self.tick += ticks
+            self._bodies.clear()
+
+    def reset_stats(self) -> Counter:
+        with self._lock:
+            stats, self.stats = self.stats, Counter()
+        return stats
+
+    def _body(self, feed: int, tick: int) -> Tuple[bytes, bytes]:
+        """(plain, gzipped) body of a feed version"""
+        key = (feed, tick)
+        bodies = self._bodies.get(key)
+        if bodies is None:
+            body = render_feed(feed, feed_items(self.seed, feed, tick, self.feed_size, self.new_per_tick))
+            bodies = (body, gzip.compress(body, 6))
+            self._bodies[key] = bodies
+        return bodies
+
+    def _fails(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+
+def _handler(server: FakeAlertsServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            server._count("requests")
+            delay = server._delay()
+            if delay:
+                time.sleep(delay)
+
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if len(parts) != 4 or parts[:2] != ["alerts", "feeds"] or not parts[3].isdigit():
+                return self._reply(404, b"not found")
+            if server._fails():
+                server._count("errors")
+                return self._reply(503, b"unavailable")
+
+            feed, tick = int(parts[3]), server.tick
+            etag = f'"{feed}-{tick}"'
+            if server.mode == VALIDATORS and self.headers.get("If-None-Match") == etag:
+                server._count("not_modified")
+                return self._reply(304, b"", [("ETag", etag)])
+
+            plain, compressed = server._body(feed, tick)
+            headers = [("Content-Type", "application/atom+xml; charset=utf-8")]
+            if server.mode == VALIDATORS:
+                headers.append(("ETag", etag))
+            body = plain
+            if server.gzip_bodies and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = compressed
+                headers.append(("Content-Encoding", "gzip"))
+            server._count("ok")
+            server._count("bytes", len(body))
+            self._reply(200, body, headers)
+
+        def _reply(self, status: int, body: bytes, headers=()):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
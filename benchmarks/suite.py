@@ -0,0 +1,313 @@
+"""
+The benchmarks. Each returns a list of results, dicts with a "name" and
+measurements; `python -m benchmarks run` saves them with run_metadata
+(commit, settings, database) so two runs can be lined up with flatten.
+
+Import only after DATABASE_URL points at the database to benchmark: the
+app's engine is created from it at import time.
+"""
+import asyncio
+import os
+import platform
+import re
+import sqlite3
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+import sqlalchemy
+from sqlalchemy import desc, func, select, text
+
+from app.config import get_settings
+from app.db.base import SessionLocal, async_engine, engine
+from app.main import app
+from app.models.entry import Entry
+from app.services.cache_service import response_cache
+from app.services.entry_service import EntryRecord, EntryService
+from app.services.feed_parser import extract_publisher
+from app.services.rss_service import RSSService, fetch_all_feeds_async, parse_pool
+from app.utils.helpers import encode_cursor
+from benchmarks.alerts import alert_item
+from benchmarks.seed import FEED_URL, feed_id
+from benchmarks.server import FakeAlertsServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Item numbers for create_entries_batch records, far past anything seeded or
+# served (item 10**6 is published in 2081)
+BATCH_ITEMS_START = 10 ** 6
+
+
+def summarize(seconds: List[float]) -> dict:
+    """Latency percentiles in milliseconds"""
+    ordered = sorted(seconds)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+    return {
+        "requests": len(ordered),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+async def _get(path: str, params: dict) -> int:
+    """GET through the ASGI app in-process, without a network hop; returns the status"""
+    status = 0
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.sleep(3600)
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    query = urlencode(params).encode()
+    await app({
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query,
+        "headers": [(b"host", b"bench")], "server": ("bench", 80), "client": ("127.0.0.1", 1),
+    }, receive, send)
+    return status
+
+
+def bench_entries(depths: List[int], limit: int, requests: int, budget: float = 10.0) -> List[dict]:
+    """
+    /entries/ latency for the first page and for pages `depth` entries deep,
+    reached by offset and by cursor. The response cache is bypassed, so
+    every request renders. Deep offset pages stop after `budget` seconds.
+    """
+    path = f"{get_settings().API_V1_STR}/entries/"
+    with engine.connect() as connection:
+        total = connection.execute(select(func.count()).select_from(Entry)).scalar()
+
+    cases = [("first page", {"limit": limit})]
+    for depth in depths:
+        if not 0 < depth < total:
+            continue
+        cases.append((f"offset {depth}", {"limit": limit, "skip": depth}))
+        with engine.connect() as connection:
+            published_at, entry_id = connection.execute(
+                select(Entry.published_at, Entry.id)
+                .order_by(desc(Entry.published_at), desc(Entry.id))
+                .offset(depth - 1).limit(1)
+            ).one()
+        cases.append((f"cursor {depth}", {"limit": limit, "cursor": encode_cursor(published_at, entry_id)}))
+
+    async def measure(params: dict) -> List[float]:
+        for _ in range(3):
+            await _get(path, params)
+        samples = []
+        deadline = time.perf_counter() + budget
+        while len(samples) < requests and (len(samples) < 3 or time.perf_counter() < deadline):
+            started = time.perf_counter()
+            status = await _get(path, params)
+            samples.append(time.perf_counter() - started)
+            if status != 200:
+                raise RuntimeError(f"GET {path}?{urlencode(params)} returned {status}")
+        return samples
+
+    cache_enabled = response_cache.enabled
+    response_cache.enabled = False
+    try:
+        results = []
+        for name, params in cases:
+            samples = asyncio.run(measure(params))
+            results.append({"name": name, "limit": limit, **summarize(samples)})
+    finally:
+        response_cache.enabled = cache_enabled
+    return results
+
+
+def _records(seed: int, start: int, count: int, shift: timedelta = timedelta(0)) -> List[EntryRecord]:
+    records = []
+    for n in range(start, start + count):
+        item = alert_item(seed, 0, n)
+        records.append(EntryRecord(
+            item.title, item.content, item.link, extract_publisher(item.link),
+            item.published_at, item.updated_at + shift, feed_id(seed, 0)
+        ))
+    return records
+
+
+def bench_batches(seed: int, sizes: List[int], batches: int) -> List[dict]:
+    """
+    create_entries_batch with all-new, unchanged and changed records.
+    Records are built before the clock starts; each batch is one call.
+    """
+    results = []
+    start = BATCH_ITEMS_START
+    for size in sizes:
+        phases = [
+            ("insert", [_records(seed, start + i * size, size) for i in range(batches)], "inserted"),
+            ("unchanged", [_records(seed, start + i * size, size) for i in range(batches)], "skipped"),
+            ("changed", [_records(seed, start + i * size, size, timedelta(hours=1)) for i in range(batches)], "updated"),
+        ]
+        for phase, batch_records, outcome in phases:
+            timings = []
+            handled = 0
+            db = SessionLocal()
+            try:
+                service = EntryService(db)
+                for records in batch_records:
+                    started = time.perf_counter()
+                    batch = service.create_entries_batch(records)
+                    timings.append(time.perf_counter() - started)
+                    handled += len(batch[outcome])
+            finally:
+                db.close()
+            seconds = sum(timings)
+            results.append({
+                "name": f"{phase} x{size}",
+                "batch_size": size,
+                "batches": batches,
+                "rows": size * batches,
+                f"rows_{outcome}": handled,
+                "seconds": round(seconds, 3),
+                "rows_per_s": round(size * batches / seconds, 1),
+                **{key: value for key, value in summarize(timings).items() if key != "requests"},
+            })
+        start += size * batches
+    return results
+
+
+def _error_kind(message: str) -> str:
+    """An error message without the feed ids and URLs that make each one unique"""
+    message = re.sub(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "<feed>", message)
+    return re.sub(r"'https?://[^']*'", "<url>", message.splitlines()[0] if message else "")
+
+
+def bench_fetch(
+    database: dict,
+    modes: List[str],
+    server: FakeAlertsServer,
+    on_cycle: Optional[Callable[[dict], None]] = None
+) -> List[dict]:
+    """
+    fetch_all_feeds (and/or fetch_all_feeds_async) over every seeded feed,
+    served by the fake server, for three cycles per mode:
+
+      cold       no stored validators; each feed lists new_per_tick new
+                 items on top of ones already stored
+      unchanged  nothing published since: 304s, or content-hash skips when
+                 the server sends no validators
+      advanced   new_per_tick new items per feed again
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE feeds SET url = replace(url, :real, :fake)"),
+            {"real": FEED_URL.split("/alerts/")[0], "fake": server.base_url}
+        )
+        stray = connection.execute(
+            text("SELECT COUNT(*) FROM feeds WHERE url NOT LIKE :fake || '/%'"), {"fake": server.base_url}
+        ).scalar()
+    if stray:
+        raise RuntimeError(f"{stray} feeds don't point at the fake server; refusing to fetch them")
+
+    # The first tick whose newest items go past what was seeded
+    server.tick = max(0, (database["entries_per_feed"] - server.feed_size) // server.new_per_tick + 1) - 1
+    feeds = database["feeds"]
+
+    async def fetch_async() -> dict:
+        try:
+            return await fetch_all_feeds_async()
+        finally:
+            # Pooled connections belong to this run's event loop
+            await async_engine.dispose()
+
+    def fetch(mode: str) -> dict:
+        if mode == "async":
+            return asyncio.run(fetch_async())
+        db = SessionLocal()
+        try:
+            return RSSService(db).fetch_all_feeds(concurrent=True)
+        finally:
+            db.close()
+
+    results = []
+    for mode in modes:
+        with engine.begin() as connection:
+            connection.execute(text("UPDATE feeds SET etag = NULL, modified = NULL, content_hash = NULL"))
+        for cycle in ("cold", "unchanged", "advanced"):
+            if cycle != "unchanged":
+                server.advance()
+            server.reset_stats()
+            started = time.perf_counter()
+            outcome = fetch(mode)
+            seconds = time.perf_counter() - started
+            statuses = Counter(result["status"] for result in outcome.values())
+            errors = Counter(_error_kind(result["error"]) for result in outcome.values() if result["status"] == "error")
+            new_entries = sum(result.get("new_entries", 0) for result in outcome.values())
+            served = server.reset_stats()
+            result = {
+                "name": f"{mode} {cycle}",
+                "feeds": feeds,
+                "seconds": round(seconds, 3),
+                "feeds_per_s": round(feeds / seconds, 1),
+                "new_entries": new_entries,
+                "new_entries_per_s": round(new_entries / seconds, 1),
+                "statuses": dict(statuses),
+                "errors": dict(errors.most_common(5)),
+                "server": dict(served),
+            }
+            results.append(result)
+            if on_cycle:
+                on_cycle(result)
+    parse_pool.shutdown()
+    return results
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(database: dict, options: dict) -> Dict[str, object]:
+    settings = get_settings()
+    with engine.connect() as connection:
+        entries = connection.execute(select(func.count()).select_from(Entry)).scalar()
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+        "sqlalchemy": sqlalchemy.__version__,
+        "settings": {
+            name: getattr(settings, name)
+            for name in (
+                "RSS_FETCH_CONCURRENCY", "RSS_FETCH_PER_HOST_CONCURRENCY", "RSS_PARSE_WORKERS",
+                "RSS_INGEST_WORKERS", "ENTRY_CONTENT_COMPRESSION", "SQLITE_CACHE_SIZE", "SQLITE_MMAP_SIZE",
+                "DB_POOL_SIZE",
+            )
+        },
+        "database": {**database, "entries_at_start": entries},
+        "options": options,
+    }
+
+
+def flatten(report: dict) -> Dict[str, float]:
+    """{"section / result name / measurement": value} for every number in a report's results"""
+    values = {}
+    for section, results in report["results"].items():
+        for result in results:
+            for key, value in result.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values[f"{section} / {result['name']} / {key}"] = value
+    return values
@@ -0,0 +1,60 @@
+"""Initial schema: feeds and entries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+Databases created by Base.metadata.create_all before migrations were
+introduced already have these tables; they are left untouched.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("feeds"):
+        op.create_table(
+            "feeds",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("url", sa.String(), nullable=False, unique=True),
+            sa.Column("keyword", sa.String(100), nullable=False),
+            sa.Column("name", sa.String(100), nullable=True),
+            sa.Column("last_fetched", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_feeds_keyword", "feeds", ["keyword"])
+
+    if not inspector.has_table("entries"):
+        op.create_table(
+            "entries",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=True),
+            sa.Column("link", sa.String(), nullable=False),
+            sa.Column("published_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("feed_id", sa.String(36), sa.ForeignKey("feeds.id"), nullable=False),
+            sa.Column("publisher", sa.String(), nullable=True),
+            sa.Column("is_read", sa.Boolean(), nullable=True),
+            sa.Column("is_bookmarked", sa.Boolean(), nullable=True),
+        )
+        op.create_index("ix_entries_published_at", "entries", ["published_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("entries")
+    op.drop_table("feeds")
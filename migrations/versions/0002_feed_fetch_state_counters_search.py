@@ -0,0 +1,97 @@
+"""Feed fetch validators, per-feed entry counters and entry full-text search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+        title, content, publisher,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_fts_ai AFTER INSERT ON entries BEGIN
+        INSERT INTO entries_fts(rowid, title, content, publisher)
+        VALUES (new.rowid, new.title, new.content, new.publisher);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_fts_ad AFTER DELETE ON entries BEGIN
+        DELETE FROM entries_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_fts_au AFTER UPDATE OF title, content, publisher ON entries BEGIN
+        UPDATE entries_fts
+        SET title = new.title, content = new.content, publisher = new.publisher
+        WHERE rowid = new.rowid;
+    END
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    feed_columns = {column["name"] for column in inspector.get_columns("feeds")}
+    with op.batch_alter_table("feeds") as batch_op:
+        if "etag" not in feed_columns:
+            batch_op.add_column(sa.Column("etag", sa.String(), nullable=True))
+        if "modified" not in feed_columns:
+            batch_op.add_column(sa.Column("modified", sa.String(), nullable=True))
+        if "content_hash" not in feed_columns:
+            batch_op.add_column(sa.Column("content_hash", sa.String(64), nullable=True))
+
+    if not inspector.has_table("feed_stats"):
+        op.create_table(
+            "feed_stats",
+            sa.Column("feed_id", sa.String(36), sa.ForeignKey("feeds.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("total_entries", sa.Integer(), nullable=False),
+            sa.Column("unread_entries", sa.Integer(), nullable=False),
+            sa.Column("bookmarked_entries", sa.Integer(), nullable=False),
+        )
+        op.execute(
+            "INSERT INTO feed_stats (feed_id, total_entries, unread_entries, bookmarked_entries) "
+            "SELECT feed_id, COUNT(*), "
+            "SUM(CASE WHEN is_read THEN 0 ELSE 1 END), "
+            "SUM(CASE WHEN is_bookmarked THEN 1 ELSE 0 END) "
+            "FROM entries GROUP BY feed_id"
+        )
+
+    fts_exists = inspector.has_table("entries_fts")
+    for ddl in FTS_DDL:
+        op.execute(ddl)
+    if not fts_exists:
+        op.execute(
+            "INSERT INTO entries_fts(rowid, title, content, publisher) "
+            "SELECT rowid, title, content, publisher FROM entries"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for trigger in ("entries_fts_ai", "entries_fts_ad", "entries_fts_au"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS entries_fts")
+    op.drop_table("feed_stats")
+    with op.batch_alter_table("feeds") as batch_op:
+        batch_op.drop_column("content_hash")
+        batch_op.drop_column("modified")
+        batch_op.drop_column("etag")
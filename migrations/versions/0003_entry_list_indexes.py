@@ -0,0 +1,96 @@
+"""Composite entry indexes for list queries and a unique link index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:20:00.000000
+
+Every entry list filters on feed_id, is_bookmarked or nothing and pages
+by (published_at, id), so each index ends with that sort key. The unique
+link index backs ingest deduplication. Existing links are canonicalized
+the way ingest now does it, then duplicates are removed, keeping the row
+with the most user state: bookmarked, then read, then the oldest. A
+duplicate that was read marks the kept row read.
+"""
+from typing import Sequence, Union
+from urllib.parse import urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_entries_published_at_id", ["published_at", "id"]),
+    ("ix_entries_feed_id_published_at", ["feed_id", "published_at", "id"]),
+    ("ix_entries_is_bookmarked_published_at", ["is_bookmarked", "published_at", "id"]),
+]
+
+
+def _canonical_link(link: str) -> str:
+    """app.utils.helpers.canonical_link as of this revision"""
+    link = (link or "").strip()
+    try:
+        parts = urlsplit(link)
+    except ValueError:
+        return link
+    if not parts.scheme or not parts.netloc:
+        return link
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    existing = {index["name"] for index in sa.inspect(bind).get_indexes("entries")}
+
+    if "ix_entries_link" not in existing:
+        changed = [
+            {"row": row, "link": _canonical_link(link)}
+            for row, link in bind.execute(sa.text("SELECT rowid, link FROM entries")).all()
+            if _canonical_link(link) != link
+        ]
+        if changed:
+            bind.execute(sa.text("UPDATE entries SET link = :link WHERE rowid = :row"), changed)
+
+        bind.execute(sa.text(
+            "UPDATE entries SET is_read = 1 WHERE NOT is_read AND link IN "
+            "(SELECT link FROM entries GROUP BY link HAVING COUNT(*) > 1 AND MAX(is_read))"
+        ))
+        duplicates = bind.execute(sa.text(
+            "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM ("
+            "SELECT rowid, ROW_NUMBER() OVER ("
+            "PARTITION BY link ORDER BY is_bookmarked DESC, is_read DESC, rowid"
+            ") AS position FROM entries"
+            ") WHERE position > 1)"
+        )).rowcount
+        if duplicates:
+            # Counters were built before the duplicates were dropped
+            op.execute("DELETE FROM feed_stats")
+            op.execute(
+                "INSERT INTO feed_stats (feed_id, total_entries, unread_entries, bookmarked_entries) "
+                "SELECT feed_id, COUNT(*), "
+                "SUM(CASE WHEN is_read THEN 0 ELSE 1 END), "
+                "SUM(CASE WHEN is_bookmarked THEN 1 ELSE 0 END) "
+                "FROM entries GROUP BY feed_id"
+            )
+        op.create_index("ix_entries_link", "entries", ["link"], unique=True)
+
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, "entries", columns)
+
+    if "ix_entries_published_at" in existing:
+        op.drop_index("ix_entries_published_at", table_name="entries")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_entries_published_at", "entries", ["published_at"])
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="entries")
+    op.drop_index("ix_entries_link", table_name="entries")
@@ -0,0 +1,34 @@
+"""Content hash on entries for change detection at ingest
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:40:00.000000
+
+Existing rows start without a hash; each one is updated once, recording
+its hash, the next time its feed lists it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("entries")}
+    if "content_hash" not in columns:
+        # Plain ALTER TABLE ADD COLUMN: rebuilding entries would renumber
+        # the rowids the full-text index is keyed on
+        op.add_column("entries", sa.Column("content_hash", sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("entries", "content_hash")
@@ -0,0 +1,73 @@
+"""Dictionaries for compressed entry content; search triggers index its text
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 14:20:00.000000
+
+Nothing is compressed by the migration itself; rows convert through
+scripts/compress_content.py. Before downgrading, run that script with
+--decompress, or the search index would be fed compressed blobs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _triggers(content: str, update_when: str) -> list:
+    return [
+        f"""
+        CREATE TRIGGER entries_fts_ai AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts(rowid, title, content, publisher)
+            VALUES (new.rowid, new.title, {content.format(row="new")}, new.publisher);
+        END
+        """,
+        f"""
+        CREATE TRIGGER entries_fts_au AFTER UPDATE OF title, content, publisher ON entries
+        {update_when}
+        BEGIN
+            UPDATE entries_fts
+            SET title = new.title, content = {content.format(row="new")}, publisher = new.publisher
+            WHERE rowid = new.rowid;
+        END
+        """,
+    ]
+
+
+def _replace_triggers(content: str, update_when: str = "") -> None:
+    for trigger in ("entries_fts_ai", "entries_fts_au"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    for ddl in _triggers(content, update_when):
+        op.execute(ddl)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table("content_dictionaries"):
+        op.create_table(
+            "content_dictionaries",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.Column("samples", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    # entry_content_text is registered on every connection by app.db.base.
+    # Rewriting the same text in compressed form must not touch the index
+    _replace_triggers(
+        "entry_content_text({row}.content)",
+        "WHEN old.title IS NOT new.title OR old.publisher IS NOT new.publisher "
+        "OR entry_content_text(old.content) IS NOT entry_content_text(new.content)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_triggers("{row}.content")
+    op.drop_table("content_dictionaries")
@@ -0,0 +1,120 @@
+"""External-content entry search index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 16:40:00.000000
+
+entries_fts kept its own uncompressed copy of every title, snippet and
+publisher. It now only holds the inverted index and reads text back
+through a view over entries that decompresses content. The index is
+rebuilt from the view; the shadow table holding the old copy is dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = ("entries_fts_ai", "entries_fts_ad", "entries_fts_au")
+
+CHANGED = (
+    "WHEN old.title IS NOT new.title OR old.publisher IS NOT new.publisher "
+    "OR entry_content_text(old.content) IS NOT entry_content_text(new.content)"
+)
+
+EXTERNAL_CONTENT_DDL = [
+    """
+    CREATE VIEW entries_fts_source AS
+    SELECT rowid AS entry_rowid, title, entry_content_text(content) AS content, publisher FROM entries
+    """,
+    """
+    CREATE VIRTUAL TABLE entries_fts USING fts5(
+        title, content, publisher,
+        content = 'entries_fts_source', content_rowid = 'entry_rowid',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER entries_fts_ai AFTER INSERT ON entries BEGIN
+        INSERT INTO entries_fts(rowid, title, content, publisher)
+        VALUES (new.rowid, new.title, entry_content_text(new.content), new.publisher);
+    END
+    """,
+    """
+    CREATE TRIGGER entries_fts_ad AFTER DELETE ON entries BEGIN
+        INSERT INTO entries_fts(entries_fts, rowid, title, content, publisher)
+        VALUES ('delete', old.rowid, old.title, entry_content_text(old.content), old.publisher);
+    END
+    """,
+    f"""
+    CREATE TRIGGER entries_fts_au AFTER UPDATE OF title, content, publisher ON entries
+    {CHANGED}
+    BEGIN
+        INSERT INTO entries_fts(entries_fts, rowid, title, content, publisher)
+        VALUES ('delete', old.rowid, old.title, entry_content_text(old.content), old.publisher);
+        INSERT INTO entries_fts(rowid, title, content, publisher)
+        VALUES (new.rowid, new.title, entry_content_text(new.content), new.publisher);
+    END
+    """,
+]
+
+# As left by 0005
+STORED_CONTENT_DDL = [
+    """
+    CREATE VIRTUAL TABLE entries_fts USING fts5(
+        title, content, publisher,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER entries_fts_ai AFTER INSERT ON entries BEGIN
+        INSERT INTO entries_fts(rowid, title, content, publisher)
+        VALUES (new.rowid, new.title, entry_content_text(new.content), new.publisher);
+    END
+    """,
+    """
+    CREATE TRIGGER entries_fts_ad AFTER DELETE ON entries BEGIN
+        DELETE FROM entries_fts WHERE rowid = old.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER entries_fts_au AFTER UPDATE OF title, content, publisher ON entries
+    {CHANGED}
+    BEGIN
+        UPDATE entries_fts
+        SET title = new.title, content = entry_content_text(new.content), publisher = new.publisher
+        WHERE rowid = new.rowid;
+    END
+    """,
+]
+
+
+def _drop_search_index() -> None:
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS entries_fts")
+    op.execute("DROP VIEW IF EXISTS entries_fts_source")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _drop_search_index()
+    for ddl in EXTERNAL_CONTENT_DDL:
+        op.execute(ddl)
+    op.execute("INSERT INTO entries_fts(entries_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_search_index()
+    for ddl in STORED_CONTENT_DDL:
+        op.execute(ddl)
+    op.execute(
+        "INSERT INTO entries_fts(rowid, title, content, publisher) "
+        "SELECT rowid, title, entry_content_text(content), publisher FROM entries"
+    )
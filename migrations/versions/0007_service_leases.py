@@ -0,0 +1,33 @@
+"""Leases for background jobs that must run in one worker at a time
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 18:10:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table("service_leases"):
+        op.create_table(
+            "service_leases",
+            sa.Column("name", sa.String(64), primary_key=True),
+            sa.Column("owner", sa.String(64), nullable=False),
+            sa.Column("expires_at", sa.Float(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("service_leases")
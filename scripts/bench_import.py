@@ -0,0 +1,105 @@
+"""
+Import-time benchmark for the API.
+
+Imports the app (app.main by default) in fresh interpreters under
+`python -X importtime` and reports the median cold import time, the
+packages that account for it and the slowest single modules. Runs from an
+empty scratch directory, so anything the import writes (a database, log
+files) shows up as a failure too.
+
+Exits non-zero when the import pulls in a module that should only load
+once work starts (--forbid), writes files, or exceeds --max-ms, so it can
+guard against regressions in CI.
+
+Usage:
+    python scripts/bench_import.py [--repeat 5] [--top 15] [--max-ms 0]
+    python scripts/bench_import.py --module app.services.rss_service --forbid feedparser
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once feeds are fetched or parsed, or the schema is migrated
+DEFAULT_FORBIDDEN = "feedparser,dateutil,pytz,httpx,alembic"
+
+
+def import_profile(module: str, workdir: str) -> list:
+    """[(self us, cumulative us, module name)] in import order, from one fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        sys.exit(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--module", default="app.main")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to take the median of")
+    arg_parser.add_argument("--top", type=int, default=15, help="packages and modules to list")
+    arg_parser.add_argument("--forbid", default=DEFAULT_FORBIDDEN,
+                            help="comma separated packages the import must not load")
+    arg_parser.add_argument("--max-ms", type=float, default=0, help="fail above this median import time; 0 = no limit")
+    args = arg_parser.parse_args()
+
+    totals = []
+    profiles = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(max(1, args.repeat)):
+            rows = import_profile(args.module, workdir)
+            profiles.append(rows)
+            totals.append(next(cumulative for _, cumulative, name in rows if name == args.module))
+        side_effects = sorted(os.listdir(workdir))
+
+    # The breakdown is from the median run, a representative import
+    median_us, rows = sorted(zip(totals, profiles), key=lambda run: run[0])[len(totals) // 2]
+    loaded = {name for _, _, name in rows}
+
+    by_package = defaultdict(int)
+    for self_us, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"import {args.module}: median {median_us / 1000:.1f} ms "
+          f"(min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f}) over {len(totals)} runs, {len(rows)} modules")
+    print(f"\n{'package':<32}{'ms':>8}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<32}{self_us / 1000:>8.1f}")
+    print(f"\n{'module (self time)':<48}{'ms':>8}")
+    for self_us, _, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{name:<48}{self_us / 1000:>8.1f}")
+
+    failures = []
+    forbidden = [package for package in args.forbid.split(",") if package]
+    for package in forbidden:
+        if package in loaded:
+            failures.append(f"{package} is imported by {args.module}")
+    if side_effects:
+        failures.append(f"importing {args.module} created {', '.join(side_effects)}")
+    if args.max_ms and median_us / 1000 > args.max_ms:
+        failures.append(f"median import time {median_us / 1000:.1f} ms is over the {args.max_ms:.0f} ms budget")
+
+    print()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: none of {', '.join(forbidden) or 'the forbidden packages'} imported, no files written")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
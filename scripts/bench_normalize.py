@@ -0,0 +1,128 @@
+"""
+Microbenchmark for per-item feed normalization.
+
+Builds a synthetic Google Alerts style Atom feed, parses it once with
+feedparser, then times turning its items into insert-ready rows two ways:
+
+  before  dateutil re-parses the date strings, the publisher is extracted
+          from scratch for every link and each row is a validated EntryCreate
+  after   feedparser's struct_times are used directly, publisher extraction
+          is memoized per domain and rows are slotted EntryRecords
+
+Usage:
+    python scripts/bench_normalize.py [--items 10000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedparser
+import pytz
+from dateutil import parser
+
+from app.schemas.entry import EntryCreate
+from app.services.entry_service import EntryRecord
+from app.services.feed_parser import normalize_entry
+
+FEED_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def synthetic_feed(items: int, publishers: int = 200) -> bytes:
+    entries = "".join(
+        f"<entry><id>tag:google.com,2013:googlealerts/feed:{i}</id>"
+        f"<title type=\"html\">Alert &lt;b&gt;{i}&lt;/b&gt; headline</title>"
+        f"<link href=\"https://www.google.com/url?rct=j&amp;sa=t&amp;"
+        f"url=https://news.publisher{i % publishers}.com/story/{i}&amp;ct=ga&amp;cd=CAIyGg&amp;usg=AOvVaw{i}\"/>"
+        f"<published>2024-0{1 + i % 9}-1{i % 10}T{i % 24:02d}:15:00Z</published>"
+        f"<updated>2024-0{1 + i % 9}-1{i % 10}T{i % 24:02d}:45:00Z</updated>"
+        f"<content type=\"html\">Snippet for &lt;b&gt;alert&lt;/b&gt; number {i} with some text</content>"
+        f"</entry>"
+        for i in range(items)
+    )
+    return (
+        "<?xml version=\"1.0\" encoding=\"utf-8\"?>"
+        "<feed xmlns=\"http://www.w3.org/2005/Atom\"><id>tag:google.com,2005:reader/user/alerts</id>"
+        f"<title>Google Alert - benchmark</title><updated>2024-01-01T00:00:00Z</updated>{entries}</feed>"
+    ).encode()
+
+
+def legacy_publisher(url):
+    query_dict = dict(parse_qsl(urlparse(url).query))
+    if 'url' in query_dict:
+        parts = urlparse(query_dict['url']).netloc.split('.')
+        if len(parts) >= 2:
+            return ".".join(parts[-2:])
+    return None
+
+
+def legacy_date(value):
+    dt = parser.parse(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=pytz.UTC)
+
+
+def before(items) -> list:
+    rows = []
+    for item in items:
+        link = item.get('link', '')
+        published = item.get('published')
+        updated = item.get('updated')
+        published_at = legacy_date(published) if published else datetime.now(pytz.UTC)
+        rows.append(EntryCreate(
+            title=item.get('title', 'No title').replace('\n', ''),
+            content=item.get('content', [{'value': ''}])[0].get('value') if item.get('content') else '',
+            link=link,
+            published_at=published_at,
+            updated_at=legacy_date(updated) if updated else published_at,
+            feed_id=FEED_ID,
+            publisher=legacy_publisher(link),
+            is_read=False,
+            is_bookmarked=False
+        ).model_dump())
+    return rows
+
+
+def after(items) -> list:
+    return [EntryRecord(*normalize_entry(item), feed_id=FEED_ID).to_row() for item in items]
+
+
+def best_of(repeat: int, func, items) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(items)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--items", type=int, default=10000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    body = synthetic_feed(args.items)
+    start = time.perf_counter()
+    parsed = feedparser.parse(body)
+    parse_seconds = time.perf_counter() - start
+    items = parsed.entries
+
+    # Both paths must produce the same rows
+    for old, new in zip(before(items[:50]), after(items[:50])):
+        assert old == new, (old, new)
+
+    print(f"{len(items)} items, {len(body) / 1e6:.1f} MB; feedparser.parse: {parse_seconds:.2f}s "
+          f"({len(items) / parse_seconds:,.0f} items/s, unchanged)")
+    old_seconds = best_of(args.repeat, before, items)
+    new_seconds = best_of(args.repeat, after, items)
+    print(f"before: {old_seconds:.3f}s  {len(items) / old_seconds:>10,.0f} items/s")
+    print(f"after:  {new_seconds:.3f}s  {len(items) / new_seconds:>10,.0f} items/s  ({old_seconds / new_seconds:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
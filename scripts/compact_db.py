@@ -0,0 +1,54 @@
+"""
+One-off full compaction of the SQLite database.
+
+A full VACUUM rewrites the file, which is the only way to switch a database
+created before SQLITE_AUTO_VACUUM existed to incremental mode. It may
+renumber entries' rowids, so the search index is rebuilt afterwards.
+Stop the API first: the VACUUM needs exclusive access.
+
+Usage:
+    python scripts/compact_db.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.db.base import engine, is_sqlite
+from app.db.search_index import rebuild_entry_search_index
+
+
+def main() -> None:
+    settings = get_settings()
+    if not is_sqlite(settings.DATABASE_URL):
+        sys.exit("compact_db only applies to SQLite databases")
+
+    with engine.connect() as connection:
+        page_size = connection.execute(text("PRAGMA page_size")).scalar()
+        pages_before = connection.execute(text("PRAGMA page_count")).scalar()
+
+    started = time.perf_counter()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"PRAGMA auto_vacuum = {settings.SQLITE_AUTO_VACUUM}"))
+        connection.execute(text("VACUUM"))
+    vacuum_seconds = time.perf_counter() - started
+
+    with engine.begin() as connection:
+        rebuild_entry_search_index(connection)
+    total_seconds = time.perf_counter() - started
+
+    with engine.connect() as connection:
+        pages_after = connection.execute(text("PRAGMA page_count")).scalar()
+        mode = connection.execute(text("PRAGMA auto_vacuum")).scalar()
+
+    print(f"auto_vacuum mode: {mode}")
+    print(f"size: {pages_before * page_size / 1e6:.1f} MB -> {pages_after * page_size / 1e6:.1f} MB")
+    print(f"vacuum: {vacuum_seconds:.2f}s, with index rebuild: {total_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
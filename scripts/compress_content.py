@@ -0,0 +1,167 @@
+"""
+Convert stored entry content to (or back from) compressed storage.
+
+Trains a preset dictionary from a sample of existing content unless one
+exists (or --retrain is given), rewrites every entry whose stored form
+differs from the target in small transactions, then releases the freed
+pages. Prints the size before and after (of the content column, and of
+the whole database, search index included, in pages actually in use) and
+the per-row read cost of both forms. Safe to interrupt and rerun; the API
+may keep running.
+
+Set ENTRY_CONTENT_COMPRESSION=true as well so new entries are stored
+compressed.
+
+Usage:
+    python scripts/compress_content.py [--retrain] [--samples 5000] [--batch-size 500]
+    python scripts/compress_content.py --decompress
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, text
+
+from app.db.base import SessionLocal, engine
+from app.models.content_dictionary import ContentDictionary
+from app.models.entry import Entry
+from app.services.retention_service import RetentionService
+from app.utils.compression import DICTIONARY, MAX_DICTIONARY_SIZE, content_codec, train_dictionary
+
+
+def storage_size(connection) -> tuple:
+    """(bytes of stored content, bytes of the database in use, bytes of the database file)"""
+    content = connection.execute(text("SELECT COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0) FROM entries")).scalar()
+    pages = connection.execute(text("PRAGMA page_count")).scalar()
+    free_pages = connection.execute(text("PRAGMA freelist_count")).scalar()
+    page_size = connection.execute(text("PRAGMA page_size")).scalar()
+    return content, (pages - free_pages) * page_size, pages * page_size
+
+
+def train(samples: int, size: int) -> int:
+    """Train and store a dictionary from a random sample of entries. Returns its id"""
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT content FROM entries WHERE content IS NOT NULL ORDER BY random() LIMIT :samples"),
+            {"samples": samples}
+        ).scalars().all()
+    texts = [content_codec.decompress(value) for value in rows]
+    start = time.perf_counter()
+    data = train_dictionary(texts, size)
+    print(f"trained a {len(data):,} byte dictionary on {len(texts):,} entries in {time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    try:
+        dictionary = ContentDictionary(data=data, samples=len(texts))
+        db.add(dictionary)
+        db.commit()
+        content_codec.register(dictionary.id, data)
+        return dictionary.id
+    finally:
+        db.close()
+
+
+def target_form(value, dictionary_id):
+    """What a stored value should become; plain text when dictionary_id is None"""
+    plain = content_codec.decompress(value)
+    if dictionary_id is None:
+        return plain
+    if isinstance(value, bytes) and value[0] == DICTIONARY and int.from_bytes(value[1:3], "big") == dictionary_id:
+        return value  # already there
+    return content_codec.pack(plain, dictionary_id)
+
+
+def convert(dictionary_id, batch_size: int) -> tuple:
+    """Rewrite entries batch by batch, in rowid order. Returns (rows rewritten, seconds)"""
+    rewritten = 0
+    last_rowid = 0
+    start = time.perf_counter()
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                text("SELECT rowid, content FROM entries WHERE rowid > :last AND content IS NOT NULL "
+                     "ORDER BY rowid LIMIT :limit"),
+                {"last": last_rowid, "limit": batch_size}
+            ).all()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            changes = []
+            for rowid, value in rows:
+                stored = target_form(value, dictionary_id)
+                if stored != value:
+                    changes.append({"rowid": rowid, "content": stored})
+            if changes:
+                connection.execute(text("UPDATE entries SET content = :content WHERE rowid = :rowid"), changes)
+            rewritten += len(changes)
+    return rewritten, time.perf_counter() - start
+
+
+def read_cost(entry_ids: list, repeat: int = 3) -> float:
+    """Best-of microseconds per row to load content for these entries through the ORM column type"""
+    best = None
+    for _ in range(repeat):
+        with engine.connect() as connection:
+            start = time.perf_counter()
+            connection.execute(select(Entry.content).where(Entry.id.in_(entry_ids))).all()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / max(1, len(entry_ids)) * 1e6
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--decompress", action="store_true", help="store all content as plain text again")
+    arg_parser.add_argument("--retrain", action="store_true", help="train a new dictionary even if one exists")
+    arg_parser.add_argument("--samples", type=int, default=5000, help="entries to train the dictionary on")
+    arg_parser.add_argument("--dictionary-size", type=int, default=MAX_DICTIONARY_SIZE)
+    arg_parser.add_argument("--batch-size", type=int, default=500, help="entries rewritten per transaction")
+    arg_parser.add_argument("--bench-rows", type=int, default=1000, help="entries read to measure latency")
+    args = arg_parser.parse_args()
+
+    with engine.connect() as connection:
+        content_before, used_before, file_before = storage_size(connection)
+        entry_ids = connection.execute(
+            text("SELECT id FROM entries ORDER BY random() LIMIT :n"), {"n": args.bench_rows}
+        ).scalars().all()
+    read_before = read_cost(entry_ids)
+
+    if args.decompress:
+        dictionary_id = None
+    else:
+        dictionary_id = None if args.retrain else content_codec.active_dictionary
+        if dictionary_id is None:
+            dictionary_id = train(args.samples, args.dictionary_size)
+
+    rewritten, seconds = convert(dictionary_id, args.batch_size)
+    db = SessionLocal()
+    try:
+        vacuum = RetentionService(db).incremental_vacuum()
+        total = db.scalar(select(func.count()).select_from(Entry))
+    finally:
+        db.close()
+
+    with engine.connect() as connection:
+        content_after, used_after, file_after = storage_size(connection)
+    read_after = read_cost(entry_ids)
+
+    print(f"rewrote {rewritten:,} of {total:,} entries in {seconds:.1f}s"
+          + (f" (dictionary {dictionary_id})" if dictionary_id is not None else " to plain text"))
+    print(f"content column: {content_before / 1e6:,.2f} MB -> {content_after / 1e6:,.2f} MB "
+          f"({content_after / max(1, content_before):.0%})")
+    print(f"database in use: {used_before / 1e6:,.2f} MB -> {used_after / 1e6:,.2f} MB "
+          f"({used_after / max(1, used_before):.0%})")
+    print(f"database file: {file_before / 1e6:,.2f} MB -> {file_after / 1e6:,.2f} MB"
+          + ("" if vacuum.get("supported") else " (run scripts/compact_db.py to release free pages)"))
+    if rewritten:
+        # Shrunken rows leave their pages part-empty; only a full VACUUM repacks them
+        print("run scripts/compact_db.py with the API stopped to repack the rewritten pages")
+    print(f"read: {read_before:.1f} -> {read_after:.1f} us/entry over {len(entry_ids)} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
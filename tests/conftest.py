@@ -0,0 +1,79 @@
+"""
+Shared fixtures: a scratch SQLite database built by the Alembic migrations,
+so tests run against the schema that ships (FTS triggers, indexes and all).
+
+The app's own engine is created from DATABASE_URL on first import, so it
+is pointed at a scratch file here, before any test module imports app.
+Background work that would reach the network or fork is switched off.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='alerts-tests-'), 'app.db')}"
+os.environ["HEALTH_PROBE_RSS_URL"] = ""
+os.environ["RSS_SCHEDULER_ENABLED"] = "false"
+os.environ["RSS_PARSE_WORKERS"] = "0"
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.db.base import apply_sqlite_pragmas, register_sqlite_functions  # noqa: E402
+from app.db.migrate import upgrade_to_head  # noqa: E402
+from app.models.feed import Feed  # noqa: E402
+from app.services.feed_service import keyword_index  # noqa: E402
+
+
+def migrated_engine(path):
+    """An engine on a new database at path, upgraded to the head revision"""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, get_settings())
+        register_sqlite_functions(dbapi_connection)
+
+    upgrade_to_head(engine)
+    return engine
+
+
+def make_feeds(db, count: int = 1):
+    feeds = [Feed(url=f"https://www.google.com/alerts/feeds/{i}", keyword=f"keyword {i}") for i in range(count)]
+    db.add_all(feeds)
+    db.commit()
+    return feeds
+
+
+def minutes_ago(minutes: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(minutes=minutes)
+
+
+@pytest.fixture(scope="module")
+def module_engine(tmp_path_factory):
+    """One migrated database shared by a whole test module"""
+    engine = migrated_engine(tmp_path_factory.mktemp("db") / "module.db")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = migrated_engine(tmp_path / "test.db")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    # The process-wide index must not carry feeds over from another test's database
+    keyword_index.invalidate()
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def feed(db):
+    return make_feeds(db)[0]
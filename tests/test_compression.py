@@ -0,0 +1,140 @@
+"""
+Compressed entry content: every stored form reads back as the text that
+was written, through the ORM and through the search index alike, including
+values packed against a dictionary this process hasn't loaded yet.
+"""
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.content_dictionary import ContentDictionary
+from app.models.entry import Entry
+from app.schemas.entry import EntryCreate
+from app.services.entry_service import EntryService
+from app.utils.compression import DICTIONARY, MAX_DICTIONARY_SIZE, RAW, ContentCodec, train_dictionary
+from conftest import make_feeds, migrated_engine, minutes_ago
+
+SNIPPETS = [
+    f"<b>Solar</b> output in region {i} reached a record as grid operators "
+    f"reported <b>solar</b> generation &amp; storage growth of {i}% this week"
+    for i in range(40)
+]
+
+
+def _codec(enabled: bool = True) -> ContentCodec:
+    codec = ContentCodec()
+    codec.enabled = enabled
+    return codec
+
+
+@pytest.fixture
+def codec(monkeypatch):
+    """A fresh codec in place of the process-wide one, so no dictionaries carry over"""
+    codec = _codec()
+    monkeypatch.setattr("app.db.base.content_codec", codec)
+    monkeypatch.setattr("app.models.feed.content_codec", codec)
+    return codec
+
+
+@pytest.fixture
+def session(codec, tmp_path):
+    # Connections register entry_content_text against the patched codec
+    engine = migrated_engine(tmp_path / "compressed.db")
+
+    def load_dictionaries() -> dict:
+        with engine.connect() as connection:
+            return dict(connection.execute(select(ContentDictionary.id, ContentDictionary.data)).all())
+
+    codec.loader = load_dictionaries
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def _ingest(db, feed, snippets) -> None:
+    EntryService(db).create_entries_batch([
+        EntryCreate(title=f"Entry {i}", content=snippet, link=f"https://example.com/{i}",
+                    published_at=minutes_ago(i), updated_at=minutes_ago(i), feed_id=feed.id)
+        for i, snippet in enumerate(snippets)
+    ])
+
+
+def _stored(db) -> list:
+    return db.execute(text("SELECT content FROM entries ORDER BY title")).scalars().all()
+
+
+def test_round_trip_without_dictionary():
+    codec = _codec()
+    long_text = " ".join(SNIPPETS)
+    packed = codec.compress(long_text)
+    assert isinstance(packed, bytes) and packed[0] == RAW
+    assert codec.decompress(packed) == long_text
+    # Not worth compressing, or compression off: stored as is
+    assert codec.compress("short") == "short"
+    assert _codec(enabled=False).compress(long_text) == long_text
+    assert codec.decompress(None) is None
+
+
+def test_round_trip_with_dictionary():
+    codec = _codec()
+    dictionary = train_dictionary(SNIPPETS)
+    assert 0 < len(dictionary) <= MAX_DICTIONARY_SIZE
+    codec.register(7, dictionary)
+
+    for snippet in SNIPPETS:
+        packed = codec.compress(snippet)
+        assert packed[0] == DICTIONARY
+        assert len(packed) < len(codec.pack(snippet, None))
+        assert codec.decompress(packed) == snippet
+
+
+def test_missing_dictionary():
+    writer = _codec()
+    writer.register(3, train_dictionary(SNIPPETS))
+    packed = writer.compress(SNIPPETS[0])
+
+    reader = _codec()
+    with pytest.raises(LookupError):
+        reader.decompress(packed)
+    # A dictionary stored since is read on the miss
+    assert reader.decompress(packed, lambda: {3: writer._dictionaries[3]}) == SNIPPETS[0]
+    assert reader.decompress(packed) == SNIPPETS[0]
+
+
+def test_stored_compressed_and_searchable(codec, session):
+    session.add(ContentDictionary(id=1, data=train_dictionary(SNIPPETS), samples=len(SNIPPETS)))
+    session.commit()
+    # As at startup: the newest dictionary is used for writes
+    codec.load()
+    feed = make_feeds(session)[0]
+    _ingest(session, feed, SNIPPETS[:5])
+
+    assert all(isinstance(value, bytes) and value[0] == DICTIONARY for value in _stored(session))
+    session.expire_all()
+    contents = session.execute(select(Entry.content).order_by(Entry.title)).scalars().all()
+    assert contents == SNIPPETS[:5]
+    assert EntryService(session).search_entries("generation")["total_count"] == 5
+
+
+def test_dictionary_trained_by_another_process(codec, session):
+    feed = make_feeds(session)[0]
+    # The codec loaded no dictionaries when it connected; another process adds one
+    other = _codec()
+    other.register(9, train_dictionary(SNIPPETS))
+    session.add(ContentDictionary(id=9, data=other._dictionaries[9], samples=len(SNIPPETS)))
+    session.commit()
+    assert 9 not in codec._dictionaries
+
+    # Written through the other codec: the search trigger has to load it on
+    # the miss, through its own connection rather than the codec's loader
+    codec.enabled = False
+    codec.loader = None
+    _ingest(session, feed, SNIPPETS[:1])
+    session.execute(text("UPDATE entries SET content = :packed"), {"packed": other.compress(SNIPPETS[0])})
+    session.commit()
+
+    assert isinstance(_stored(session)[0], bytes)
+    assert EntryService(session).search_entries("storage")["total_count"] == 1
+    session.expire_all()
+    assert session.execute(select(Entry.content)).scalar_one() == SNIPPETS[0]
@@ -0,0 +1,71 @@
+"""
+Content-hash change detection in create_entries_batch: a feed listing the
+same items again writes nothing, and only real changes rewrite an entry.
+"""
+import time
+
+from sqlalchemy import select
+
+from app.models.entry import Entry
+from app.services.entry_service import EntryRecord, EntryService
+from app.services.feed_parser import normalize_entry
+
+
+def _item(**fields) -> dict:
+    item = {"title": "Solar output hits a record", "link": "https://example.com/solar",
+            "content": [{"value": "Grid operators reported <b>solar</b> output"}]}
+    item.update(fields)
+    return item
+
+
+def _ingest(db, feed, *items) -> dict:
+    records = [EntryRecord(*normalize_entry(item), feed_id=feed.id) for item in items]
+    return EntryService(db).create_entries_batch(records)
+
+
+def _stored(db) -> Entry:
+    return db.execute(select(Entry)).scalar_one()
+
+
+def test_undated_item_is_not_rewritten(db, feed):
+    assert len(_ingest(db, feed, _item())["inserted"]) == 1
+    first = _stored(db)
+    published_at, content_hash = first.published_at, first.content_hash
+    time.sleep(0.01)
+
+    batch = _ingest(db, feed, _item())
+    assert len(batch["updated"]) == 0
+    assert batch["skipped"] == ["https://example.com/solar"]
+    db.expire_all()
+    assert _stored(db).content_hash == content_hash
+    assert _stored(db).published_at == published_at
+
+
+def test_undated_item_change_keeps_published_at(db, feed):
+    _ingest(db, feed, _item())
+    published_at = _stored(db).published_at
+
+    batch = _ingest(db, feed, _item(title="Solar output hits another record"))
+    assert batch["updated"] == ["https://example.com/solar"]
+    db.expire_all()
+    entry = _stored(db)
+    assert entry.title == "Solar output hits another record"
+    assert entry.published_at == published_at
+
+
+def test_dated_item_is_refreshed_only_when_updated(db, feed):
+    dated = _item(published="Mon, 06 May 2024 10:00:00 GMT", updated="Mon, 06 May 2024 10:00:00 GMT")
+    _ingest(db, feed, dated)
+    assert _ingest(db, feed, dated)["updated"] == []
+
+    batch = _ingest(db, feed, {**dated, "updated": "Mon, 06 May 2024 12:00:00 GMT"})
+    assert batch["updated"] == ["https://example.com/solar"]
+    db.expire_all()
+    entry = _stored(db)
+    assert entry.published_at.hour == 10
+    assert entry.updated_at.hour == 12
+
+
+def test_unparseable_date_counts_as_undated(db, feed):
+    _ingest(db, feed, _item(published="sometime last week"))
+    assert _ingest(db, feed, _item(published="sometime last week"))["updated"] == []
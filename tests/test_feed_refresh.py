@@ -0,0 +1,46 @@
+"""
+RSSService.fetch_and_parse_feed: the download runs without a pooled
+connection checked out, and a refetched unchanged feed writes nothing.
+"""
+from app.services import rss_service
+from app.services.feed_fetcher import FetchResult
+from app.services.rss_service import RSSService
+
+BODY = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Google Alert - solar</title>
+  <entry>
+    <title>Solar output hits a record</title>
+    <link href="https://example.com/solar"/>
+    <published>2024-05-06T10:00:00Z</published>
+    <updated>2024-05-06T10:00:00Z</updated>
+    <content>Grid operators reported solar output</content>
+  </entry>
+</feed>
+"""
+
+
+def test_download_holds_no_connection(monkeypatch, engine, db, feed):
+    checked_out = []
+
+    def fake_fetch(url, etag=None, modified=None, timeout=None):
+        checked_out.append(engine.pool.checkedout())
+        return FetchResult(url=url, status=200, body=BODY, content_type="application/atom+xml")
+
+    monkeypatch.setattr(rss_service, "fetch_feed", fake_fetch)
+    result = RSSService(db).fetch_and_parse_feed(feed.id)
+
+    assert checked_out == [0]
+    assert result["status"] == "success"
+    assert result["new_entries"] == 1
+
+
+def test_unchanged_body_is_not_parsed_again(monkeypatch, db, feed):
+    monkeypatch.setattr(
+        rss_service, "fetch_feed",
+        lambda url, **kwargs: FetchResult(url=url, status=200, body=BODY, content_type="application/atom+xml")
+    )
+    RSSService(db).fetch_and_parse_feed(feed.id)
+    result = RSSService(db).fetch_and_parse_feed(feed.id)
+
+    assert result["status"] == "not_modified"
@@ -0,0 +1,107 @@
+"""
+Per-feed counters (feed_stats) are maintained by deltas on every write path
+instead of being recounted. After each kind of write they must still match
+a COUNT(*) over entries, feed by feed.
+"""
+from sqlalchemy import case, func, select
+
+from app.models.entry import Entry
+from app.models.feed_stats import FeedStats
+from app.schemas.entry import BulkEntryStatusUpdate, EntryCreate, EntryStatus
+from app.services.entry_service import EntryService
+from app.services.retention_service import RetentionService
+from conftest import make_feeds, minutes_ago
+
+
+def _new_entry(feed_id: str, i: int, **fields) -> EntryCreate:
+    return EntryCreate(
+        title=f"Entry {i}",
+        content=f"Snippet {i}",
+        link=f"https://example.com/{feed_id}/{i}",
+        published_at=minutes_ago(i),
+        updated_at=minutes_ago(i),
+        feed_id=feed_id,
+        **fields
+    )
+
+
+def _counters(db) -> dict:
+    rows = db.execute(select(
+        FeedStats.feed_id, FeedStats.total_entries, FeedStats.unread_entries, FeedStats.bookmarked_entries
+    )).all()
+    # A feed whose entries were all deleted may keep a row of zeros
+    return {feed_id: counts for feed_id, *counts in rows if any(counts)}
+
+
+def _counted(db) -> dict:
+    rows = db.execute(select(
+        Entry.feed_id,
+        func.count(),
+        func.sum(case((Entry.is_read == False, 1), else_=0)),
+        func.sum(case((Entry.is_bookmarked == True, 1), else_=0))
+    ).group_by(Entry.feed_id)).all()
+    return {feed_id: list(counts) for feed_id, *counts in rows}
+
+
+def _ingest(db, feeds, count: int = 10) -> EntryService:
+    service = EntryService(db)
+    service.create_entries_batch([
+        _new_entry(feed.id, i, is_read=i % 3 == 0, is_bookmarked=i % 4 == 0)
+        for feed in feeds for i in range(count)
+    ])
+    return service
+
+
+def test_insert(db):
+    feeds = make_feeds(db, 2)
+    service = _ingest(db, feeds)
+    # Links already stored are skipped and must not be counted twice
+    service.create_entries_batch([_new_entry(feeds[0].id, i) for i in range(5, 15)])
+    assert _counters(db) == _counted(db)
+    assert _counted(db)[feeds[0].id][0] == 15
+
+
+def test_status_change(db):
+    feeds = make_feeds(db, 2)
+    service = _ingest(db, feeds)
+    entries = db.execute(select(Entry.id).where(Entry.feed_id == feeds[0].id)).scalars().all()
+    for i, entry_id in enumerate(entries[:6]):
+        service.update_entry_status(entry_id, EntryStatus(read=i % 2 == 0, bookmarked=i % 3 == 0))
+    # Setting the same status again changes nothing
+    service.update_entry_status(entries[0], EntryStatus(read=True, bookmarked=True))
+    service.update_entry_status(entries[0], EntryStatus(read=True, bookmarked=True))
+    assert _counters(db) == _counted(db)
+
+
+def test_bulk_update(db):
+    feeds = make_feeds(db, 3)
+    service = _ingest(db, feeds)
+    service.update_entries_status(BulkEntryStatusUpdate(feed_id=feeds[0].id, read=True))
+    service.update_entries_status(BulkEntryStatusUpdate(published_before=minutes_ago(5), bookmarked=True))
+    entries = db.execute(select(Entry.id).where(Entry.feed_id == feeds[1].id)).scalars().all()
+    service.update_entries_status(BulkEntryStatusUpdate(entry_ids=entries[:4], read=False, bookmarked=False))
+    assert _counters(db) == _counted(db)
+
+
+def test_retention(db):
+    feeds = make_feeds(db, 2)
+    _ingest(db, feeds, count=30)
+    retention = RetentionService(db)
+    retention.max_age_days, retention.max_entries_per_feed = 0, 12
+    retention.batch_size, retention.batch_pause = 4, 0
+    assert retention.trim_feeds()[0] > 0
+    assert _counters(db) == _counted(db)
+
+    retention.keep_unread = True
+    retention.max_entries_per_feed = 3
+    retention.trim_feeds()
+    assert _counters(db) == _counted(db)
+
+
+def test_rebuild_matches_maintained_counters(db):
+    feeds = make_feeds(db, 2)
+    service = _ingest(db, feeds)
+    service.update_entries_status(BulkEntryStatusUpdate(feed_id=feeds[1].id, read=True))
+    maintained = _counters(db)
+    service.rebuild_feed_stats()
+    assert _counters(db) == maintained == _counted(db)
@@ -0,0 +1,65 @@
+"""
+Service leases: one holder per name at a time, taken over once it lapses
+or is released. They live in the app's own database (SessionLocal).
+"""
+import pytest
+from sqlalchemy import delete, update
+
+from app.db.base import SessionLocal, engine
+from app.db.migrate import upgrade_to_head
+from app.models.service_lease import ServiceLease
+from app.services.lease_service import Lease
+
+
+@pytest.fixture(autouse=True)
+def leases():
+    upgrade_to_head(engine)
+    yield
+    with engine.begin() as connection:
+        connection.execute(delete(ServiceLease))
+
+
+def _expire(name: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(update(ServiceLease).where(ServiceLease.name == name).values(expires_at=1))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_one_holder_per_name():
+    first, second = Lease("job", 60), Lease("job", 60)
+    assert first.hold()
+    assert not second.hold()
+    assert first.hold()  # renewal
+    assert Lease("other job", 60).hold()
+
+
+def test_expired_lease_is_taken_over():
+    first, second = Lease("job", 60), Lease("job", 60)
+    first.hold()
+    _expire("job")
+    assert second.hold()
+    assert not first.hold()
+
+
+def test_released_lease_is_free():
+    first, second = Lease("job", 60), Lease("job", 60)
+    first.hold()
+    first.release()
+    assert second.hold()
+    assert not first.held
+
+
+def test_only_the_lease_holder_runs_retention(monkeypatch):
+    from app.services.retention_service import RetentionJob
+
+    jobs = [RetentionJob(), RetentionJob()]
+    runs = []
+    for job in jobs:
+        monkeypatch.setattr(job, "run_once", lambda job=job: runs.append(job))
+        # One pass of the background loop, then stop
+        monkeypatch.setattr(job._stopping, "wait", lambda timeout, calls=iter([False, True]): next(calls))
+        job._run()
+    assert runs == [jobs[0]]
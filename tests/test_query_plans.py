@@ -0,0 +1,185 @@
+"""
+Query-plan regression tests for EntryService.
+
+Every EntryService read and write path runs against a scratch SQLite
+database built by the migrations, and each statement it issues goes through EXPLAIN QUERY PLAN.
+No statement may fall back to a full scan of the entries table, writes
+must find their rows by key, and cursor pages must seek the list index.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.feed import Feed
+from app.schemas.entry import BulkEntryStatusUpdate, EntryCreate, EntryStatus
+from app.services.entry_service import EntryService
+from app.services.feed_service import keyword_index
+from app.utils.helpers import encode_cursor
+
+# "SCAN entries" alone is a full table scan; "SCAN entries USING [COVERING] INDEX"
+# walks an index in order and is what ORDER BY ... LIMIT should do.
+TABLE_SCAN = re.compile(r"\bSCAN (TABLE )?entries\b(?! USING)")
+# A keyset page starts at the cursor instead of filtering from the newest entry
+CURSOR_SEEK = re.compile(r"\bSEARCH entries USING (COVERING )?INDEX \w+ \(.*published_at<\?\)")
+WRITES = ("INSERT", "UPDATE", "DELETE")
+NOT_PLANNED = ("EXPLAIN", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+
+# Created by the migrations only; plans against create_all would miss them
+MIGRATED_OBJECTS = {
+    ("index", "ix_entries_link"),
+    ("index", "ix_entries_published_at_id"),
+    ("index", "ix_entries_feed_id_published_at"),
+    ("index", "ix_entries_is_bookmarked_published_at"),
+    ("table", "entries_fts"),
+    ("view", "entries_fts_source"),
+    ("trigger", "entries_fts_ai"),
+    ("trigger", "entries_fts_ad"),
+    ("trigger", "entries_fts_au"),
+}
+
+CURSOR = encode_cursor(datetime.now(), "ffffffff-ffff-ffff-ffff-ffffffffffff")
+
+
+def _new_entry(feed_id: str, i: int, **fields) -> EntryCreate:
+    now = datetime.now(timezone.utc)
+    return EntryCreate(
+        title=f"Entry {i}",
+        content=f"Snippet {i}",
+        link=f"https://example.com/{i}",
+        published_at=now - timedelta(minutes=i),
+        updated_at=now,
+        feed_id=feed_id,
+        **fields
+    )
+
+
+# (label, call(service, feed, entry_id)) for every query shape EntryService issues
+CALLS = [
+    ("get_entries", lambda s, feed, entry_id: s.get_entries(limit=10)),
+    ("get_entries skip", lambda s, feed, entry_id: s.get_entries(skip=20, limit=10)),
+    ("get_entries cursor", lambda s, feed, entry_id: s.get_entries(limit=10, cursor=CURSOR)),
+    ("get_entries keywords", lambda s, feed, entry_id: s.get_entries(limit=10, keywords=["keyword 1"])),
+    ("get_entries fields", lambda s, feed, entry_id: s.get_entries(limit=10, fields=["title,content"])),
+    ("get_bookmarked_entries", lambda s, feed, entry_id: s.get_bookmarked_entries(limit=10)),
+    ("get_bookmarked_entries cursor", lambda s, feed, entry_id: s.get_bookmarked_entries(limit=10, cursor=CURSOR)),
+    ("get_bookmarked_entries keywords",
+     lambda s, feed, entry_id: s.get_bookmarked_entries(limit=10, keywords=["keyword 2"])),
+    ("get_feed_entries", lambda s, feed, entry_id: s.get_feed_entries(feed.id, limit=10)),
+    ("get_feed_entries cursor", lambda s, feed, entry_id: s.get_feed_entries(feed.id, limit=10, cursor=CURSOR)),
+    ("get_entry", lambda s, feed, entry_id: s.get_entry(entry_id)),
+    ("count_entries feed", lambda s, feed, entry_id: s.count_entries(feed.id)),
+    ("search_entries", lambda s, feed, entry_id: s.search_entries("snippet", limit=10)),
+    ("search_entries bookmarked", lambda s, feed, entry_id: s.search_entries("snippet", limit=10, bookmarked=True)),
+    ("export_entries", lambda s, feed, entry_id: list(s.export_entries("ndjson"))),
+    ("export_entries feed", lambda s, feed, entry_id: list(s.export_entries("csv", feed_id=feed.id))),
+    ("export_entries bookmarked read",
+     lambda s, feed, entry_id: list(s.export_entries(bookmarked=True, read=False))),
+    ("export_entries range", lambda s, feed, entry_id: list(s.export_entries(
+        since=datetime.now(timezone.utc) - timedelta(minutes=10), until=datetime.now(timezone.utc)
+    ))),
+    ("create_entries_batch", lambda s, feed, entry_id: s.create_entries_batch([
+        _new_entry(feed.id, 0), _new_entry(feed.id, 100)
+    ])),
+    ("update_entry_status", lambda s, feed, entry_id: s.update_entry_status(entry_id, EntryStatus(read=True))),
+    ("update_entries_status ids", lambda s, feed, entry_id: s.update_entries_status(
+        BulkEntryStatusUpdate(entry_ids=[entry_id], read=False)
+    )),
+    ("update_entries_status feed", lambda s, feed, entry_id: s.update_entries_status(
+        BulkEntryStatusUpdate(feed_id=feed.id, published_before=datetime.now(timezone.utc), bookmarked=True)
+    )),
+]
+
+
+@pytest.fixture(scope="module")
+def database(module_engine):
+    # Built by the migrations, so the shipped indexes, FTS table and triggers are what gets planned
+    engine = module_engine
+    keyword_index.invalidate()
+    db = sessionmaker(bind=engine)()
+
+    feeds = [Feed(url=f"https://www.google.com/alerts/feeds/{i}", keyword=f"keyword {i}") for i in range(3)]
+    db.add_all(feeds)
+    db.commit()
+    EntryService(db).create_entries_batch([
+        _new_entry(feeds[i % len(feeds)].id, i, is_bookmarked=i % 4 == 0) for i in range(40)
+    ])
+    yield engine, db, feeds[0]
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def plans(database):
+    """{label: [(statement, [plan detail, ...]), ...]} for every call in CALLS"""
+    engine, db, feed = database
+    service = EntryService(db)
+    entry_id = service.get_feed_entries(feed.id, limit=1)["entries"][0]["id"]
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(NOT_PLANNED):
+            captured.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    statements = {}
+    try:
+        for label, call in CALLS:
+            captured.clear()
+            call(service, feed, entry_id)
+            statements[label] = list(captured)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    result = {}
+    with engine.connect() as connection:
+        for label, issued in statements.items():
+            result[label] = [
+                (statement, [row[-1] for row in connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                ).all()])
+                for statement, parameters in issued
+            ]
+    return result
+
+
+def test_plans_run_against_the_migrated_schema(database):
+    engine, _, _ = database
+    with engine.connect() as connection:
+        objects = set(connection.exec_driver_sql("SELECT type, name FROM sqlite_master").all())
+    assert MIGRATED_OBJECTS <= objects, MIGRATED_OBJECTS - objects
+
+
+def _describe(statement: str, details: list) -> str:
+    return f"{' '.join(statement.split())}\n  plan: {' | '.join(details)}"
+
+
+@pytest.mark.parametrize("label", [label for label, _ in CALLS])
+def test_no_entries_table_scan(plans, label):
+    assert plans[label], f"{label} issued no statements"
+    for statement, details in plans[label]:
+        assert not any(TABLE_SCAN.search(detail) for detail in details), _describe(statement, details)
+
+
+@pytest.mark.parametrize("label", [label for label, _ in CALLS if label.startswith(("create", "update"))])
+def test_writes_find_rows_by_key(plans, label):
+    writes = [(statement, details) for statement, details in plans[label]
+              if statement.lstrip().upper().startswith(WRITES)]
+    assert writes, f"{label} issued no writes"
+    for statement, details in writes:
+        assert not any(detail.startswith("SCAN ") for detail in details), _describe(statement, details)
+
+
+def test_counter_upsert_is_planned(plans):
+    upserts = [statement for label in ("update_entry_status", "update_entries_status ids")
+               for statement, _ in plans[label] if "ON CONFLICT" in statement.upper()]
+    assert upserts, "status updates no longer upsert feed_stats"
+
+
+@pytest.mark.parametrize("label", [label for label, _ in CALLS if label.endswith(" cursor")])
+def test_cursor_pages_seek(plans, label):
+    pages = [(statement, details) for statement, details in plans[label] if "FROM entries" in statement]
+    assert pages, f"{label} issued no entries query"
+    for statement, details in pages:
+        assert any(CURSOR_SEEK.search(detail) for detail in details), _describe(statement, details)
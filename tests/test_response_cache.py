@@ -0,0 +1,140 @@
+"""
+Response cache through the app: repeat GETs are served from the cache with
+a stable ETag, a matching If-None-Match gets a bodyless 304, and every kind
+of write drops the responses it affects in the same process.
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.base import SessionLocal
+from app.main import app
+from app.models.feed import Feed
+from app.schemas.entry import EntryCreate
+from app.services.entry_service import EntryService
+from app.services.feed_service import keyword_index
+from conftest import minutes_ago
+
+API = "/api/v1"
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    # The lifespan writes logs/ under the working directory
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path_factory.mktemp("cwd"))
+        with TestClient(app) as client:
+            yield client
+
+
+@pytest.fixture
+def feed(client):
+    # Every test adds its own feed to the app's database, which they all share
+    keyword_index.invalidate()
+    db = SessionLocal()
+    try:
+        feed = Feed(url=f"https://www.google.com/alerts/feeds/{uuid.uuid4()}", keyword="cache")
+        db.add(feed)
+        db.commit()
+        _ingest(db, feed.id, range(3))
+        return feed.id
+    finally:
+        db.close()
+
+
+def _ingest(db, feed_id: str, numbers) -> None:
+    EntryService(db).create_entries_batch([
+        EntryCreate(
+            title=f"Entry {i}",
+            content=f"Snippet {i}",
+            link=f"https://example.com/{feed_id}/{i}",
+            published_at=minutes_ago(i),
+            updated_at=minutes_ago(i),
+            feed_id=feed_id,
+        )
+        for i in numbers
+    ])
+
+
+def _assert_refreshed(client, path: str, etag: str):
+    """The next GET renders afresh, and the old ETag no longer validates"""
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "MISS"
+    assert response.headers["etag"] != etag
+    return response
+
+
+def test_hit_and_not_modified(client, feed):
+    path = f"{API}/feeds/{feed}/entries"
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+    etag = first.headers["etag"]
+
+    second = client.get(path)
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["etag"] == etag
+    assert second.content == first.content
+
+    not_modified = client.get(path, headers={"If-None-Match": f'"stale", {etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_query_order_shares_an_entry(client, feed):
+    client.get(f"{API}/entries/?limit=5&skip=0")
+    assert client.get(f"{API}/entries/?skip=0&limit=5").headers["x-cache"] == "HIT"
+
+
+def test_ingest_invalidates_entries(client, feed):
+    path = f"{API}/feeds/{feed}/entries"
+    etag = client.get(path).headers["etag"]
+    db = SessionLocal()
+    try:
+        _ingest(db, feed, [10])
+    finally:
+        db.close()
+    assert len(_assert_refreshed(client, path, etag).json()) == 4
+
+
+def test_status_change_invalidates_entries(client, feed):
+    path = f"{API}/entries/bookmarked"
+    etag = client.get(path).headers["etag"]
+    entry_id = client.get(f"{API}/feeds/{feed}/entries").json()[0]["id"]
+    assert client.put(
+        f"{API}/entries/{entry_id}/status", json={"read": True, "bookmarked": True}
+    ).status_code == 200
+    bookmarked = _assert_refreshed(client, path, etag).json()["entries"]
+    assert entry_id in [entry["id"] for entry in bookmarked]
+
+    etag = client.get(path).headers["etag"]
+    assert client.put(f"{API}/entries/status", json={"feed_id": feed, "bookmarked": False}).status_code == 200
+    _assert_refreshed(client, path, etag)
+
+
+def test_feed_change_invalidates_feeds_and_entries(client, feed):
+    paths = [f"{API}/feeds/", f"{API}/feeds/{feed}"]
+    etags = [client.get(path).headers["etag"] for path in paths]
+    entries_path = f"{API}/feeds/{feed}/entries"
+    entries_etag = client.get(entries_path).headers["etag"]
+    assert client.put(f"{API}/feeds/{feed}", json={"name": "Renamed"}).status_code == 200
+    for path, etag in zip(paths, etags):
+        _assert_refreshed(client, path, etag)
+    assert client.get(f"{API}/feeds/{feed}").json()["name"] == "Renamed"
+
+    # Rendered again, but the entries themselves didn't change, so the ETag still validates
+    entries = client.get(entries_path, headers={"If-None-Match": entries_etag})
+    assert entries.status_code == 304
+    assert entries.headers["x-cache"] == "MISS"
+
+
+def test_errors_are_not_cached(client):
+    path = f"{API}/feeds/no-such-feed"
+    assert client.get(path).status_code == 404
+    response = client.get(path)
+    assert response.status_code == 404
+    assert "x-cache" not in response.headers
@@ -0,0 +1,109 @@
+"""
+RetentionService: expired and over-limit entries go in batches of
+batch_size, bookmarked entries are never deleted, and each feed keeps its
+newest entries.
+"""
+import pytest
+from sqlalchemy import select
+
+from app.models.entry import Entry
+from app.schemas.entry import EntryCreate
+from app.services.entry_service import EntryService
+from app.services.retention_service import RetentionService
+from conftest import make_feeds, minutes_ago
+
+DAY = 24 * 60
+
+
+def _ingest(db, feed_id: str, ages, **fields) -> None:
+    """One entry per age in minutes, linked by feed and age"""
+    EntryService(db).create_entries_batch([
+        EntryCreate(
+            title=f"Entry {age}",
+            content=f"Snippet {age}",
+            link=f"https://example.com/{feed_id}/{age}",
+            published_at=minutes_ago(age),
+            updated_at=minutes_ago(age),
+            feed_id=feed_id,
+            **fields
+        )
+        for age in ages
+    ])
+
+
+def _ages(db, feed_id: str) -> list:
+    links = db.execute(select(Entry.link).where(Entry.feed_id == feed_id)).scalars()
+    return sorted(int(link.rsplit("/", 1)[1]) for link in links)
+
+
+@pytest.fixture
+def retention(db):
+    service = RetentionService(db)
+    service.max_age_days = service.max_entries_per_feed = 0
+    service.keep_unread = False
+    service.batch_size, service.batch_pause = 3, 0
+    return service
+
+
+def test_purge_expired_in_batches(db, retention):
+    feed = make_feeds(db)[0]
+    _ingest(db, feed.id, [DAY * 3 + i for i in range(7)])
+    _ingest(db, feed.id, [DAY * 4], is_bookmarked=True)
+    _ingest(db, feed.id, [10, 20])
+    retention.max_age_days = 2
+
+    assert retention.purge_expired() == (7, 3)
+    assert _ages(db, feed.id) == [10, 20, DAY * 4]
+
+
+def test_purge_keeps_unread_when_asked(db, retention):
+    feed = make_feeds(db)[0]
+    _ingest(db, feed.id, [DAY * 3, DAY * 3 + 1], is_read=True)
+    _ingest(db, feed.id, [DAY * 3 + 2])
+    retention.max_age_days, retention.keep_unread = 2, True
+
+    assert retention.purge_expired() == (2, 1)
+    assert _ages(db, feed.id) == [DAY * 3 + 2]
+
+
+def test_trim_keeps_newest_and_bookmarked(db, retention):
+    busy, quiet = make_feeds(db, 2)
+    _ingest(db, busy.id, range(1, 11))
+    _ingest(db, busy.id, [5000, 6000], is_bookmarked=True)
+    _ingest(db, quiet.id, [1, 2])
+    retention.max_entries_per_feed = 4
+
+    assert retention.trim_feeds() == (6, 2)
+    assert _ages(db, busy.id) == [1, 2, 3, 4, 5000, 6000]
+    assert _ages(db, quiet.id) == [1, 2]
+
+
+def test_trim_breaks_published_at_ties_by_id(db, retention):
+    feed = make_feeds(db)[0]
+    published = minutes_ago(30)
+    EntryService(db).create_entries_batch([
+        EntryCreate(title=f"Entry {i}", content="", link=f"https://example.com/tie/{i}",
+                    published_at=published, updated_at=published, feed_id=feed.id)
+        for i in range(5)
+    ])
+    retention.max_entries_per_feed = 2
+    kept = sorted(db.execute(select(Entry.id)).scalars())[-2:]
+
+    assert retention.trim_feeds()[0] == 3
+    assert sorted(db.execute(select(Entry.id)).scalars()) == kept
+
+
+def test_run_report(db, retention):
+    feed = make_feeds(db)[0]
+    _ingest(db, feed.id, [DAY * 3, 1, 2, 3])
+    retention.max_age_days, retention.max_entries_per_feed = 2, 2
+
+    report = retention.run()
+    assert (report["deleted"], report["deleted_by_age"], report["deleted_by_feed_limit"]) == (2, 1, 1)
+    assert report["batches"] == 2
+    assert "skipped" not in report["vacuum"]
+    assert _ages(db, feed.id) == [1, 2]
+
+    again = retention.run()
+    assert again["deleted"] == 0
+    assert again["vacuum"]["skipped"]